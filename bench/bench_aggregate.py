@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Regression check + timing for generate_benchmark_plots.aggregate_benchmarks.
+
+1) Regression: for every data/*/*benchmarks*.tsv with a committed
+   results/**/benchmarks/*_aggregated_task_metrics.csv, the vectorized
+   aggregation must reproduce the committed CSV byte for byte, and must equal
+   the former per-group lambda aggregation exactly.
+2) Timing: the legacy lambda vs. the vectorized path on the hg38 us-west-2d
+   benchmarks replicated 1x, 10x, 100x ... (new samples per copy).
+
+Exits non-zero if any regression check fails.
+
+  python bench/bench_aggregate.py
+  python bench/bench_aggregate.py --scales 1 10 100 1000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "bin"))
+import generate_benchmark_plots as bench  # noqa: E402
+from daylily_giab.loaders import load_benchmarks  # noqa: E402
+
+# (benchmarks TSV, committed aggregated CSV)
+CASES = [
+    ("data/us_west_2d/hg38_7giab_us-west-2d_benchmarks_summary.tsv",
+     "results/us_west_2d/all/benchmarks/usw2d-all_hg38_aggregated_task_metrics.csv"),
+    ("data/us_west_2d/b37_7giab_us-west-2d_3x2_benchmarks_summary.tsv",
+     "results/us_west_2d/3x2/benchmarks/usw2d-3x2_b37_aggregated_task_metrics.csv"),
+    ("data/eu_central_1c/hg38_eu-central-1c_mem2-sent-combo_benchmarks.tsv",
+     "results/eu_central_1c/two/benchmarks/euc1c-two_hg38_aggregated_task_metrics.csv"),
+]
+
+
+def legacy_aggregate(df):
+    """The pre-vectorization aggregation: a Python lambda per (sample, rule) group."""
+    aggregated_df = df.groupby(["sample", "normalized_rule"], observed=True).agg(
+        Total_runtime_user=("s", "sum"),
+        Total_runtime_cpu=("cpu_time", lambda x: (x * df.loc[x.index, "snakemake_threads"]).sum()),
+        Total_cost=("task_cost", "sum"),
+        Total_snake_threads=("snakemake_threads", "sum"),
+        Avg_cpu_efficiency=("cpu_efficiency", "mean"),
+        Avg_task_cost=("task_cost", "mean")
+    ).reset_index()
+    aggregated_df["Runtime_cpu_per_vcpu"] = aggregated_df["Total_runtime_cpu"] / aggregated_df["Total_snake_threads"]
+    return aggregated_df
+
+
+def replicate(df, n):
+    """n copies of the table, each with distinct sample names (so groups multiply, not grow)."""
+    copies = []
+    for i in range(n):
+        copy = df.copy()
+        copy["sample"] = copy["sample"].astype(str) + f"_r{i}"
+        copies.append(copy)
+    out = pd.concat(copies, ignore_index=True)
+    out["sample"] = out["sample"].astype("category")
+    return out
+
+
+def check_regressions():
+    ok = True
+    for tsv, committed in CASES:
+        tsv, committed = os.path.join(ROOT, tsv), os.path.join(ROOT, committed)
+        if not (os.path.exists(tsv) and os.path.exists(committed)):
+            print(f"SKIP  {os.path.relpath(tsv, ROOT)} (missing input)")
+            continue
+        df = bench.prepare_benchmarks(load_benchmarks(tsv))
+        new = bench.aggregate_benchmarks(df)
+        with open(committed) as fh:
+            same_file = new.to_csv(index=False) == fh.read()
+        same_legacy = new.equals(legacy_aggregate(df))
+        status = "OK  " if same_file and same_legacy else "FAIL"
+        ok &= same_file and same_legacy
+        print(f"{status}  {os.path.relpath(tsv, ROOT)}: committed CSV {'identical' if same_file else 'DIFFERS'}, "
+              f"legacy lambda {'identical' if same_legacy else 'DIFFERS'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the vectorized benchmark aggregation.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--no-legacy-above", type=int, default=100,
+                        help="Skip timing the legacy lambda above this scale (default: 100)")
+    args = parser.parse_args()
+
+    ok = check_regressions()
+
+    base = bench.prepare_benchmarks(load_benchmarks(os.path.join(ROOT, CASES[0][0])))
+    print(f"\n{'scale':>6} {'rows':>10} {'groups':>8} {'lambda (s)':>11} {'vectorized (s)':>15} {'speedup':>8}")
+    for scale in args.scales:
+        df = replicate(base, scale)
+        start = time.perf_counter()
+        new = bench.aggregate_benchmarks(df)
+        t_new = time.perf_counter() - start
+        if scale <= args.no_legacy_above:
+            start = time.perf_counter()
+            old = legacy_aggregate(df)
+            t_old = time.perf_counter() - start
+            ok &= new.equals(old)
+            old_col, speedup = f"{t_old:>11.2f}", f"{t_old / t_new:>7.1f}x"
+        else:
+            old_col, speedup = f"{'-':>11}", f"{'-':>8}"
+        print(f"{scale:>6} {len(df):>10} {len(new):>8} {old_col} {t_new:>15.3f} {speedup}")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Correctness check + timing for daylily_giab.pareto.pareto_mask.
+
+1) Correctness: on random point sets (with many ties and duplicates, 1-3
+   columns) the skyline must equal the O(n^2) pairwise definition.
+2) Timing: skyline vs. pairwise on 3-column sets of increasing size.
+
+Exits non-zero if any check fails.
+
+  python bench/bench_pareto.py
+  python bench/bench_pareto.py --sizes 1000 10000 100000 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "bin"))
+from daylily_giab.pareto import pareto_mask  # noqa: E402
+
+
+def pairwise_mask(points):
+    """Reference: row i is kept unless some row is <= everywhere and < somewhere."""
+    le = (points[:, None, :] <= points[None, :, :]).all(axis=2)
+    lt = (points[:, None, :] < points[None, :, :]).any(axis=2)
+    return ~(le & lt).any(axis=0)
+
+
+def check(trials=300, seed=0):
+    rng = np.random.default_rng(seed)
+    failures = 0
+    for trial in range(trials):
+        d = 1 + trial % 3
+        n = int(rng.integers(1, 400))
+        # small integer ranges force ties and exact duplicates
+        points = rng.integers(0, int(rng.integers(2, 30)), size=(n, d)).astype("float64")
+        if not np.array_equal(pareto_mask(points), pairwise_mask(points)):
+            failures += 1
+            print(f"FAIL trial {trial}: n={n} d={d}")
+    print(f"{trials - failures}/{trials} random point sets match the pairwise definition")
+    return failures == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the Pareto skyline.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--no-pairwise-above", type=int, default=10000,
+                        help="Skip the O(n^2) reference above this many points")
+    args = parser.parse_args()
+
+    ok = check()
+    rng = np.random.default_rng(1)
+    print(f"{'points':>10} {'skyline s':>10} {'pairwise s':>11} {'front':>7}")
+    for n in args.sizes:
+        # cost, wall time, -Fscore: correlated like real pipelines
+        cost = rng.lognormal(1.0, 0.6, n)
+        points = np.column_stack([cost, cost * rng.lognormal(0, 0.3, n), -(1 - rng.beta(1, 200, n))])
+        t0 = time.perf_counter()
+        mask = pareto_mask(points)
+        fast = time.perf_counter() - t0
+        slow = ""
+        if n <= args.no_pairwise_above:
+            t0 = time.perf_counter()
+            ok &= np.array_equal(mask, pairwise_mask(points))
+            slow = f"{time.perf_counter() - t0:.3f}"
+        print(f"{n:>10} {fast:>10.3f} {slow:>11} {int(mask.sum()):>7}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Render time of the PvR scatter vs. number of points.
+
+Compares the old per-row ax.scatter loop (one PathCollection per point) with
+generate_recall_v_precision.draw_points (one collection per pipeline), for
+synthetic concordance tables of N samples x 6 pipelines.  Each timing covers
+drawing plus savefig (full + zoom) to an in-memory PNG.
+
+  python bench/bench_scatter.py
+  python bench/bench_scatter.py --samples 7 70 700 --dpi 300
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bin"))
+import generate_recall_v_precision as pvr  # noqa: E402
+
+PIPELINES = [f"{a}-{c}" for a in ("bwa2a", "sent", "strobe") for c in ("deep", "sentd")]
+
+
+def synthetic_concordance(n_samples, seed=0):
+    rng = np.random.default_rng(seed)
+    n = n_samples * len(PIPELINES)
+    return pd.DataFrame({
+        "Sample": np.repeat([f"RIH0_ANA0-HG{i:04d}-19_DBC0_0" for i in range(n_samples)], len(PIPELINES)),
+        "Pipeline": np.tile(PIPELINES, n_samples),
+        "SNPClass": "All",
+        "Sensitivity-Recall": rng.uniform(0.985, 0.999, n),
+        "Precision": rng.uniform(0.985, 0.999, n),
+    })
+
+
+def legacy_scatter(ax, df_sub, styles):
+    """The pre-vectorization loop: one ax.scatter call per row."""
+    for _, row in df_sub.iterrows():
+        ax.scatter(
+            row["Sensitivity-Recall"], row["Precision"],
+            color=styles["sample_color_map"][row["Sample"]],
+            marker=styles["marker_map"][row["Pipeline"]],
+            edgecolors="k", alpha=0.75, s=30
+        )
+
+
+def render(df, styles, vectorized, dpi):
+    start = time.perf_counter()
+    fig, ax = plt.subplots(figsize=(10, 7))
+    if vectorized:
+        pvr.draw_points(ax, df, styles)
+    else:
+        legacy_scatter(ax, df, styles)
+    fig.savefig(io.BytesIO(), format="png", dpi=dpi, bbox_inches="tight")
+    (x0, x1), (y0, y1) = pvr.zoom_limits(df)
+    if not vectorized:
+        # The old code rebuilt the whole figure for the zoom.
+        plt.close(fig)
+        fig, ax = plt.subplots(figsize=(10, 7))
+        legacy_scatter(ax, df, styles)
+    ax.set_xlim(x0, x1)
+    ax.set_ylim(y0, y1)
+    fig.savefig(io.BytesIO(), format="png", dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PvR scatter rendering vs. point count.")
+    parser.add_argument("--samples", type=int, nargs="+", default=[7, 35, 70, 140, 350])
+    parser.add_argument("--dpi", type=int, default=150)
+    args = parser.parse_args()
+
+    print(f"{'samples':>8} {'points':>8} {'per-row (s)':>12} {'vectorized (s)':>15} {'speedup':>8}")
+    for n_samples in args.samples:
+        df = synthetic_concordance(n_samples)
+        styles = pvr.build_styles(df)
+        t_old = render(df, styles, vectorized=False, dpi=args.dpi)
+        t_new = render(df, styles, vectorized=True, dpi=args.dpi)
+        print(f"{n_samples:>8} {len(df):>8} {t_old:>12.2f} {t_new:>15.2f} {t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Stage timings of the analysis scripts on synthetic data (bench/synth.py) at
+1x, 10x, 100x ... today's size (7 samples x 3 aligners x 5 callers).
+
+Per script the stages are timed separately, through the functions main()
+calls:
+
+  generate_benchmark_plots     load (cold, parse + cache), aggregate, join (shard tables), render
+  generate_recall_v_precision  load, aggregate (prepare + styles), render (scatter, zoom, boxplots)
+  generate_concordance_heatmap load, aggregate (one pivot for all classes), render
+  generate_meta_analysis       load (aggregated + concordance + alignstats), join (build_rows),
+                               aggregate (meta_ana frame), render (TSV + boxplots)
+
+Every load starts from an empty Parquet cache.  Figures go to a temporary
+directory (the scripts' own messages and warnings are muted);
+--render-classes limits the per-SNPClass figures and render is skipped
+above --no-render-above (the seaborn strip plots already take minutes at
+10x, and the figures are unreadable at that size anyway).
+
+Each run appends its timings, with the commit, date and library versions,
+to --results (default bench/results/suite.tsv) and compares them with the
+most recent run at another commit: stages slower than --max-slowdown times
+that run, and by at least --min-delta seconds, are reported, and the exit
+status is non-zero.  The floor keeps timer noise on stages of a few
+milliseconds (a 20 ms load taking 40 ms) from failing the run.
+
+  python bench/bench_suite.py
+  python bench/bench_suite.py --scales 1 10 --scripts generate_benchmark_plots,generate_meta_analysis
+  python bench/bench_suite.py --scales 1 --no-record
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+from collections import OrderedDict
+
+import matplotlib
+matplotlib.use("Agg")
+import pandas as pd
+# The scripts import the plotting stack lazily; import it here so it is not timed as part of a stage
+import matplotlib.pyplot  # noqa: F401
+import seaborn  # noqa: F401
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "bin"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import generate_benchmark_plots as bench_plots  # noqa: E402
+import generate_concordance_heatmap as heatmap  # noqa: E402
+import generate_meta_analysis as meta  # noqa: E402
+import generate_recall_v_precision as pvr  # noqa: E402
+import synth  # noqa: E402
+from daylily_giab import loaders  # noqa: E402
+from daylily_giab.concordance import cube_class, heatmap_cube  # noqa: E402
+from daylily_giab.figures import SaveOptions  # noqa: E402
+
+SCRIPTS = ["generate_benchmark_plots", "generate_recall_v_precision", "generate_concordance_heatmap",
+           "generate_meta_analysis"]
+
+RESULT_COLUMNS = ["date", "commit", "python", "pandas", "scale", "samples", "benchmark_rows",
+                  "concordance_rows", "script", "stage", "seconds"]
+
+DEFAULT_RESULTS = os.path.normpath(os.path.join(ROOT, "bench", "results", "suite.tsv"))
+
+
+class Timer:
+    """Ordered {stage: seconds}; `with timer("load"):` adds to a stage."""
+
+    def __init__(self):
+        self.stages = OrderedDict()
+
+    def __call__(self, stage):
+        self._stage = stage
+        return self
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.stages[self._stage] = self.stages.get(self._stage, 0.0) + time.perf_counter() - self._start
+        return False
+
+
+def cold_cache(workdir, name):
+    """Point the loaders at an empty cache directory, so the next load parses the file."""
+    loaders.CACHE_DIR = os.path.join(workdir, "cache", name)
+
+
+def run_benchmark_plots(paths, workdir, render, classes, save):
+    timer = Timer()
+    cold_cache(workdir, "benchmark_plots")
+    prefix = os.path.join(workdir, "bench_hg38")
+    with timer("load"):
+        df = loaders.load_benchmarks(paths["benchmarks"])
+    with timer("aggregate"):
+        df = bench_plots.prepare_benchmarks(df)
+        aggregated = bench_plots.aggregate_benchmarks(df)
+    with timer("join"):
+        shards = bench_plots.shard_metrics(df)
+        bench_plots.chromosome_summary(shards)
+    if render:
+        with timer("render"):
+            bench_plots.plot_raw_task_cost(df, f"{prefix}_raw_task_cost.png")
+            for metric, xlabel, title, suffix in bench_plots.AGGREGATED_PLOTS:
+                bench_plots.plot_aggregated_boxplot(aggregated, metric, xlabel, title, f"{prefix}_{suffix}.png")
+            if not shards.empty:
+                bench_plots.plot_shard_distribution(shards, f"{prefix}_shard_distribution.png")
+    # the aggregated CSV is generate_meta_analysis's benchmark input
+    paths["aggregated"] = f"{prefix}_aggregated_task_metrics.csv"
+    aggregated.to_csv(paths["aggregated"], index=False)
+    return timer.stages
+
+
+def run_recall_v_precision(paths, workdir, render, classes, save):
+    timer = Timer()
+    cold_cache(workdir, "recall_v_precision")
+    with timer("load"):
+        df = loaders.load_concordance(paths["concordance"])
+    with timer("aggregate"):
+        df = loaders.prepare_concordance(df)
+        styles = pvr.build_styles(df)
+    if render:
+        with timer("render"):
+            for snp_class in classes:
+                prefix = os.path.join(workdir, "pvr")
+                pvr.plot_scatter_class(df, snp_class, "hg38", "synth", prefix, styles=styles, save=save)
+                pvr.plot_boxplots_class(df, snp_class, "hg38", "synth", prefix, save=save)
+    return timer.stages
+
+
+def run_concordance_heatmap(paths, workdir, render, classes, save):
+    timer = Timer()
+    cold_cache(workdir, "concordance_heatmap")
+    with timer("load"):
+        df = loaders.load_concordance(paths["concordance"])
+    with timer("aggregate"):
+        df = loaders.prepare_concordance(df)
+        cube = heatmap_cube(df, "Fscore")
+    if render:
+        with timer("render"):
+            for snp_class in classes:
+                heatmap.plot_class_heatmap(df, snp_class, "Fscore", "hg38", "synth", output_dir=workdir, save=save,
+                                           matrix=cube_class(cube, snp_class))
+    return timer.stages
+
+
+def run_meta_analysis(paths, workdir, render, classes, save):
+    timer = Timer()
+    cold_cache(workdir, "meta_analysis")
+    with timer("load"):
+        aggregated = loaders.load_aggregated_metrics(paths["aggregated"])
+        concord = loaders.load_concordance(paths["concordance"])
+        stats = loaders.load_alignstats(paths["alignstats"])
+    with timer("join"):
+        rows = meta.build_rows(aggregated, concord, stats)
+    with timer("aggregate"):
+        df = pd.DataFrame(rows)
+    if render:
+        with timer("render"):
+            out_tsv = os.path.join(workdir, "synth_meta_ana.tsv")
+            meta.write_tsv(rows, out_tsv)
+            for metric in ["cost_per_vcpu_sec", "cost_per_vcpu_sec_gb"]:
+                meta.plot_boxplot_by_pipeline(df, metric, out_tsv)
+    return timer.stages
+
+
+RUNNERS = {
+    "generate_benchmark_plots": run_benchmark_plots,
+    "generate_recall_v_precision": run_recall_v_precision,
+    "generate_concordance_heatmap": run_concordance_heatmap,
+    "generate_meta_analysis": run_meta_analysis,
+}
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "-C", ROOT, "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+        dirty = subprocess.run(["git", "-C", ROOT, "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "") if out.returncode == 0 else "unknown"
+    except OSError:
+        return "unknown"
+
+
+def compare(current, results_path, max_slowdown, min_delta=0.25):
+    """
+    Stages slower than max_slowdown x, and at least min_delta seconds slower
+    than, the latest recorded run at another commit, as text lines.
+    """
+    if not os.path.exists(results_path):
+        return []
+    history = pd.read_csv(results_path, sep="\t", dtype={"commit": str})
+    history = history[history["commit"] != current["commit"].iloc[0]]
+    if history.empty:
+        return []
+    keys = ["scale", "script", "stage"]
+    latest = history[history["date"] == history["date"].max()]
+    merged = current.merge(latest[keys + ["seconds", "commit"]], on=keys, suffixes=("", "_before"))
+    slow = merged[(merged["seconds"] > max_slowdown * merged["seconds_before"])
+                  & (merged["seconds"] - merged["seconds_before"] >= min_delta)]
+    return [f"{r.script} {r.stage} at {r.scale}x: {r.seconds:.3f}s vs {r.seconds_before:.3f}s at {r.commit_before} "
+            f"({r.seconds / r.seconds_before:.1f}x)" for r in slow.itertuples(index=False)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time load / aggregate / join / render of the analysis scripts.")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--scripts", default=",".join(SCRIPTS), help="Comma-separated subset of the scripts")
+    parser.add_argument("--render-classes", default="All,SNPts",
+                        help="SNPClasses drawn by the per-class figures (default: All,SNPts)")
+    parser.add_argument("--no-render-above", type=int, default=1,
+                        help="Skip the render stage above this scale (default: 1)")
+    parser.add_argument("--dpi", type=int, default=60, help="DPI of the rendered PNGs (default: 60)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="TSV the timings are appended to")
+    parser.add_argument("--no-record", action="store_true", help="Compare, but do not append the timings")
+    parser.add_argument("--max-slowdown", type=float, default=1.5,
+                        help="Report stages this much slower than the previous recorded run (default: 1.5)")
+    parser.add_argument("--min-delta", type=float, default=0.25,
+                        help="... and at least this many seconds slower (default: 0.25)")
+    args = parser.parse_args()
+
+    scripts = [s.strip() for s in args.scripts.split(",") if s.strip()]
+    unknown = set(scripts) - set(RUNNERS)
+    if unknown:
+        parser.error(f"unknown script(s): {', '.join(sorted(unknown))}")
+    if "generate_meta_analysis" in scripts and "generate_benchmark_plots" not in scripts:
+        scripts.insert(0, "generate_benchmark_plots")  # writes the aggregated CSV meta reads
+    classes = [c.strip() for c in args.render_classes.split(",") if c.strip()]
+    save = SaveOptions(fmt="png", dpi=args.dpi)
+
+    records = []
+    stamp = dict(date=datetime.datetime.now().isoformat(timespec="seconds"), commit=git_commit(),
+                 python=platform.python_version(), pandas=pd.__version__)
+    print(f"{'scale':>6} {'rows':>9} {'script':<30} {'stage':<10} {'seconds':>9}")
+    with tempfile.TemporaryDirectory(prefix="daylily_bench_") as tmp:
+        for scale in args.scales:
+            workdir = os.path.join(tmp, f"x{scale}")
+            paths = synth.generate(workdir, n_samples=7 * scale, seed=args.seed)
+            n_bench = sum(1 for _ in open(paths["benchmarks"])) - 1
+            n_concord = sum(1 for _ in open(paths["concordance"])) - 1
+            for script in scripts:
+                with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    stages = RUNNERS[script](paths, workdir, scale <= args.no_render_above, classes, save)
+                for stage, seconds in stages.items():
+                    print(f"{scale:>6} {n_bench:>9} {script:<30} {stage:<10} {seconds:>9.3f}")
+                    records.append(dict(stamp, scale=scale, samples=7 * scale, benchmark_rows=n_bench,
+                                        concordance_rows=n_concord, script=script, stage=stage,
+                                        seconds=round(seconds, 4)))
+
+    current = pd.DataFrame(records, columns=RESULT_COLUMNS)
+    regressions = compare(current, args.results, args.max_slowdown, args.min_delta)
+    if not args.no_record:
+        os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+        write_header = not os.path.exists(args.results)
+        current.to_csv(args.results, sep="\t", index=False, mode="a", header=write_header)
+        print(f"Recorded: {args.results}")
+    for line in regressions:
+        print(f"SLOWER  {line}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
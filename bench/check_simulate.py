@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Correctness check for daylily_giab.simulate on a mixed fleet, where the
+instance with the most vCPUs is not the one with the most memory.
+
+1) fit_cores caps each task at the largest host that has its memory.
+2) simulate() rejects a task that fits the fleet-wide maxima of cores and
+   memory but no single host.
+3) The data/ benchmarks (bwa2a-deep,sent-sentd, 5 samples) on
+   c7i.48xlarge:2,r6i.metal:2 schedule every task.
+
+Exits non-zero if any check fails.
+
+  python bench/check_simulate.py
+  python bench/check_simulate.py --fleet c7i.48xlarge:1,r6i.metal:3 --samples 20
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "bin"))
+import simulate_cluster  # noqa: E402
+from daylily_giab import simulate  # noqa: E402
+
+MIXED = "c7i.48xlarge:2,r6i.metal:2"
+
+
+def check_fit_cores():
+    fleet = simulate.parse_fleet(MIXED)
+    mem = np.array([1024, 384 * 1024, 384 * 1024 + 1, 1024 * 1024, 1024 * 1024 + 1])
+    got = simulate.fit_cores(np.full(len(mem), 500), mem, fleet).tolist()
+    expected = [192, 192, 128, 128, 500]
+    return [] if got == expected else [f"fit_cores {got}, expected {expected}"]
+
+
+def check_rejected(workload):
+    """A 192-core task with 512 GiB: within the fleet maxima, on no host."""
+    fleet = simulate.parse_fleet(MIXED)
+    workload.cores = workload.cores.copy()
+    workload.mem_mb = workload.mem_mb.copy()
+    workload.cores[0], workload.mem_mb[0] = 192, 512 * 1024
+    try:
+        simulate.simulate(workload, fleet)
+    except ValueError:
+        return []
+    return ["a 192-core, 512 GiB task was accepted on " + MIXED]
+
+
+def check(data_files, fleet_spec, samples):
+    fleet = simulate.parse_fleet(fleet_spec)
+    pipelines = simulate.parse_pipelines(["bwa2a-deep", "sent-sentd"])
+    tasks = simulate.task_table(simulate_cluster.load_runs(data_files), pipelines)
+    workload = simulate.Workload(tasks, pipelines, samples, fleet=fleet)
+
+    failures = check_fit_cores()
+    hosts, starts = simulate.simulate(workload, fleet)
+    if np.isnan(starts).any() or hosts["n_tasks"].sum() != len(starts):
+        failures.append(f"{int(np.isnan(starts).sum())} of {len(starts)} tasks never started on {fleet_spec}")
+    failures += check_rejected(workload)
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(starts)} tasks on {fleet_spec}: makespan {hosts['last_end_s'].max() / 3600:.2f} h; "
+          f"{len(failures)} failed checks")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the cluster simulation on a mixed fleet.")
+    parser.add_argument("data_files", nargs="*", help="benchmarks TSVs (default: data/*/*benchmarks*.tsv)")
+    parser.add_argument("--fleet", default=MIXED)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+    data_files = args.data_files or sorted(glob.glob(os.path.join(ROOT, "data", "*", "*benchmarks*.tsv")))
+    sys.exit(0 if check(data_files, args.fleet, args.samples) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Correctness check for daylily_giab.warehouse with mixed concordance schemas.
+
+One warehouse gets three concordance runs (bench/synth.py tables):
+
+  legacy   unstratified, written as before SCHEMA_VERSION 2 (no Stratum
+           column, CovBin / AllVarMeanDP int64)
+  plain    unstratified, current schema (no Stratum column, narrow ints)
+  strat    stratified (--strata 5 --cov-bins 2)
+
+and query() must return every row with one schema: Stratum null for the
+unstratified runs, whole_genome() picking exactly the whole-genome rows of
+each run, and filters on Stratum / CovBin working across all partitions.
+
+A benchmarks run checks where values given as text, as bin/warehouse.py
+-w passes them: numeric columns (snakemake_threads, s) must filter like
+their typed values, and an unknown column or a value the column type
+cannot hold must be a ValueError.
+
+Exits non-zero if any check fails.
+
+  python bench/check_warehouse.py
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "bin"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import synth  # noqa: E402
+from daylily_giab import loaders, strata, warehouse  # noqa: E402
+
+
+def ingest_legacy(path, root, run):
+    """Ingest a concordance table the way the pre-strata schema typed it."""
+    df = loaders.parse_table(path, "concordance").astype({"AllVarMeanDP": "int64", "CovBin": "int64"})
+    part_dir = warehouse._partition_dir(root, "concordance", "hg38", "x", run)
+    warehouse._write_partition(df, "concordance", part_dir, loaders.file_digest(path))
+
+
+def check_where_types(work, root, samples):
+    """Text where values on numeric benchmarks columns, as from the command line."""
+    path = synth.generate(os.path.join(work, "bench"), n_samples=samples)["benchmarks"]
+    warehouse.ingest_file(path, "benchmarks", "hg38", "bench", root=root)
+    df = loaders.parse_table(path, "benchmarks")
+    threads, fewest = int(df["snakemake_threads"].max()), int(df["snakemake_threads"].min())
+    seconds = float(df["s"].iloc[0])
+    cases = [
+        ({"snakemake_threads": str(threads)}, int((df["snakemake_threads"] == threads).sum())),
+        ({"snakemake_threads": [str(threads), str(fewest)]},
+         int(df["snakemake_threads"].isin([threads, fewest]).sum())),
+        ({"s": repr(seconds)}, int((df["s"] == seconds).sum())),
+        ({"s": "10"}, int((df["s"] == 10).sum())),
+    ]
+    failures = []
+    for where, expected in cases:
+        try:
+            n = len(warehouse.query("benchmarks", root=root, where=where))
+        except Exception as err:
+            failures.append(f"where {where}: {type(err).__name__}: {str(err).splitlines()[0]}")
+        else:
+            if n != expected:
+                failures.append(f"where {where}: {n} rows, expected {expected}")
+    for where in ({"no_such_column": "1"}, {"snakemake_threads": "many"}):
+        try:
+            warehouse.query("benchmarks", root=root, where=where)
+        except ValueError:
+            continue
+        except Exception as err:
+            failures.append(f"where {where}: {type(err).__name__} instead of ValueError")
+        else:
+            failures.append(f"where {where}: no error")
+    return failures
+
+
+def check(work, samples=2):
+    plain = synth.generate(os.path.join(work, "plain"), n_samples=samples)["concordance"]
+    strat = synth.generate(os.path.join(work, "strat"), n_samples=samples, strata=5, cov_bins=2)["concordance"]
+    root = os.path.join(work, "warehouse")
+    ingest_legacy(plain, root, "legacy")
+    warehouse.ingest_file(plain, "concordance", "hg38", "plain", region_az="x", root=root)
+    warehouse.ingest_file(strat, "concordance", "hg38", "strat", region_az="x", root=root)
+
+    n_plain = len(loaders.parse_table(plain, "concordance"))
+    strat_df = loaders.parse_table(strat, "concordance")
+    expected = {"legacy": n_plain, "plain": n_plain, "strat": len(strat_df)}
+    whole = {"legacy": n_plain, "plain": n_plain, "strat": len(strata.whole_genome(strat_df))}
+
+    df = warehouse.query("concordance", root=root)
+    runs = df["run"].astype(str)
+    failures = []
+    if "Stratum" not in df.columns:
+        failures.append("query() has no Stratum column")
+    else:
+        for run in ("legacy", "plain"):
+            if df.loc[(runs == run).to_numpy(), "Stratum"].notna().any():
+                failures.append(f"{run}: Stratum is not null")
+    rows = runs.value_counts().to_dict()
+    if rows != expected:
+        failures.append(f"rows per run {rows}, expected {expected}")
+    wg = strata.whole_genome(df)["run"].astype(str).value_counts().to_dict()
+    if wg != whole:
+        failures.append(f"whole-genome rows per run {wg}, expected {whole}")
+
+    try:
+        n_all = len(warehouse.query("concordance", root=root, where={"Stratum": "all"}))
+        n_bin = len(warehouse.query("concordance", root=root, where={"CovBin": 0}))
+    except Exception as err:  # the failure this check exists for is an ArrowInvalid on a missing field
+        failures.append(f"filter on Stratum / CovBin: {type(err).__name__}: {str(err).splitlines()[0]}")
+    else:
+        if n_all != int((strat_df["Stratum"] == "all").sum()):
+            failures.append(f"where Stratum=all: {n_all} rows")
+        if n_bin != int((strat_df["CovBin"] == 0).sum()):
+            failures.append(f"where CovBin=0: {n_bin} rows")
+
+    failures += check_where_types(work, root, samples)
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(df)} rows from runs {rows}; {len(failures)} failed checks")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check warehouse queries over mixed concordance schemas.")
+    parser.add_argument("--samples", type=int, default=2)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as work:
+        ok = check(work, args.samples)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Synthetic benchmarks_summary / giab_concordance_mqc / alignstats TSVs with
+the columns of data/us_west_2d/*, for benchmarking the bin/ scripts at any
+size without real runs.
+
+The tables follow the daylily layout: per sample a dirsetup task; per
+aligner alNsort, mrkdup and QC tasks; per aligner x caller the call shards
+plus concat.fofn, merge and concordance; one concordance row per sample,
+pipeline and SNPClass; one alignstats row per sample and aligner.  Thread
+counts, runtimes, memory and I/O per rule family are drawn around the
+medians of the us-west-2d runs, so aggregates and figures look like the
+real ones.
+
+Shards default to the real layout (24 for deep / clair3, 73 for oct / lfq2,
+1 for sentd and the SV callers); --shards N gives every caller N shards.
+
+--strata / --cov-bins / --footprints write a stratified concordance table:
+every combination of GIAB stratification region, coverage bin and
+comparison footprint gets its rows next to the whole-genome ones (Stratum
+'all', CovBin -2, CmpFootprint wgsHC), with recall and precision lower in
+the hard regions and the low coverage bins.  The rows multiply quickly, so
+the table is written one sample at a time.
+
+  python bench/synth.py -o /tmp/synth --samples 70
+  python bench/synth.py -o /tmp/synth --samples 7 --aligners 5 --callers 8 --shards 100
+  python bench/synth.py -o /tmp/synth --samples 28 --strata 40 --cov-bins 12 --footprints 1
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "bin"))
+from daylily_giab import metrics  # noqa: E402
+from daylily_giab.rules import CALLERS as RULE_CALLERS  # noqa: E402
+
+BENCHMARK_COLUMNS = [
+    "sample", "rule", "s", "h:m:s", "max_rss", "max_vms", "max_uss", "max_pss", "io_in", "io_out",
+    "mean_load", "cpu_time", "hostname", "ip", "nproc", "cpu_efficiency", "instance_type", "region_az",
+    "spot_cost", "snakemake_threads", "task_cost",
+]
+
+CONCORDANCE_COLUMNS = [
+    "mqc_id", "SNPClass", "Sample", "TgtRegionSize", "TN", "FN", "TP", "FP", "Fscore",
+    "Sensitivity-Recall", "Specificity", "FDR", "PPV", "Precision", "AltId", "CmpFootprint",
+    "AllVarMeanDP", "CovBin", "Aligner", "SNVCaller",
+]
+
+ALIGNSTATS_COLUMNS = """
+sample aligner AlignedBases AlignedBasesPct AlignedReadLengthMean AlignedReadLengthMedian
+AlignedReadLengthMode AlignedReadLengthStandardDeviation ChimericReadPairPct DeletedBases DeletedBasesPct
+DuplicateBases DuplicateBasesPct DuplicateReads DuplicateReadsPct FilteredRecords FilteredRecordsPct
+InputFileName InputFileSize InsertSizeMean InsertSizeMedian InsertSizeMode InsertSizeStandardDeviation
+InsertedBases InsertedBasesPct MappedBases MappedBasesPct MappedReads MappedReadsPct MatchedBases
+MatchedBasesPct MismatchedBases MismatchedBasesPct PerfectBases PerfectBasesPct PerfectReads PerfectReadsPct
+Q20Bases Q20BasesPct R1AlignedBases R1AlignedBasesPct R1AlignedReadLengthMean R1AlignedReadLengthMedian
+R1AlignedReadLengthMode R1AlignedReadLengthStandardDeviation R1DeletedBases R1DeletedBasesPct R1InsertedBases
+R1InsertedBasesPct R1MappedBases R1MappedBasesPct R1MappedReads R1MappedReadsPct R1MatchedBases
+R1MatchedBasesPct R1MismatchedBases R1MismatchedBasesPct R1PerfectBases R1PerfectBasesPct R1PerfectReads
+R1PerfectReadsPct R1Q20Bases R1Q20BasesPct R1SoftClippedBases R1SoftClippedBasesPct R1SoftClippedReads
+R1SoftClippedReadsPct R1UnmappedBases R1UnmappedBasesPct R1UnmappedReads R1UnmappedReadsPct R1UnpairedReads
+R1UnpairedReadsPct R1YieldBases R1YieldReads R2AlignedBases R2AlignedBasesPct R2AlignedReadLengthMean
+R2AlignedReadLengthMedian R2AlignedReadLengthMode R2AlignedReadLengthStandardDeviation R2DeletedBases
+R2DeletedBasesPct R2InsertedBases R2InsertedBasesPct R2MappedBases R2MappedBasesPct R2MappedReads
+R2MappedReadsPct R2MatchedBases R2MatchedBasesPct R2MismatchedBases R2MismatchedBasesPct R2PerfectBases
+R2PerfectBasesPct R2PerfectReads R2PerfectReadsPct R2Q20Bases R2Q20BasesPct R2SoftClippedBases
+R2SoftClippedBasesPct R2SoftClippedReads R2SoftClippedReadsPct R2UnmappedBases R2UnmappedBasesPct
+R2UnmappedReads R2UnmappedReadsPct R2UnpairedReads R2UnpairedReadsPct R2YieldBases R2YieldReads
+SoftClippedBases SoftClippedBasesPct SoftClippedReads SoftClippedReadsPct TotalPairs TotalRecords
+TotalSameChrPairs TotalSameChrPairsPct UnfilteredRecords UnfilteredRecordsPct UnmappedBases UnmappedBasesPct
+UnmappedReads UnmappedReadsPct UnpairedReads UnpairedReadsPct WgsAlignedReads WgsAlignedReadsPct
+WgsCalculatedAlignedReads WgsCovDuplicateReads WgsCovDuplicateReadsPct WgsCoverageBases1 WgsCoverageBases10
+WgsCoverageBases100 WgsCoverageBases1000 WgsCoverageBases1000Pct WgsCoverageBases100Pct WgsCoverageBases10Pct
+WgsCoverageBases15 WgsCoverageBases15Pct WgsCoverageBases1Pct WgsCoverageBases20 WgsCoverageBases20Pct
+WgsCoverageBases30 WgsCoverageBases30Pct WgsCoverageBases40 WgsCoverageBases40Pct WgsCoverageBases50
+WgsCoverageBases500 WgsCoverageBases500Pct WgsCoverageBases50Pct WgsCoverageBases60 WgsCoverageBases60Pct
+WgsCoverageBases70 WgsCoverageBases70Pct WgsCoverageMean WgsCoverageMedian WgsCoverageStandardDeviation
+WgsExpectedAlignedReads WgsFilteredLowBaseQualityBases WgsFilteredOverlapBases WgsReadsPaired
+WgsReadsPairedWithMates WgsTotalReads YieldBases YieldReads
+""".split()
+
+ALIGNERS = ["bwa2a", "sent", "strobe"]
+
+CALLERS = ["deep", "clair3", "oct", "lfq2", "sentd"]
+
+SNP_CLASSES = ["All", "DEL_50", "DEL_gt50", "INS_50", "INS_gt50", "Indel_50", "Indel_gt50", "SNPts", "SNPtv"]
+
+# per-caller call shards of the us-west-2d runs
+DEFAULT_SHARDS = {"deep": 24, "clair3": 24, "oct": 73, "lfq2": 73}
+
+# rule family -> (snakemake_threads, median s, max_rss MB, io_in MB, io_out MB, busy cores)
+PROFILES = {
+    "dirsetup": (1, 0.23, 14, 0, 0, 0.0),
+    "alNsort": (192, 2195, 357000, 16276, 44057, 77),
+    "mrkdup": (192, 665, 686000, 11221, 39904, 77),
+    "mrkdup.sort.picard": (32, 444, 1494, 446, 1.4, 0.2),
+    "alignstats": (32, 782, 985, 266, 0.25, 1.2),
+    "mosdepth": (16, 812, 2935, 548, 5010, 0.7),
+    "deep.call": (64, 1101, 37728, 2721, 3590, 17),
+    "clair3.call": (64, 1348, 81395, 2054, 1668, 5),
+    "oct.call": (64, 220, 21222, 854, 19, 33),
+    "lfq2.call": (1, 2554, 357, 257, 3.6, 1),
+    "sentd.call": (192, 622, 35402, 39924, 6739, 147),
+    "call": (64, 1174, 25527, 3832, 8119, 0.7),
+    "concat.fofn": (2, 0.5, 18, 0, 0, 0.03),
+    "merge": (4, 16, 90, 224, 127, 1.8),
+    "concordance": (32, 219, 85235, 498, 542, 1.2),
+}
+
+ALIGNER_STEPS = ["alNsort", "mrkdup", "mrkdup.sort.picard", "alignstats", "mosdepth"]
+
+CALLER_STEPS = ["concat.fofn", "merge", "concordance"]
+
+# (instance_type, nproc, spot $/h) of the us-west-2d runs
+INSTANCES = [
+    ("m6i.metal", 128, 1.9662),
+    ("r6i.metal", 128, 3.6786),
+    ("c7i.metal-48xl", 192, 2.7177),
+    ("m7i.48xlarge", 192, 3.3048),
+    ("m7i.metal-48xl", 192, 3.2800),
+    ("r7i.metal-48xl", 192, 3.7129),
+]
+
+# truth variants per SNPClass of a 30x WGS (TP + FN)
+CLASS_TRUTH = {
+    "All": 3.9e6, "SNPts": 2.2e6, "SNPtv": 1.05e6, "Indel_50": 5.5e5, "INS_50": 2.7e5, "DEL_50": 2.8e5,
+    "Indel_gt50": 1.1e4, "INS_gt50": 5.5e3, "DEL_gt50": 5.5e3,
+}
+
+TARGET_REGION = 2512291789.0
+
+# GIAB v3 stratification regions (name, share of the truth variants, difficulty 0-1)
+GIAB_STRATA = [
+    ("alldifficultregions", 0.22, 0.6), ("notinalldifficultregions", 0.78, 0.05),
+    ("AllTandemRepeatsandHomopolymers_slop5", 0.09, 0.7), ("alllowmapandsegdupregions", 0.06, 0.8),
+    ("lowmappabilityall", 0.05, 0.75), ("segdups", 0.03, 0.85), ("MHC", 0.002, 0.5),
+    ("gclt25orgt65_slop50", 0.01, 0.4), ("gc15_slop50", 0.001, 0.55), ("gc85_slop50", 0.002, 0.5),
+    ("HG002_CNV", 0.004, 0.45), ("chrX_PAR", 0.001, 0.3), ("satellites_slop5", 0.008, 0.9),
+    ("L1H_gt500", 0.004, 0.65), ("SimpleRepeat_diTR_11to50_slop5", 0.02, 0.6),
+    ("SimpleRepeat_homopolymer_7to11_slop5", 0.05, 0.5),
+]
+
+# comparison footprints beyond the whole-genome wgsHC (name, share of the truth variants)
+FOOTPRINTS = [("exomeHC", 0.015), ("chr20HC", 0.02), ("cmrgHC", 0.001)]
+
+
+def names(requested, known, prefix):
+    """The first `requested` of `known` (an int), or the given list; extra names get a prefix."""
+    if not isinstance(requested, int):
+        return list(requested)
+    return list(known[:requested]) + [f"{prefix}{i}" for i in range(len(known), requested)]
+
+
+def shard_names(n):
+    """n shard suffixes parse_rules understands: '1-24', chromosomes, or 50 Mb windows."""
+    if n <= 1:
+        return ["1-24"]
+    if n <= 24:
+        return [str(i + 1) for i in range(n)]
+    window = 50_000_000
+    return [f"{i % 24 + 1}~{(i // 24) * window + 1}-{(i // 24 + 1) * window}" for i in range(n)]
+
+
+def task_rules(aligners, callers, shards=None):
+    """(rule, family) of every task of one sample."""
+    rules = [("dirsetup", "dirsetup")]
+    for aligner in aligners:
+        rules += [(f"{aligner}.{step}", step) for step in ALIGNER_STEPS]
+        for caller in callers:
+            n = shards if shards is not None else DEFAULT_SHARDS.get(caller, 1)
+            family = f"{caller}.call" if f"{caller}.call" in PROFILES else "call"
+            rules += [(f"{aligner}.{caller}.{shard}", family) for shard in shard_names(n)]
+            rules += [(f"{aligner}.{caller}.{step}", step) for step in CALLER_STEPS]
+    return rules
+
+
+def sample_names(n_samples):
+    return [f"RIH0_ANA0-HG{i + 1:03d}-19" for i in range(n_samples)]
+
+
+def benchmarks(samples, aligners, callers, shards=None, region_az="us-west-2d", rng=None):
+    """One benchmarks_summary row per sample and task."""
+    rng = rng or np.random.default_rng(0)
+    rules = task_rules(aligners, callers, shards)
+    n = len(samples) * len(rules)
+    profile = np.array([PROFILES[family] for _, family in rules] * len(samples), dtype="float64")
+    threads, median_s, rss, io_in, io_out, busy = profile.T
+
+    s = median_s * rng.lognormal(0.0, 0.25, n)
+    rss = rss * rng.lognormal(0.0, 0.1, n)
+    busy = np.minimum(busy * rng.lognormal(0.0, 0.15, n), threads)
+    cpu_time = busy * s
+    pick = rng.integers(0, len(INSTANCES), n)
+    instance = np.array([i[0] for i in INSTANCES], dtype=object)[pick]
+    nproc = np.array([i[1] for i in INSTANCES])[pick]
+    spot = np.array([i[2] for i in INSTANCES])[pick]
+    threads = np.minimum(threads, nproc)
+    secs = s.astype("int64")
+
+    return pd.DataFrame({
+        "sample": np.repeat(samples, len(rules)),
+        "rule": [rule for rule, _ in rules] * len(samples),
+        "s": s.round(4),
+        "h:m:s": [f"{h}:{m:02d}:{x:02d}" for h, m, x in zip(secs // 3600, secs // 60 % 60, secs % 60)],
+        "max_rss": rss.round(2),
+        "max_vms": (rss * 3 + 1000).round(2),
+        "max_uss": (rss * 0.98).round(2),
+        "max_pss": (rss * 0.99).round(2),
+        "io_in": (io_in * rng.lognormal(0.0, 0.2, n)).round(2),
+        "io_out": (io_out * rng.lognormal(0.0, 0.2, n)).round(2),
+        "mean_load": (busy * 100).round(2),
+        "cpu_time": cpu_time.round(2),
+        "hostname": [f"i{p}-dy-{t.split('.')[0].replace('i', '')}-{k}"
+                     for p, t, k in zip(nproc, instance, rng.integers(1, 25, n))],
+        "ip": [f"10.0.{a}.{b}" for a, b in zip(rng.integers(0, 4, n), rng.integers(2, 255, n))],
+        "nproc": nproc,
+        "cpu_efficiency": np.round(cpu_time / s, 4),
+        "instance_type": instance,
+        "region_az": region_az,
+        "spot_cost": spot,
+        "snakemake_threads": threads.astype("int64"),
+        "task_cost": np.round(spot * s * threads / nproc / 3600, 6),
+    }, columns=BENCHMARK_COLUMNS)
+
+
+def strata_levels(strata=0, cov_bins=0, footprints=0):
+    """
+    (CmpFootprint, Stratum, CovBin) levels with their share of the truth
+    variants and difficulty; the first level of each is the whole genome.
+    """
+    regions = GIAB_STRATA[:strata] + [(f"stratum{i}", 0.01, 0.5) for i in range(len(GIAB_STRATA), strata)]
+    # coverage bins of 5x; the low bins hold few variants and are hard
+    depth = 5 * np.arange(cov_bins) + 2.5
+    share = np.exp(-0.5 * ((depth - 30) / 8) ** 2)
+    share = share / share.sum() if cov_bins else share
+    extra = (FOOTPRINTS + [(f"fp{i}HC", 0.01) for i in range(len(FOOTPRINTS), footprints)])[:footprints]
+    return {
+        "CmpFootprint": [("wgsHC", 1.0, 0.0)] + [(f, s, 0.1) for f, s in extra],
+        "Stratum": [("all", 1.0, 0.0)] + regions,
+        "CovBin": [(-2, 1.0, 0.0)] + [(b, s, float(np.clip((15 - d) / 15, 0, 1)))
+                                      for b, (d, s) in enumerate(zip(depth, share))],
+    }
+
+
+def concordance(samples, aligners, callers, snp_classes, rng=None, strata=0, cov_bins=0, footprints=0):
+    """
+    One giab_concordance_mqc row per sample, pipeline and SNPClass, times
+    every stratum level when strata / cov_bins / footprints are given (see
+    strata_levels; the Stratum column is only written then).
+    """
+    rng = rng or np.random.default_rng(0)
+    stratified = bool(strata or cov_bins or footprints)
+    levels = strata_levels(strata, cov_bins, footprints)
+    keys = pd.MultiIndex.from_product([samples, aligners, callers, snp_classes],
+                                      names=["sample", "Aligner", "SNVCaller", "SNPClass"]).to_frame(index=False)
+    if stratified:
+        # every key once per combination of the stratum levels
+        combos = pd.MultiIndex.from_product([range(len(v)) for v in levels.values()]).to_frame(index=False)
+        combos = combos.to_numpy()
+        share, hardness = np.ones(len(combos)), np.zeros(len(combos))
+        for j, values in enumerate(levels.values()):
+            share *= np.array([v[1] for v in values])[combos[:, j]]
+            hardness += np.array([v[2] for v in values])[combos[:, j]]
+        n_keys = len(keys)
+        keys = keys.loc[np.repeat(np.arange(n_keys), len(combos))].reset_index(drop=True)
+        for j, (column, values) in enumerate(levels.items()):
+            keys[column] = np.array([v[0] for v in values], dtype=object)[np.tile(combos[:, j], n_keys)]
+        fraction = np.tile(share, n_keys)
+        difficulty = np.tile(np.minimum(hardness, 1.0), n_keys)
+    else:
+        difficulty = np.zeros(len(keys))
+    n = len(keys)
+    truth = keys["SNPClass"].map(CLASS_TRUTH).fillna(1e5).to_numpy() * rng.lognormal(0.0, 0.02, n)
+    if stratified:
+        truth = truth * fraction
+    hard = keys["SNPClass"].str.contains("gt50").to_numpy()
+    recall = np.where(hard, rng.beta(60, 40, n), rng.beta(995, 5, n)) ** (1 + 30 * difficulty)
+    precision = np.where(hard, rng.beta(70, 30, n), rng.beta(996, 4, n)) ** (1 + 20 * difficulty)
+    tp = np.round(truth * recall)
+    fn = np.round(truth) - tp
+    fp = np.round(tp * (1 / precision - 1))
+    tn = TARGET_REGION - tp - fn - fp
+    computed = metrics.compute_metrics(tp, fp, fn, tn)
+
+    sample = keys["sample"] + "_DBC0_0"
+    out = pd.DataFrame({
+        "mqc_id": sample + "-" + keys["Aligner"] + "-" + keys["SNVCaller"] + "-" + keys["SNPClass"],
+        "SNPClass": keys["SNPClass"],
+        "Sample": sample,
+        "TgtRegionSize": TARGET_REGION,
+        "TN": tn, "FN": fn, "TP": tp, "FP": fp,
+        **computed,
+        "AltId": keys["sample"].str.extract(r"(HG\d+)", expand=False),
+        "CmpFootprint": keys["CmpFootprint"] if stratified else "wgsHC",
+        "AllVarMeanDP": -1,
+        "CovBin": keys["CovBin"].astype("int64") if stratified else -2,
+        "Aligner": keys["Aligner"],
+        "SNVCaller": keys["SNVCaller"],
+    })
+    if not stratified:
+        return out[CONCORDANCE_COLUMNS]
+    out["mqc_id"] = (out["mqc_id"] + "-" + keys["CmpFootprint"] + "-" + keys["Stratum"]
+                     + "-" + keys["CovBin"].astype(str))
+    out["AllVarMeanDP"] = np.where(out["CovBin"] >= 0, 5 * out["CovBin"] + 2, -1)
+    out["Stratum"] = keys["Stratum"]
+    columns = list(CONCORDANCE_COLUMNS)
+    columns.insert(columns.index("CmpFootprint") + 1, "Stratum")
+    return out[columns]
+
+
+def alignstats(samples, aligners, build="hg38", rng=None):
+    """One alignstats row per sample and aligner; the columns the scripts read are consistent."""
+    rng = rng or np.random.default_rng(0)
+    keys = pd.MultiIndex.from_product([samples, aligners], names=["s", "a"]).to_frame(index=False)
+    n = len(keys)
+    reads = np.round(7.2e8 * rng.lognormal(0.0, 0.05, n))
+    yield_bases = reads * 151
+    coverage = yield_bases / 3.1e9 * 0.9
+
+    out = {}
+    for col in ALIGNSTATS_COLUMNS:
+        if col.endswith("Pct"):
+            out[col] = rng.uniform(0.02, 99.9, n).round(6)
+        elif "Length" in col or "InsertSize" in col:
+            out[col] = rng.uniform(140, 410, n).round(6)
+        else:
+            out[col] = np.round(reads * rng.uniform(0.001, 1.0, n))
+    out.update({
+        "sample": keys["s"] + "_" + keys["a"],
+        "aligner": keys["a"],
+        "InputFileName": ("results/day/" + build + "/" + keys["s"] + "/align/" + keys["a"] + "/"
+                          + keys["s"] + "." + keys["a"] + ".mrkdup.sort.bam"),
+        "YieldReads": reads, "WgsTotalReads": reads, "R1YieldReads": reads / 2, "R2YieldReads": reads / 2,
+        "YieldBases": yield_bases, "R1YieldBases": yield_bases / 2, "R2YieldBases": yield_bases / 2,
+        "AlignedBases": np.round(yield_bases * 0.979),
+        "WgsCoverageMean": coverage.round(6),
+        "WgsCoverageMedian": np.round(coverage),
+    })
+    return pd.DataFrame(out, columns=ALIGNSTATS_COLUMNS)
+
+
+def generate(out_dir, n_samples=7, aligners=ALIGNERS, callers=CALLERS, snp_classes=SNP_CLASSES,
+             shards=None, build="hg38", region_az="us-west-2d", seed=0, strata=0, cov_bins=0, footprints=0):
+    """
+    Write <build>_synth<n_samples>_{benchmarks_summary,giab_concordance_mqc,alignstats}.tsv
+    into out_dir; aligners / callers may be counts or name lists.  A
+    stratified concordance table (strata / cov_bins / footprints, see
+    concordance) is written one sample at a time.
+    Returns {"benchmarks": path, "concordance": path, "alignstats": path}.
+    """
+    rng = np.random.default_rng(seed)
+    aligners = names(aligners, ALIGNERS, "aln")
+    callers = names(callers, list(CALLERS) + [c for c in RULE_CALLERS if c not in CALLERS], "call")
+    unknown = [c for c in callers if c not in RULE_CALLERS]
+    if unknown:
+        raise ValueError(f"Callers must be one of {', '.join(RULE_CALLERS)}; got {', '.join(unknown)}")
+    samples = sample_names(n_samples)
+
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.join(out_dir, f"{build}_synth{n_samples}")
+    stratified = bool(strata or cov_bins or footprints)
+    tables = {
+        "benchmarks": (f"{stem}_benchmarks_summary.tsv",
+                       benchmarks(samples, aligners, callers, shards, region_az, rng)),
+        "concordance": (f"{stem}_giab_concordance_mqc.tsv",
+                        None if stratified else concordance(samples, aligners, callers, snp_classes, rng)),
+        "alignstats": (f"{stem}_alignstats.tsv", alignstats(samples, aligners, build, rng)),
+    }
+    for path, table in tables.values():
+        if table is not None:
+            table.to_csv(path, sep="\t", index=False)
+    if stratified:
+        path = tables["concordance"][0]
+        for i, sample in enumerate(samples):
+            part = concordance([sample], aligners, callers, snp_classes, rng, strata, cov_bins, footprints)
+            part.to_csv(path, sep="\t", index=False, mode="w" if i == 0 else "a", header=i == 0)
+    return {kind: path for kind, (path, _) in tables.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic benchmark, concordance and alignstats TSVs.")
+    parser.add_argument("-o", "--output-dir", required=True)
+    parser.add_argument("--samples", type=int, default=7, help="Samples (default: 7, today's runs)")
+    parser.add_argument("--aligners", type=int, default=len(ALIGNERS), help="Aligner count (default: 3)")
+    parser.add_argument("--callers", type=int, default=len(CALLERS),
+                        help=f"Caller count, at most {len(RULE_CALLERS)} (default: {len(CALLERS)})")
+    parser.add_argument("--classes", default=",".join(SNP_CLASSES), help="Comma-separated SNPClasses")
+    parser.add_argument("--shards", type=int, default=None, help="Call shards per caller (default: real layout)")
+    parser.add_argument("--build", default="hg38")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--strata", type=int, default=0,
+                        help=f"GIAB stratification regions per concordance row (the first {len(GIAB_STRATA)} are "
+                             "real names; default: 0, no Stratum column)")
+    parser.add_argument("--cov-bins", type=int, default=0, help="5x coverage bins (CovBin 0..N-1; default: 0)")
+    parser.add_argument("--footprints", type=int, default=0,
+                        help="Comparison footprints besides wgsHC (default: 0)")
+    args = parser.parse_args()
+
+    paths = generate(args.output_dir, args.samples, args.aligners, args.callers,
+                     [c.strip() for c in args.classes.split(",") if c.strip()], args.shards,
+                     build=args.build, seed=args.seed, strata=args.strata, cov_bins=args.cov_bins,
+                     footprints=args.footprints)
+    for kind, path in paths.items():
+        print(f"Saved: {path}")
+
+
+if __name__ == "__main__":
+    main()
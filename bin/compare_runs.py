@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Compare runs of the same GIAB samples: builds (b37 vs hg38), regions
+(us-west-2d vs eu-central-1c) or pipeline variants (see
+bin/daylily_giab/deltas.py).  Runs are aligned on (GIAB AltId, aligner,
+caller, SNPClass, normalized rule), and every run is compared with the first
+(or --baseline).
+
+Runs come from manifest TSVs with the columns of generate_meta_analysis.py
+--runs (region, run, benchmarks, concordance, alignstats; alignstats is not
+used).  benchmarks may be an aggregated_task_metrics.csv or a raw
+benchmarks_summary.tsv.
+
+Writes, for --output-prefix <prefix>:
+  <prefix>_deltas.tsv             every matched key and metric, with base_value, value, delta, rel_delta
+  <prefix>_ranked.tsv             the --top largest relative differences per run and metric
+  <prefix>_pipelines.tsv          per run, pipeline (and SNPClass): relative change of totals / median
+  <prefix>_coverage.tsv           keys per run and how many the baseline shares
+  <prefix>_<run>_heatmap.png      pipelines x metrics, coloured by improvement over the baseline
+
+Example:
+  python bin/compare_runs.py data/compare_runs.tsv -o cross_run --classes All,SNPts,SNPtv,Indel_50
+"""
+
+import argparse
+
+import numpy as np
+
+from daylily_giab import deltas
+from daylily_giab.figures import DEFAULT_SAVE, add_output_arguments, parse_list, save_figure, save_options_from_args
+from daylily_giab.meta_analysis import read_manifests
+
+
+def plot_delta_heatmap(pipelines, run, baseline, out_png, classes=("All",), save=DEFAULT_SAVE):
+    """
+    Pipelines (rows) x metrics (columns) for one run against the baseline:
+    cells are annotated with the relative change and coloured by improvement
+    (blue better, red worse), each column scaled to its largest change so
+    0.01% accuracy shifts and 30% cost shifts both show.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    matrix, improvement = deltas.delta_matrix(pipelines, run, classes=classes)
+    scale = improvement.abs().max().replace(0, 1.0)  # columns without any change stay white
+    colour = (improvement / scale).astype("float64")
+    labels = matrix.map(lambda v: "" if np.isnan(v) else f"{100 * v:+.2f}%")
+
+    fig, ax = plt.subplots(figsize=(max(6, 1.5 * matrix.shape[1] + 3), max(4, 0.4 * matrix.shape[0] + 2)))
+    sns.heatmap(colour, annot=labels, fmt="", cmap="RdBu", vmin=-1, vmax=1, center=0, cbar=False,
+                linewidths=0.5, linecolor="white", annot_kws={"fontsize": 8}, ax=ax)
+    ax.set_facecolor("#eeeeee")  # pipelines or metrics the two runs do not share
+    ax.set_xlabel("")
+    ax.set_ylabel("Pipeline", fontsize=11)
+    ax.set_title(f"{run} vs {baseline}: relative change (blue better, red worse; colour scaled per column)",
+                 fontsize=11)
+    plt.xticks(rotation=30, ha="right")
+    fig.tight_layout()
+    return save_figure(fig, out_png, save)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-key deltas between runs of the same GIAB samples.")
+    parser.add_argument("manifests", nargs="+", help="Run manifest TSV(s) or globs (see generate_meta_analysis --runs)")
+    parser.add_argument("-o", "--output-prefix", default="cross_run", help="Prefix of the outputs")
+    parser.add_argument("--baseline", default=None, help="Run every other run is compared with (default: the first)")
+    parser.add_argument("--runs", type=parse_list, default=None, help="Comma-separated subset of the manifest runs")
+    parser.add_argument("--classes", type=parse_list, default=["All", "SNPts", "SNPtv", "Indel_50"],
+                        help="SNPClasses whose Fscore the heatmaps show (default: All,SNPts,SNPtv,Indel_50)")
+    parser.add_argument("--top", type=int, default=25, help="Rows per run and metric in the ranked table")
+    parser.add_argument("--no-plots", action="store_true", help="Only write the tables")
+    add_output_arguments(parser)
+    args = parser.parse_args()
+
+    runs = [r for r in read_manifests(args.manifests) if args.runs is None or r["run"] in args.runs]
+    if len(runs) < 2:
+        parser.error("need at least two runs to compare")
+    baseline = args.baseline or runs[0]["run"]
+
+    tables = [deltas.run_table(run) for run in runs]
+    aligned = deltas.align_runs(tables, baseline)
+    pipelines = deltas.pipeline_deltas(aligned)
+    outputs = [("deltas", aligned), ("ranked", deltas.ranked(aligned, args.top)), ("pipelines", pipelines),
+               ("coverage", deltas.coverage(tables, baseline))]
+    for name, table in outputs:
+        table.to_csv(f"{args.output_prefix}_{name}.tsv", sep="\t", index=False)
+        print(f"Saved: {args.output_prefix}_{name}.tsv")
+
+    if not args.no_plots:
+        save = save_options_from_args(args)
+        for run in aligned["run"].unique():
+            out_png = f"{args.output_prefix}_{run}_heatmap.png"
+            print(f"Saved: {plot_delta_heatmap(pipelines, run, baseline, out_png, args.classes, save)}")
+
+    for row in outputs[3][1].itertuples(index=False):
+        print(f"{row.run} {row.kind}: {row.matched}/{row.n_keys} keys shared with {baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Pool concordance counts over any grouping and recompute every metric
+(bin/daylily_giab/metrics.py); optionally cross-check the stored columns.
+
+Examples:
+  # micro + macro (over samples) averages per pipeline, SNPts + SNPtv pooled
+  python bin/concordance_metrics.py -i data/us_west_2d/hg38_7giab_us-west-2d_giab_concordance_mqc.tsv \\
+      --by Aligner,SNVCaller --classes SNPts,SNPtv -o pipeline_snp.tsv
+
+  # per SNPClass and pipeline, every sample pooled
+  python bin/concordance_metrics.py -i <concordance.tsv> --by SNPClass,Aligner,SNVCaller
+
+  # per GIAB stratification region of a stratified table
+  python bin/concordance_metrics.py -i <stratified_concordance.tsv> --by Stratum,Aligner,SNVCaller --classes SNPts,SNPtv
+
+  # stored Fscore/Recall/... vs. recomputed; exits 1 on mismatches
+  python bin/concordance_metrics.py -i <concordance.tsv> --check
+"""
+
+import argparse
+import sys
+
+from daylily_giab import loaders, metrics, strata
+from daylily_giab.figures import parse_list
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Recompute concordance metrics from pooled TP/FP/FN/TN counts.")
+    parser.add_argument("-i", "--input", required=True, help="giab_concordance_mqc.tsv")
+    parser.add_argument("--by", type=parse_list, default=["Aligner", "SNVCaller"],
+                        help="Comma-separated grouping columns (default: Aligner,SNVCaller)")
+    parser.add_argument("--over", default="Sample",
+                        help="Column the macro average is taken over (default: Sample)")
+    parser.add_argument("--classes", type=parse_list, default=None,
+                        help="Only pool these SNPClasses (default: all rows, so group by SNPClass too)")
+    parser.add_argument("--check", action="store_true",
+                        help="Compare stored metric columns with recomputed values instead")
+    parser.add_argument("--atol", type=float, default=1e-9, help="Cross-check tolerance (default: 1e-9)")
+    parser.add_argument("-o", "--output", default=None, help="Output TSV (default: stdout)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    df = loaders.load_concordance(args.input)
+
+    if args.check:
+        mismatches = metrics.cross_check(df, atol=args.atol)
+        print(f"{len(mismatches)} mismatching values in {len(df)} rows (atol={args.atol})", file=sys.stderr)
+        if len(mismatches):
+            mismatches.to_csv(args.output or sys.stdout, sep="\t", index=False)
+        sys.exit(1 if len(mismatches) else 0)
+
+    # Stratified tables: every level of the strata grouped by, the whole-genome level of the others
+    df = strata.select_strata(df, keep=args.by)
+    if args.over in args.by:
+        out = metrics.pooled(df, args.by, classes=args.classes)
+    else:
+        out = metrics.summarize(df, args.by, over=args.over, classes=args.classes)
+    out.to_csv(args.output or sys.stdout, sep="\t", index=False)
+
+
+if __name__ == "__main__":
+    main()
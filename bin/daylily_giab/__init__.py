@@ -0,0 +1,72 @@
+"""
+Shared helpers for the daylily GIAB analysis scripts in bin/.
+
+The table side is also a library: with bin/ on sys.path,
+
+  import daylily_giab as giab
+  df = giab.prepare_benchmarks(giab.load_benchmarks("hg38_benchmarks_summary.tsv"))
+  aggregated = giab.aggregate_benchmarks(df)
+  matrix = giab.heatmap_matrix(giab.prepare_concordance(giab.load_concordance(path)), "SNPts")
+
+The names below are resolved on first use, so `import daylily_giab` costs
+nothing, and none of them imports matplotlib or seaborn.
+"""
+
+import importlib
+
+# Public name -> submodule that defines it
+_API = {
+    # typed, cached input tables
+    "load_benchmarks": "loaders",
+    "load_concordance": "loaders",
+    "load_alignstats": "loaders",
+    "load_aggregated_metrics": "loaders",
+    "load_spot_prices": "loaders",
+    "prepare_concordance": "loaders",
+    "iter_table": "loaders",
+    # benchmark aggregations (<prefix>_aggregated_task_metrics.csv, shard tables)
+    "prepare_benchmarks": "benchmarks",
+    "aggregate_benchmarks": "benchmarks",
+    "shard_metrics": "benchmarks",
+    "chromosome_summary": "benchmarks",
+    "write_tables": "benchmarks",
+    # meta_ana rows
+    "build_rows": "meta_analysis",
+    "meta_table": "meta_analysis",
+    "write_tsv": "meta_analysis",
+    "stream_meta_analysis": "meta_analysis",
+    "read_manifests": "meta_analysis",
+    # coverage-normalized cost model
+    "alignstats_features": "costmodel",
+    # concordance matrices and metrics
+    "class_table": "concordance",
+    "heatmap_matrix": "concordance",
+    "heatmap_cube": "concordance",
+    "cube_class": "concordance",
+    "cluster_order": "concordance",
+    "compute_metrics": "metrics",
+    "with_metrics": "metrics",
+    "pooled": "metrics",
+    "pool_classes": "metrics",
+    "summarize": "metrics",
+    # stratified concordance (CovBin, CmpFootprint, Stratum)
+    "whole_genome": "strata",
+    "select_strata": "strata",
+    "pool_strata": "strata",
+    "drilldown": "strata",
+    "worst_strata": "strata",
+}
+
+__all__ = sorted(_API)
+
+
+def __getattr__(name):
+    if name in _API:
+        value = getattr(importlib.import_module(f"{__name__}.{_API[name]}"), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_API))
@@ -0,0 +1,101 @@
+"""
+Benchmark tables of a Snakemake benchmarks_summary.tsv, without plotting:
+parsed-rule columns, the per (sample, normalized_rule) aggregation written
+as <prefix>_aggregated_task_metrics.csv, and the shard tables.
+
+  df = prepare_benchmarks(load_benchmarks(path))
+  aggregated = aggregate_benchmarks(df)
+  shards = shard_metrics(df); chromosome_summary(shards)
+"""
+
+from daylily_giab.reduce import grouped_sum
+from daylily_giab.rules import RULE_COLUMNS, parse_rules
+from daylily_giab.samples import normalize_samples
+
+
+def prepare_benchmarks(df):
+    """
+    Add HG_sample plus the parsed-rule columns (aligner, caller, step, shard,
+    shard_chrom/start/end, normalized_rule) used by every plot.
+    """
+    # Calculate theoretical minimum CPU time
+    # df["theoretical_min_cost"] = df["task_cost"] * (1-df["cpu_efficiency"])
+
+    # GIAB sample identifier (HG00#)
+    df["HG_sample"] = normalize_samples(df["sample"])["AltId"]
+
+    # Split every rule into aligner/caller/step/shard in one pass; shards fold into normalized_rule
+    parsed = parse_rules(df["rule"])
+    for col in RULE_COLUMNS:
+        df[col] = parsed[col]
+    return df
+
+
+def aggregate_benchmarks(df):
+    """
+    Aggregate metrics for each sample and normalized rule.
+    All reductions are vectorized; Total_runtime_cpu uses grouped_sum() so the
+    values match the former per-group (cpu_time * threads).sum() exactly.
+    """
+    grouped = df.groupby(["sample", "normalized_rule"], observed=True)
+    aggregated_df = grouped.agg(
+        Total_runtime_user=("s", "sum"),
+        Total_cost=("task_cost", "sum"),
+        Total_snake_threads=("snakemake_threads", "sum"),
+        Avg_cpu_efficiency=("cpu_efficiency", "mean"),
+        Avg_task_cost=("task_cost", "mean")
+    )
+
+    # Multiply cpu_time by threads before summing to get "Total_runtime_cpu":
+    cpu_x_threads = (df["cpu_time"] * df["snakemake_threads"]).to_numpy()
+    aggregated_df.insert(1, "Total_runtime_cpu",
+                         grouped_sum(cpu_x_threads, grouped.ngroup().to_numpy(), grouped.ngroups))
+    aggregated_df = aggregated_df.reset_index()
+
+    # Compute Runtime_cpu_per_vcpu (optional)
+    aggregated_df["Runtime_cpu_per_vcpu"] = (
+        aggregated_df["Total_runtime_cpu"] / aggregated_df["Total_snake_threads"]
+    )
+    return aggregated_df
+
+
+def shard_metrics(df):
+    """
+    One row per sharded caller task: wall time, cost and the core-seconds the
+    task reserved but did not use (snakemake_threads * s - cpu_time).
+    """
+    shards = df[df["shard"].notna()].copy()
+    shards["shard_bp"] = shards["shard_end"] - shards["shard_start"] + 1
+    shards["reserved_core_s"] = shards["s"] * shards["snakemake_threads"]
+    shards["idle_core_s"] = (shards["reserved_core_s"] - shards["cpu_time"]).clip(lower=0)
+    cols = ["sample", "aligner", "caller", "shard", "shard_chrom", "shard_start", "shard_end", "shard_bp",
+            "s", "cpu_time", "snakemake_threads", "cpu_efficiency", "task_cost",
+            "reserved_core_s", "idle_core_s"]
+    return shards[cols]
+
+
+def chromosome_summary(shards):
+    """Per (aligner, caller, chromosome) distribution of shard runtime and cost."""
+    summary = shards.groupby(["aligner", "caller", "shard_chrom"], observed=True).agg(
+        n_shards=("s", "size"),
+        runtime_median=("s", "median"),
+        runtime_max=("s", "max"),
+        runtime_sum=("s", "sum"),
+        cost_sum=("task_cost", "sum"),
+        idle_core_s=("idle_core_s", "sum"),
+    ).reset_index()
+    # max/median > 1 means the chromosome has straggler shards
+    summary["runtime_max_over_median"] = summary["runtime_max"] / summary["runtime_median"]
+    return summary
+
+
+def write_tables(df, aggregated_df, prefix):
+    """Save aggregated metrics, task cost data and the parsed rule / shard tables as <prefix>_*.csv."""
+    aggregated_df.to_csv(f"{prefix}_aggregated_task_metrics.csv", index=False)
+    df[["sample", "rule", "task_cost", "HG_sample"]].to_csv(f"{prefix}_task_costs.csv", index=False)
+
+    df[["rule"] + RULE_COLUMNS].drop_duplicates("rule").sort_values("rule").to_csv(
+        f"{prefix}_parsed_rules.csv", index=False)
+    shards = shard_metrics(df)
+    shards.to_csv(f"{prefix}_shard_metrics.csv", index=False)
+    chromosome_summary(shards).to_csv(f"{prefix}_shard_chrom_summary.csv", index=False)
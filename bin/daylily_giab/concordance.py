@@ -0,0 +1,91 @@
+"""
+Per-SNPClass tables of a prepared concordance table (loaders.prepare_concordance),
+without plotting: the Pipeline x Sample matrix behind each heatmap and the
+per-sample points behind the recall / precision scatter and boxplots.
+
+  df = prepare_concordance(load_concordance(path))
+  matrix = heatmap_matrix(df, "SNPts")                 # Pipeline rows, Sample columns
+  points = class_table(df, "SNPts", ["Sample", "Pipeline", "Fscore"])
+
+For many classes, one pivot serves them all, and cluster_order() gives a
+similarity ordering of the rows (or, on matrix.T, the columns):
+
+  cube = heatmap_cube(df)                              # Pipeline rows, (SNPClass, Sample) columns
+  matrix = cube_class(cube, "SNPts")
+  matrix = matrix.iloc[cluster_order(matrix), cluster_order(matrix.T)]
+"""
+
+import numpy as np
+
+
+def class_table(df, snp_class, columns=None):
+    """Rows of one SNPClass, optionally only `columns`."""
+    subset = df[df["SNPClass"] == snp_class]
+    return subset if columns is None else subset[list(columns)]
+
+
+def heatmap_matrix(df, snp_class, metric_col="Fscore"):
+    """
+    Mean metric_col per Pipeline (rows) and Sample (columns) for one SNPClass.
+    Pairs without a concordance row stay NaN; the heatmap draws them masked
+    (grey) and leaves them out of the colour range.
+    """
+    return class_table(df, snp_class).pivot_table(
+        index="Pipeline", columns="Sample", values=metric_col, aggfunc="mean", observed=True)
+
+
+def heatmap_cube(df, metric_col="Fscore"):
+    """
+    Mean metric_col per Pipeline (rows) and (SNPClass, Sample) (columns) for
+    all classes in one pivot; only observed class / sample pairs are columns.
+    """
+    return df.pivot_table(index="Pipeline", columns=["SNPClass", "Sample"], values=metric_col, aggfunc="mean",
+                          observed=True)
+
+
+def cube_class(cube, snp_class):
+    """
+    The heatmap_matrix of one SNPClass out of a heatmap_cube: Pipeline rows
+    and Sample columns, without the pipelines and samples the class lacks.
+    """
+    matrix = cube.xs(snp_class, axis=1, level="SNPClass").dropna(axis=0, how="all").dropna(axis=1, how="all")
+    return matrix
+
+
+def _distances(values):
+    """RMS difference of every pair of rows over the columns both have (NaN: none shared)."""
+    ok = ~np.isnan(values)
+    v = np.where(ok, values, 0.0)
+    o = ok.astype("float64")
+    sq = (v * v) @ o.T + o @ (v * v).T - 2 * v @ v.T
+    shared = o @ o.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.sqrt(np.clip(sq, 0, None) / shared)
+
+
+def cluster_order(matrix):
+    """
+    Row order of a (possibly sparse) matrix by average-linkage hierarchical
+    clustering of the rows, as positions for .iloc.  Rows are compared on
+    the columns both have; pairs without any are treated as the farthest.
+    """
+    n = len(matrix)
+    if n < 3:
+        return np.arange(n)
+    dist = _distances(matrix.to_numpy(dtype="float64"))
+    dist[np.isnan(dist)] = np.nanmax(dist) if np.isfinite(dist).any() else 0.0
+    np.fill_diagonal(dist, np.inf)
+    size = np.ones(n)
+    members = [[i] for i in range(n)]
+    for _ in range(n - 1):
+        i, j = np.unravel_index(np.argmin(dist), dist.shape)
+        i, j = min(i, j), max(i, j)
+        # Lance-Williams update for average linkage; the merged cluster takes slot i
+        merged = (size[i] * dist[i] + size[j] * dist[j]) / (size[i] + size[j])
+        dist[i], dist[:, i] = merged, merged
+        dist[i, i] = np.inf
+        dist[j], dist[:, j] = np.inf, np.inf
+        size[i] += size[j]
+        members[i] = members[i] + members[j]
+        members[j] = []
+    return np.asarray(members[0])
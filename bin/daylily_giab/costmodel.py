@@ -0,0 +1,206 @@
+"""
+Coverage-normalized cost model: per-pipeline cost and wall time regressed on
+the alignstats of each sample, then projected to a standard 30x genome or
+any other target coverage.
+
+  table = join_alignstats(pipeline_points(meta), alignstats_features(stats))
+  fits = fit(table)                         one row per pipeline and target
+  proj = project(fits, table, [30, 60])     one row per pipeline and coverage
+
+The pipeline points are meta_ana caller rows with their aligner's own rows
+(alNsort, mrkdup, QC) added (pareto.pipeline_points), so a cost is the cost
+of the whole pipeline for one sample.  The alignstats are joined on (run,)
+Sample and aligner, with every alignstats column kept, so any of them can be
+a feature next to the derived ones in FEATURES.
+
+Model, per (run, aligner, var_caller) -- or any other grouping `by` -- and
+target (cost_per_task, wall_time):
+
+  y = b0 + sum_j b_j x_j       x = gbases, coverage, dup_pct (by default)
+
+fitted by ridge regression towards a proportional prior: b_gbases starts at
+the pipeline's median y / gbases and every other slope at 0, with penalty
+shrinkage * n * mean(x_j^2) * (b_j - prior_j)^2 and no penalty on b0.  A
+slope change that moves the prediction at typical x by d costs as much as n
+residuals of d, so only data spanning a wide range of x can pull a slope
+away from the prior: a batch of 7 samples between 29x and 31x projects cost
+in proportion to yield, a history from 15x to 60x fits its own slopes.  All
+pipelines are solved in one batched np.linalg.solve, not a loop over groups.
+
+Runs are fitted separately by default: builds, regions and campaigns cost
+several times more or less for the same pipeline at the same coverage (bwa2a
++ deep at ~30x: $5, $8 or $40 per sample in data/meta_runs.tsv), and a
+pooled fit only absorbs that spread into the intercept.  by=POOLED fits one
+model per pipeline over all runs; use it only for runs from one build and
+region.  Tables without a run column (one run) are grouped by the rest of by.
+
+A projection at coverage c uses gbases = c * the pipeline's median
+gbases / coverage, and the pipeline's median of every other feature.
+"""
+
+import numpy as np
+import pandas as pd
+
+from daylily_giab.samples import normalize_samples
+
+# feature name -> (alignstats column, scale)
+FEATURES = {
+    "gbases": ("YieldBases", 1e-9),
+    "coverage": ("WgsCoverageMean", 1.0),
+    "dup_pct": ("DuplicateReadsPct", 1.0),
+}
+DEFAULT_FEATURES = list(FEATURES)
+
+TARGETS = ["cost_per_task", "wall_time"]
+
+GROUP = ["run", "aligner", "var_caller"]
+
+# One model per pipeline across every run (opt in)
+POOLED = ["aligner", "var_caller"]
+
+
+def alignstats_features(alignstats):
+    """
+    An alignstats table keyed by (run,) Sample and aligner (run-local
+    sample IDs, see samples.normalize_samples), with the FEATURES added
+    and every numeric alignstats column kept.
+    """
+    numeric = alignstats.select_dtypes("number")
+    keys = pd.DataFrame({
+        "Sample": normalize_samples(alignstats["sample"], alignstats["aligner"])["sample"].to_numpy(),
+        "aligner": alignstats["aligner"].astype(str).to_numpy(),
+    }, index=alignstats.index)
+    if "run" in alignstats.columns:
+        keys.insert(0, "run", alignstats["run"].astype(str))
+    derived = pd.DataFrame({name: alignstats[col].to_numpy(dtype="float64") * scale
+                            for name, (col, scale) in FEATURES.items()}, index=alignstats.index)
+    return pd.concat([keys, derived, numeric], axis=1)
+
+
+def join_alignstats(points, features):
+    """points (one row per run, Sample and pipeline) with the alignstats features of their Sample and aligner."""
+    keys = [k for k in ["run", "Sample", "aligner"] if k in points.columns and k in features.columns]
+    features = features.drop_duplicates(keys)
+    overlap = [c for c in features.columns if c in points.columns and c not in keys]
+    return points.drop(columns=overlap).merge(features, on=keys, how="inner")
+
+
+def _group(table, by):
+    """by without 'run' when the table has no run column (a single run)."""
+    return [c for c in by if c != "run" or c in table.columns]
+
+
+def _design(table, features, targets, by):
+    """Padded [G, N, 1 + P] design, [G, N, T] targets and [G, N] row mask, one group per pipeline."""
+    table = table.dropna(subset=list(features) + list(targets))
+    groups = table.groupby(list(by), sort=True)
+    g = groups.ngroup().to_numpy()
+    pos = groups.cumcount().to_numpy()
+    labels = groups.size().reset_index()[list(by)]
+    n_max = int(pos.max()) + 1 if len(pos) else 0
+    x = np.zeros((len(labels), n_max, 1 + len(features)))
+    y = np.zeros((len(labels), n_max, len(targets)))
+    mask = np.zeros((len(labels), n_max), dtype=bool)
+    x[g, pos, 0] = 1.0
+    x[g, pos, 1:] = table[list(features)].to_numpy(dtype="float64")
+    y[g, pos] = table[list(targets)].to_numpy(dtype="float64")
+    mask[g, pos] = True
+    return labels, x, y, mask
+
+
+def fit(table, features=DEFAULT_FEATURES, targets=TARGETS, shrinkage=1.0, by=GROUP):
+    """
+    Per pipeline (by) and target: n, r2, rmse (in-sample), intercept and one
+    coefficient column per feature (in the feature's units).
+    """
+    features, targets = list(features), list(targets)
+    labels, x, y, mask = _design(table, features, targets, _group(table, by))
+    n = mask.sum(axis=1).astype("float64")
+
+    # penalty weights: pooled mean square of each feature (intercept unpenalized)
+    rows = x[mask][:, 1:]
+    square = (rows ** 2).mean(axis=0) if len(rows) else np.ones(len(features))
+    weights = np.concatenate([[0.0], np.where(square > 0, square, 1.0)])
+    penalty = shrinkage * n[:, None, None] * np.diag(weights)[None]
+
+    prior = np.zeros((len(labels), 1 + len(features), len(targets)))
+    if "gbases" in features:
+        col = 1 + features.index("gbases")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratio = np.where(mask[..., None] & (x[..., col:col + 1] > 0), y / x[..., col:col + 1], np.nan)
+        prior[:, col, :] = np.nan_to_num(np.nanmedian(np.where(mask[..., None], ratio, np.nan), axis=1))
+
+    lhs = np.einsum("gnp,gnq->gpq", x, x) + penalty
+    rhs = np.einsum("gnp,gnt->gpt", x, y) + penalty @ prior
+    beta = np.linalg.solve(lhs, rhs)  # [G, 1 + P, T]
+
+    resid = np.where(mask[..., None], y - np.einsum("gnp,gpt->gnt", x, beta), 0.0)
+    mean = (y * mask[..., None]).sum(axis=1) / n[:, None]
+    ss_tot = (np.where(mask[..., None], y - mean[:, None, :], 0.0) ** 2).sum(axis=1)
+    ss_res = (resid ** 2).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r2 = np.where(ss_tot > 0, 1 - ss_res / ss_tot, np.nan)
+
+    frames = []
+    for t, target in enumerate(targets):
+        out = labels.copy()
+        out["target"] = target
+        out["n"] = n.astype(int)
+        out["r2"] = r2[:, t]
+        out["rmse"] = np.sqrt(ss_res[:, t] / n)
+        out["intercept"] = beta[:, 0, t]
+        for j, feature in enumerate(features):
+            out[feature] = beta[:, 1 + j, t]
+        frames.append(out)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _features_of(fits, by):
+    return [c for c in fits.columns if c not in list(by) + ["target", "n", "r2", "rmse", "intercept"]]
+
+
+def predict(fits, table, by=GROUP):
+    """table (rows with the by columns and the fitted features) with predicted_<target> per fitted target."""
+    by = _group(fits, by)
+    features = _features_of(fits, by)
+    out = table.copy()
+    for target, coefs in fits.groupby("target", sort=False):
+        coefs = out[list(by)].merge(coefs, on=list(by), how="left")
+        values = coefs["intercept"].to_numpy(dtype="float64").copy()
+        for feature in features:
+            values += coefs[feature].to_numpy(dtype="float64") * out[feature].to_numpy(dtype="float64")
+        out[f"predicted_{target}"] = values
+    return out
+
+
+def typical_features(table, features, by=GROUP):
+    """Per pipeline: gbases_per_x (median gbases / coverage) and the median of every feature."""
+    by = _group(table, by)
+    per_x = table.assign(gbases_per_x=table["gbases"] / table["coverage"])
+    return per_x.groupby(list(by), sort=True)[["gbases_per_x"] + list(features)].median().reset_index()
+
+
+def project(fits, table, coverages=(30.0,), by=GROUP):
+    """
+    Predicted targets per pipeline at each coverage, with cost_per_gbase and
+    gbases_per_hour (Gbases per hour of summed task wall time) when cost
+    and wall time are fitted.
+    """
+    by = _group(fits, by)
+    features = _features_of(fits, by)
+    typical = typical_features(table, features, by)
+    frames = []
+    for coverage in coverages:
+        at = typical.copy()
+        at.insert(len(by), "target_coverage", float(coverage))
+        if "gbases" in at.columns:
+            at["gbases"] = coverage * at["gbases_per_x"]
+        if "coverage" in at.columns:
+            at["coverage"] = float(coverage)
+        frames.append(at)
+    out = predict(fits, pd.concat(frames, ignore_index=True), by)
+    if "predicted_cost_per_task" in out.columns:
+        out["cost_per_gbase"] = out["predicted_cost_per_task"] / (out["target_coverage"] * out["gbases_per_x"])
+    if "predicted_wall_time" in out.columns:
+        out["gbases_per_hour"] = out["target_coverage"] * out["gbases_per_x"] / (out["predicted_wall_time"] / 3600)
+    return out
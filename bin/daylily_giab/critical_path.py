@@ -0,0 +1,147 @@
+"""
+Per-sample task DAG, critical path and shard-imbalance idle time from the
+Snakemake benchmarks (after generate_benchmark_plots.prepare_benchmarks).
+
+Every variant-calling pipeline (sample, aligner, caller) is a chain of stages
+
+  dirsetup -> alNsort -> mrkdup -> call (one task per shard, in parallel)
+           -> concat.fofn -> merge -> concordance
+
+dirsetup runs once per run and alNsort/mrkdup once per (sample, aligner);
+they feed every pipeline of the run / every caller of that aligner.  With
+unlimited hosts a stage ends when its slowest task does, so the critical path
+is the sum of the stage maxima and the call stage's slowest shard is its
+straggler.  Tasks of other steps (QC, SV post-processing) are off the calling
+path and ignored.
+
+The benchmarks carry no timestamps, so stage_table()'s start_s/end_s are the
+as-soon-as-possible schedule implied by the DAG, not the observed one.
+Shards that finish before the stage's slowest shard leave their reserved
+cores idle until the barrier:
+barrier_idle_core_s = sum over shards of (max_s - s) * threads.
+"""
+
+import numpy as np
+import pandas as pd
+
+STAGES = ["dirsetup", "alNsort", "mrkdup", "call", "concat.fofn", "merge", "concordance"]
+
+# Stages shared by every pipeline of the run (dirsetup) or of a sample + aligner.
+RUN_STAGES = ["dirsetup"]
+ALIGNER_STAGES = ["alNsort", "mrkdup"]
+
+PIPELINE_KEYS = ["sample", "aligner", "caller"]
+
+
+def _stage_tasks(df):
+    """Calling-path tasks with plain-string keys and reserved core-seconds."""
+    tasks = df.loc[df["step"].isin(STAGES),
+                   ["sample", "aligner", "caller", "step", "shard", "rule", "s", "cpu_time",
+                    "snakemake_threads"]].copy()
+    for col in ["sample", "aligner", "caller", "step", "shard", "rule"]:
+        tasks[col] = tasks[col].astype(object)
+    tasks["reserved_core_s"] = tasks["s"] * tasks["snakemake_threads"]
+    return tasks
+
+
+def stage_table(df):
+    """
+    One row per (sample, aligner, caller, stage) with the stage duration
+    (max task s), n_tasks, work_s (sum of s), reserved_core_s and cpu_s,
+    plus asap start_s / end_s along the pipeline's chain.
+    """
+    tasks = _stage_tasks(df)
+    agg = dict(n_tasks=("s", "size"), stage_s=("s", "max"), work_s=("s", "sum"),
+               reserved_core_s=("reserved_core_s", "sum"), cpu_s=("cpu_time", "sum"))
+
+    own = tasks[tasks["caller"].notna()]
+    pipelines = own[PIPELINE_KEYS].drop_duplicates()
+    parts = [own.groupby(PIPELINE_KEYS + ["step"], sort=False).agg(**agg).reset_index()]
+
+    by_aligner = tasks[tasks["step"].isin(ALIGNER_STAGES)].groupby(
+        ["sample", "aligner", "step"], sort=False).agg(**agg).reset_index()
+    parts.append(pipelines.merge(by_aligner, on=["sample", "aligner"]))
+
+    by_run = tasks[tasks["step"].isin(RUN_STAGES)].groupby("step", sort=False).agg(**agg).reset_index()
+    parts.append(pipelines.merge(by_run, how="cross"))
+
+    stages = pd.concat(parts, ignore_index=True)
+    stages["stage_order"] = stages["step"].map({s: i for i, s in enumerate(STAGES)})
+    stages = stages.sort_values(PIPELINE_KEYS + ["stage_order"], kind="stable").reset_index(drop=True)
+
+    stages["end_s"] = stages.groupby(PIPELINE_KEYS, sort=False)["stage_s"].cumsum()
+    stages["start_s"] = stages["end_s"] - stages["stage_s"]
+    return stages.drop(columns="stage_order")
+
+
+def shard_slack(df):
+    """
+    One row per call-stage shard: its s, the slowest shard of the same
+    pipeline (stage_max_s), slack_s = stage_max_s - s, s / stage_max_s and
+    the barrier_idle_core_s it leaves.
+    """
+    tasks = _stage_tasks(df)
+    shards = tasks[tasks["step"] == "call"].copy()
+    stage_max = shards.groupby(PIPELINE_KEYS, sort=False)["s"].transform("max")
+    shards["stage_max_s"] = stage_max
+    shards["slack_s"] = stage_max - shards["s"]
+    shards["rel_s"] = np.where(stage_max > 0, shards["s"] / stage_max, np.nan)
+    shards["barrier_idle_core_s"] = shards["slack_s"] * shards["snakemake_threads"]
+    shards = shards.sort_values(PIPELINE_KEYS + ["s"], ascending=[True, True, True, False], kind="stable")
+    return shards[PIPELINE_KEYS + ["shard", "rule", "s", "snakemake_threads", "stage_max_s",
+                                   "slack_s", "rel_s", "barrier_idle_core_s"]].reset_index(drop=True)
+
+
+def pipeline_table(df, cores=None):
+    """
+    One row per (sample, aligner, caller):
+      critical_path_s        sum of stage maxima (makespan with unlimited hosts)
+      serial_s               sum of every task's s (makespan on one slot)
+      reserved_core_s        sum of s * snakemake_threads
+      makespan_bound_s       max(critical_path_s, reserved_core_s / cores) if cores is given
+      bottleneck_stage       stage with the largest duration
+      call_s, call_share     slowest shard and its share of the critical path
+      n_shards, shard_mean_s, shard_imbalance (max / mean shard s)
+      barrier_idle_core_s    reserved cores idle while shards wait for the straggler
+      straggler_shard        the slowest shard
+    """
+    stages = stage_table(df)
+    grouped = stages.groupby(PIPELINE_KEYS, sort=True)
+    out = grouped.agg(
+        critical_path_s=("stage_s", "sum"),
+        serial_s=("work_s", "sum"),
+        reserved_core_s=("reserved_core_s", "sum"),
+        cpu_s=("cpu_s", "sum"),
+    )
+    out["bottleneck_stage"] = stages.loc[grouped["stage_s"].idxmax().to_numpy(), "step"].to_numpy()
+    if cores:
+        out["makespan_bound_s"] = np.maximum(out["critical_path_s"], out["reserved_core_s"] / cores)
+
+    shards = shard_slack(df)
+    if len(shards):
+        by_pipeline = shards.groupby(PIPELINE_KEYS, sort=True)
+        shard_stats = by_pipeline.agg(
+            n_shards=("s", "size"),
+            call_s=("s", "max"),
+            shard_mean_s=("s", "mean"),
+            barrier_idle_core_s=("barrier_idle_core_s", "sum"),
+        )
+        shard_stats["straggler_shard"] = shards.loc[by_pipeline["s"].idxmax().to_numpy(), "shard"].to_numpy()
+        out = out.join(shard_stats)
+        out["call_share"] = out["call_s"] / out["critical_path_s"]
+        out["shard_imbalance"] = out["call_s"] / out["shard_mean_s"]
+    return out.reset_index()
+
+
+def pipeline_summary(pipelines):
+    """Per (aligner, caller) medians over samples and total barrier idle time."""
+    numeric = {c: (c, "median") for c in ["critical_path_s", "serial_s", "call_share", "shard_imbalance"]
+               if c in pipelines.columns}
+    summary = pipelines.groupby(["aligner", "caller"], sort=True).agg(
+        n_samples=("sample", "size"), **numeric,
+        **({"barrier_idle_core_s": ("barrier_idle_core_s", "sum")}
+           if "barrier_idle_core_s" in pipelines.columns else {}),
+    )
+    summary["bottleneck_stage"] = pipelines.groupby(["aligner", "caller"], sort=True)["bottleneck_stage"].agg(
+        lambda s: s.mode().iloc[0])
+    return summary.reset_index()
@@ -0,0 +1,218 @@
+"""
+Deltas between runs of the same GIAB samples: builds (b37 vs hg38), regions
+(us-west-2d vs eu-central-1c) or pipeline variants.
+
+Each run is reduced to one long table of (kind, AltId, aligner, caller,
+SNPClass, normalized_rule, metric, value):
+
+  accuracy   one row per concordance SNPClass and ACCURACY_METRICS
+  benchmark  one row per aggregated normalized rule and BENCHMARK_METRICS
+
+Samples are keyed by their GIAB AltId (samples.normalize_samples), so the
+RIH/ANA/DBC parts of the sample names may differ between runs; rows whose
+sample has no AltId (run-level rules such as 'all.') keep their run-local
+name.  align_runs() then pivots all runs in one go (runs become columns) and
+every other run is compared with the baseline run (the first):
+
+  delta      value - base_value
+  rel_delta  delta / |base_value|
+  better     True when the change is an improvement (higher accuracy and
+             cpu_efficiency, lower runtime and cost)
+
+Only keys present in both runs get a delta.
+"""
+
+import numpy as np
+import pandas as pd
+
+from daylily_giab import loaders
+from daylily_giab.benchmarks import aggregate_benchmarks, prepare_benchmarks
+from daylily_giab.rules import parse_rules
+from daylily_giab.samples import normalize_samples
+from daylily_giab.strata import whole_genome
+
+KEYS = ["kind", "AltId", "aligner", "caller", "SNPClass", "normalized_rule"]
+
+ACCURACY_METRICS = ["Fscore", "Sensitivity-Recall", "Precision"]
+
+# metric name -> aggregated_task_metrics column
+BENCHMARK_METRICS = {
+    "runtime_s": "Total_runtime_user",
+    "task_cost": "Total_cost",
+    "cpu_efficiency": "Avg_cpu_efficiency",
+}
+
+# Metrics where lower is better; everything else improves upwards
+LOWER_IS_BETTER = {"runtime_s", "task_cost"}
+
+# Metrics that add up over the rules of a pipeline (pipeline_deltas sums them)
+ADDITIVE = {"runtime_s", "task_cost"}
+
+
+def _sample_keys(samples):
+    norm = normalize_samples(samples)
+    return norm["AltId"].fillna(norm["sample"])
+
+
+def _long(wide, kind, metrics):
+    out = wide.melt(id_vars=[k for k in KEYS if k in wide.columns], value_vars=list(metrics),
+                    var_name="metric", value_name="value")
+    out.insert(0, "kind", kind)
+    for key in KEYS:
+        if key not in out.columns:
+            out[key] = ""
+    return out[KEYS + ["metric", "value"]]
+
+
+def accuracy_table(concordance):
+    """Long accuracy rows of a concordance table (all SNPClasses, whole genome, dirsetupunknown dropped)."""
+    concordance = whole_genome(concordance)
+    df = concordance[(concordance["Aligner"] != "dirsetupunknown") & (concordance["SNVCaller"] != "dirsetupunknown")]
+    wide = pd.DataFrame({
+        "AltId": _sample_keys(df["Sample"]).to_numpy(),
+        "aligner": df["Aligner"].astype(str).to_numpy(),
+        "caller": df["SNVCaller"].astype(str).to_numpy(),
+        "SNPClass": df["SNPClass"].astype(str).to_numpy(),
+    })
+    for metric in ACCURACY_METRICS:
+        wide[metric] = df[metric].to_numpy(dtype="float64")
+    return _long(wide, "accuracy", ACCURACY_METRICS)
+
+
+def benchmark_table(aggregated):
+    """Long benchmark rows of an aggregated_task_metrics table (one per sample and normalized rule)."""
+    parsed = parse_rules(aggregated["normalized_rule"])
+    wide = pd.DataFrame({
+        "AltId": _sample_keys(aggregated["sample"]).to_numpy(),
+        "aligner": parsed["aligner"].astype(object).fillna("").to_numpy(),
+        "caller": parsed["caller"].astype(object).fillna("").to_numpy(),
+        "normalized_rule": aggregated["normalized_rule"].astype(str).to_numpy(),
+    })
+    for metric, col in BENCHMARK_METRICS.items():
+        wide[metric] = aggregated[col].to_numpy(dtype="float64")
+    return _long(wide, "benchmark", BENCHMARK_METRICS)
+
+
+def load_aggregated(path):
+    """
+    An aggregated_task_metrics.csv, or a raw benchmarks_summary.tsv
+    aggregated on the fly (the file header tells which).
+    """
+    with open(path) as fh:
+        header = fh.readline()
+    if "normalized_rule" in header:
+        return loaders.load_aggregated_metrics(path)
+    return aggregate_benchmarks(prepare_benchmarks(loaders.load_benchmarks(path)))
+
+
+def run_table(run):
+    """Long table of one manifest run (benchmarks and / or concordance; see meta_analysis.read_manifests)."""
+    parts = []
+    if run.get("concordance"):
+        parts.append(accuracy_table(loaders.load_concordance(run["concordance"])))
+    if run.get("benchmarks"):
+        parts.append(benchmark_table(load_aggregated(run["benchmarks"])))
+    out = pd.concat(parts, ignore_index=True)
+    out.insert(0, "run", run["run"])
+    return out
+
+
+def align_runs(tables, baseline=None):
+    """
+    Deltas of every run against the baseline run (default: the first run)
+    from the run_table()s of two or more runs.  Duplicate keys within a run
+    (e.g. two libraries of one GIAB sample) are averaged.  Columns: run,
+    baseline, KEYS, metric, base_value, value, delta, rel_delta, better.
+    """
+    long = pd.concat(tables, ignore_index=True)
+    runs = list(pd.unique(long["run"]))
+    baseline = runs[0] if baseline is None else baseline
+    if baseline not in runs:
+        raise ValueError(f"baseline run {baseline!r} is not one of {', '.join(runs)}")
+    wide = long.pivot_table(index=KEYS + ["metric"], columns="run", values="value", aggfunc="mean", sort=True)
+    others = [r for r in runs if r != baseline and r in wide.columns]
+
+    base = wide[baseline].to_numpy()
+    values = wide[others].to_numpy()
+    out = pd.DataFrame({
+        "run": np.repeat(np.asarray(others, dtype=object)[None, :], len(wide), axis=0).ravel(),
+        "baseline": baseline,
+        "base_value": np.repeat(base, len(others)),
+        "value": values.ravel(),
+    })
+    keys = wide.index.to_frame(index=False).loc[np.repeat(np.arange(len(wide)), len(others))].reset_index(drop=True)
+    out = pd.concat([out[["run", "baseline"]], keys, out[["base_value", "value"]]], axis=1)
+    out = out.dropna(subset=["base_value", "value"]).reset_index(drop=True)
+    out["delta"] = out["value"] - out["base_value"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["rel_delta"] = np.where(out["base_value"] != 0, out["delta"] / out["base_value"].abs(), np.nan)
+    lower = out["metric"].isin(LOWER_IS_BETTER)
+    out["better"] = np.where(lower, out["delta"] < 0, out["delta"] > 0)
+    return out
+
+
+def coverage(tables, baseline=None):
+    """Keys per run and kind, and how many of them the baseline run also has."""
+    long = pd.concat(tables, ignore_index=True).drop_duplicates(["run"] + KEYS)
+    runs = list(pd.unique(long["run"]))
+    baseline = runs[0] if baseline is None else baseline
+    base_keys = long.loc[long["run"] == baseline, KEYS]
+    long["matched"] = long[KEYS].merge(base_keys.assign(_m=True), on=KEYS, how="left")["_m"].fillna(False).to_numpy()
+    return long.groupby(["run", "kind"], sort=False).agg(n_keys=("matched", "size"),
+                                                         matched=("matched", "sum")).reset_index()
+
+
+def ranked(deltas, top=25):
+    """The `top` largest |rel_delta| per run and metric (|delta| where rel_delta is undefined)."""
+    size = deltas["rel_delta"].abs().fillna(deltas["delta"].abs())
+    order = deltas.assign(_size=size).sort_values("_size", ascending=False, kind="stable")
+    top_rows = order.groupby(["run", "metric"], sort=False).head(top)
+    return top_rows.sort_values(["run", "metric"], kind="stable").drop(columns="_size").reset_index(drop=True)
+
+
+def pipeline_deltas(deltas):
+    """
+    Per run, kind, aligner, caller, SNPClass and metric: matched keys,
+    samples, and rel_delta.  For runtime and cost that is the relative change
+    of the totals over the matched rules and samples; for the other metrics
+    the median per-key rel_delta.
+    """
+    by = ["run", "baseline", "kind", "aligner", "caller", "SNPClass", "metric"]
+    out = deltas.groupby(by, sort=True).agg(
+        n_keys=("delta", "size"),
+        n_samples=("AltId", "nunique"),
+        base_total=("base_value", "sum"),
+        total=("value", "sum"),
+        median_delta=("delta", "median"),
+        median_rel_delta=("rel_delta", "median"),
+        better_share=("better", "mean"),
+    ).reset_index()
+    additive = out["metric"].isin(ADDITIVE)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_rel = np.where(out["base_total"] != 0, out["total"] / out["base_total"] - 1, np.nan)
+    out["rel_delta"] = np.where(additive, total_rel, out["median_rel_delta"])
+    out.loc[~additive, ["base_total", "total"]] = np.nan
+    return out
+
+
+def delta_matrix(pipelines, run, classes=("All",), accuracy_metric="Fscore"):
+    """
+    Pipeline (rows) x column matrix of rel_delta for one run: accuracy_metric
+    per SNPClass in classes, then the BENCHMARK_METRICS.  Alignment-only
+    rows (no caller) only have benchmark columns; rules without aligner or
+    caller are the 'shared' row.  Also returns the matching 'improvement'
+    matrix (rel_delta with lower-is-better metrics negated).
+    """
+    sub = pipelines[pipelines["run"] == run]
+    acc = sub[(sub["kind"] == "accuracy") & (sub["metric"] == accuracy_metric) & sub["SNPClass"].isin(classes)]
+    acc = acc.assign(column=accuracy_metric + " " + acc["SNPClass"])
+    bench = sub[sub["kind"] == "benchmark"].assign(column=lambda d: d["metric"])
+    both = pd.concat([acc, bench], ignore_index=True)
+    both["pipeline"] = both["aligner"].where(both["caller"] == "", both["aligner"] + "-" + both["caller"])
+    both["pipeline"] = both["pipeline"].replace("", "shared")
+    columns = [f"{accuracy_metric} {c}" for c in classes if c in set(acc["SNPClass"])] + \
+        [m for m in BENCHMARK_METRICS if m in set(bench["metric"])]
+    matrix = both.pivot_table(index="pipeline", columns="column", values="rel_delta", aggfunc="first")
+    matrix = matrix.reindex(columns=columns)
+    sign = np.array([-1.0 if c in LOWER_IS_BETTER else 1.0 for c in matrix.columns])
+    return matrix, matrix * sign
@@ -0,0 +1,85 @@
+"""
+Headless figure output shared by the plotting scripts.
+
+Figures are never shown; save_figure() writes the requested format at the
+requested DPI and closes the figure so batch runs do not accumulate them.
+
+Formats:
+  png     raster, honours --dpi
+  svg     vector
+  pdf     vector
+  vector  pdf with every artist forced to vector output (no rasterized
+          layers, e.g. large heatmap meshes); DPI only affects sizing hints
+
+matplotlib is only imported by save_figure(), so table-only commands can
+use the argument helpers without paying for it.
+"""
+
+import argparse
+from collections import namedtuple
+
+from daylily_giab import tracing
+
+FORMATS = ("png", "svg", "pdf", "vector")
+
+# Named DPI profiles; --dpi overrides.
+DPI_PROFILES = {
+    "publication": 300,
+    "screen": 150,
+    "preview": 60,
+}
+
+SaveOptions = namedtuple("SaveOptions", ["fmt", "dpi"])
+DEFAULT_SAVE = SaveOptions(fmt="png", dpi=DPI_PROFILES["publication"])
+
+
+def add_output_arguments(parser):
+    """Add --format / --dpi / --profile to an argparse parser."""
+    group = parser.add_argument_group("figure output")
+    group.add_argument("--format", choices=FORMATS, default="png",
+                       help="Figure format (default: png). 'vector' = pdf with no rasterized artists")
+    group.add_argument("--profile", choices=sorted(DPI_PROFILES), default="publication",
+                       help="DPI profile: publication=300, screen=150, preview=60 (default: publication)")
+    group.add_argument("--dpi", type=int, default=None, help="Explicit DPI; overrides --profile")
+    return parser
+
+
+def save_options_from_args(args):
+    dpi = args.dpi if args.dpi is not None else DPI_PROFILES[args.profile]
+    return SaveOptions(fmt=args.format, dpi=dpi)
+
+
+def output_path(path, save=DEFAULT_SAVE):
+    """Swap a '.png' output name for the selected format's extension."""
+    ext = "pdf" if save.fmt == "vector" else save.fmt
+    if path.endswith(".png"):
+        path = path[:-len(".png")]
+    return f"{path}.{ext}"
+
+
+def save_figure(fig, path, save=DEFAULT_SAVE, close=True, **kwargs):
+    """
+    Save fig to path (extension adjusted to save.fmt) and close it unless close=False
+    (used when the same figure is saved again, e.g. the PvR zoom).
+    Returns the path written.
+    """
+    out = output_path(path, save)
+    if save.fmt == "vector":
+        for artist in fig.findobj():
+            if hasattr(artist, "set_rasterized"):
+                artist.set_rasterized(False)
+    with tracing.figure(out):
+        fig.savefig(out, dpi=save.dpi, format="pdf" if save.fmt == "vector" else save.fmt, **kwargs)
+    if close:
+        import matplotlib.pyplot as plt
+
+        plt.close(fig)
+    return out
+
+
+def parse_list(value):
+    """'a,b , c' -> ['a', 'b', 'c'] (argparse type for comma-separated options)."""
+    items = [v.strip() for v in value.split(",") if v.strip()]
+    if not items:
+        raise argparse.ArgumentTypeError("expected a comma-separated list")
+    return items
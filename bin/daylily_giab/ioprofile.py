@@ -0,0 +1,116 @@
+"""
+I/O throughput and memory pressure per rule, from the Snakemake benchmarks
+(after generate_benchmark_plots.prepare_benchmarks).
+
+io_in / io_out are MB read / written and max_rss / max_pss MB, so per task
+
+  read_mb_s, write_mb_s   io_in / s, io_out / s
+  mem_peak_mb             max(max_rss, max_pss)
+  mem_per_thread_mb       mem_peak_mb / snakemake_threads
+  instance_mem_mb         RAM of the task's instance type (simulate.INSTANCE_TYPES)
+  mem_headroom_mb         instance_mem_mb - mem_peak_mb
+
+and three pressures, each 1.0 at "saturated":
+
+  cpu  busy cores / threads (busy cores as in rightsizing.task_scaling)
+  io   (read + write MB/s) / io_ref_mb_s, the volume throughput a task could
+       count on (default 125 MB/s, the gp3 EBS baseline)
+  mem  mem_peak_mb / the RAM that comes with the task's reserved threads,
+       threads * instance_mem_mb / vCPUs; above 1 memory, not cores, limits
+       how many such tasks share an instance
+
+A rule is CPU-, I/O- or memory-bound by its largest pressure, or 'idle'
+when none reaches min_pressure (default 0.1): its reserved threads mostly
+wait (short bookkeeping rules, single-threaded tools given many threads),
+which is a right-sizing rather than a hardware question.  A high io
+pressure is where faster local NVMe pays off; a cpu-bound rule with low mem
+pressure fits a smaller (compute-optimized) instance.
+"""
+
+import numpy as np
+import pandas as pd
+
+from daylily_giab.rightsizing import rule_family, task_scaling
+from daylily_giab.simulate import INSTANCE_TYPES
+
+CLASSES = ["cpu", "io", "mem"]
+
+IDLE = "idle"
+
+PROFILE_KEYS = ["region_az", "pipeline", "family"]
+
+
+def pipeline_label(df):
+    """'<aligner>-<caller>', the aligner alone for alignment rules, 'shared' for neither."""
+    aligner = df["aligner"].astype(object)
+    caller = df["caller"].astype(object)
+    label = aligner.where(caller.isna(), aligner.fillna("") + "-" + caller)
+    return label.fillna("shared")
+
+
+def task_profile(df, io_ref_mb_s=125.0, min_pressure=0.1):
+    """Per-task throughput, memory and cpu / io / mem pressures with the bound class."""
+    scaling = task_scaling(df)
+    threads = scaling["threads"].clip(lower=1).to_numpy()
+    s = scaling["s"].to_numpy()
+    instance = df["instance_type"].astype(object)
+    vcpus = instance.map({k: v[0] for k, v in INSTANCE_TYPES.items()}).fillna(df["nproc"]).to_numpy(dtype="float64")
+    instance_mem_mb = instance.map({k: v[1] * 1024 for k, v in INSTANCE_TYPES.items()}).to_numpy(dtype="float64")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        read = np.where(s > 0, df["io_in"].to_numpy(dtype="float64") / s, 0.0)
+        write = np.where(s > 0, df["io_out"].to_numpy(dtype="float64") / s, 0.0)
+    mem_peak = scaling["mem_peak_mb"].to_numpy()
+    mem_share = threads * instance_mem_mb / vcpus
+
+    out = pd.DataFrame({
+        "region_az": df["region_az"].astype(object).to_numpy(),
+        "instance_type": df["instance_type"].astype(object).to_numpy(),
+        "pipeline": pipeline_label(df).to_numpy(),
+        "family": rule_family(df).to_numpy(),
+        "threads": threads,
+        "s": s,
+        "read_mb_s": read,
+        "write_mb_s": write,
+        "io_mb_s": read + write,
+        "mem_peak_mb": mem_peak,
+        "mem_per_thread_mb": mem_peak / threads,
+        "instance_mem_mb": instance_mem_mb,
+        "mem_headroom_mb": instance_mem_mb - mem_peak,
+        "cpu_pressure": np.clip(scaling["busy_cores"].to_numpy() / threads, 0, None),
+        "io_pressure": (read + write) / io_ref_mb_s,
+        "mem_pressure": mem_peak / mem_share,
+    }, index=df.index)
+    out["bound"] = classify(out, min_pressure)
+    return out
+
+
+def classify(table, min_pressure=0.1):
+    """'cpu', 'io' or 'mem' by the largest *_pressure column, 'idle' if none reaches min_pressure."""
+    pressures = np.nan_to_num(table[[f"{c}_pressure" for c in CLASSES]].to_numpy(dtype="float64"), nan=-np.inf)
+    best = np.asarray(CLASSES, dtype=object)[np.argmax(pressures, axis=1)]
+    return np.where(pressures.max(axis=1) >= min_pressure, best, IDLE)
+
+
+def rule_profile(tasks, keys=PROFILE_KEYS, min_pressure=0.1):
+    """
+    One row per group of keys (default region_az, pipeline, family): tasks,
+    median throughput and pressures, peak memory, the smallest headroom, and
+    the bound class of the median pressures.
+    """
+    out = tasks.groupby(keys, sort=True).agg(
+        n_tasks=("s", "size"),
+        threads=("threads", "median"),
+        median_s=("s", "median"),
+        read_mb_s=("read_mb_s", "median"),
+        write_mb_s=("write_mb_s", "median"),
+        peak_io_mb_s=("io_mb_s", "max"),
+        mem_peak_mb=("mem_peak_mb", "max"),
+        mem_per_thread_mb=("mem_per_thread_mb", "median"),
+        min_headroom_mb=("mem_headroom_mb", "min"),
+        cpu_pressure=("cpu_pressure", "median"),
+        io_pressure=("io_pressure", "median"),
+        mem_pressure=("mem_pressure", "median"),
+    )
+    out["bound"] = classify(out, min_pressure)
+    return out.reset_index()
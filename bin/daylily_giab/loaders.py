@@ -0,0 +1,323 @@
+"""
+Typed, cached loaders for the daylily benchmark / concordance / alignstats tables.
+
+Each source TSV/CSV is parsed once into a typed DataFrame (categorical
+Sample/Aligner/SNVCaller/rule columns, declared numeric columns) and written
+to a Parquet cache keyed by the sha256 of the file contents.  Later loads of
+an unchanged file read the Parquet copy; editing the source changes its hash,
+so the cache refreshes itself and the stale copy is removed.
+
+Stratified concordance tables run to tens of millions of rows: sources over
+CHUNKED_PARSE_BYTES are parsed in chunks when the cache is built, and
+load_table(..., columns=[...]) reads only the named columns from the cache.
+
+The cache directory defaults to ~/.cache/daylily_giab and can be moved with
+the DAYLILY_GIAB_CACHE environment variable.  Without pyarrow the loaders
+still return typed frames, they just skip the cache.
+"""
+
+import hashlib
+import os
+import glob
+
+import pandas as pd
+
+from daylily_giab.strata import whole_genome
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PARQUET = True
+except ImportError:
+    HAVE_PARQUET = False
+
+# Bump when a schema below changes so old caches are not reused.
+SCHEMA_VERSION = 2
+
+# Sources above this size are parsed in chunks of CHUNKED_PARSE_ROWS rows when the cache is built
+CHUNKED_PARSE_BYTES = 256 << 20
+CHUNKED_PARSE_ROWS = 1_000_000
+
+CACHE_DIR = os.environ.get(
+    "DAYLILY_GIAB_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "daylily_giab")
+)
+
+# --------------------------------------------------------------------------
+# Schemas: categorical columns, free-text columns and declared numeric dtypes.
+# Columns not listed in a schema are coerced to numeric.
+# --------------------------------------------------------------------------
+SCHEMAS = {
+    # Snakemake benchmarks_summary.tsv
+    "benchmarks": {
+        "sep": "\t",
+        "categorical": ["sample", "rule", "hostname", "ip", "instance_type", "region_az"],
+        "string": ["h:m:s"],
+        "numeric": {
+            "s": "float64",
+            "max_rss": "float64",
+            "max_vms": "float64",
+            "max_uss": "float64",
+            "max_pss": "float64",
+            "io_in": "float64",
+            "io_out": "float64",
+            "mean_load": "float64",
+            "cpu_time": "float64",
+            "nproc": "int64",
+            "cpu_efficiency": "float64",
+            "spot_cost": "float64",
+            "snakemake_threads": "int64",
+            "task_cost": "float64",
+        },
+    },
+    # giab_concordance_mqc.tsv; stratified tables add Stratum and real CovBin / CmpFootprint levels
+    "concordance": {
+        "sep": "\t",
+        "categorical": ["SNPClass", "Sample", "AltId", "CmpFootprint", "Stratum", "Aligner", "SNVCaller"],
+        "string": ["mqc_id"],
+        "numeric": {
+            "TgtRegionSize": "float64",
+            "TN": "float64",
+            "FN": "float64",
+            "TP": "float64",
+            "FP": "float64",
+            "Fscore": "float64",
+            "Sensitivity-Recall": "float64",
+            "Specificity": "float64",
+            "FDR": "float64",
+            "PPV": "float64",
+            "Precision": "float64",
+            "AllVarMeanDP": "int32",
+            "CovBin": "int16",
+        },
+    },
+    # alignstats.tsv (~165 numeric columns, all coerced)
+    "alignstats": {
+        "sep": "\t",
+        "categorical": ["sample", "aligner"],
+        "string": ["InputFileName"],
+        "numeric": {},
+    },
+    # <identifier>_<build>_aggregated_task_metrics.csv from generate_benchmark_plots.py
+    "aggregated": {
+        "sep": ",",
+        "categorical": ["sample", "normalized_rule"],
+        "string": [],
+        "numeric": {
+            "Total_runtime_user": "float64",
+            "Total_runtime_cpu": "float64",
+            "Total_cost": "float64",
+            "Total_snake_threads": "int64",
+            "Avg_cpu_efficiency": "float64",
+            "Avg_task_cost": "float64",
+            "Runtime_cpu_per_vcpu": "float64",
+        },
+    },
+}
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the sha256 hex digest of a file's contents."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _coerce_numeric(series, dtype):
+    """pd.to_numeric(errors='coerce'), then the declared dtype where it fits."""
+    values = pd.to_numeric(series, errors="coerce")
+    if dtype.startswith("int") and values.isna().any():
+        # Missing values in an integer column: keep float64 rather than fail.
+        return values.astype("float64")
+    return values.astype(dtype)
+
+
+def _read_options(schema):
+    text_cols = set(schema["categorical"]) | set(schema["string"])
+    return dict(
+        sep=schema["sep"],
+        dtype={c: str for c in text_cols},
+        # Parse floats exactly as float() would, so cached values match the text.
+        float_precision="round_trip",
+    )
+
+
+def _apply_schema(df, schema):
+    for col in df.columns:
+        if col in schema["categorical"]:
+            df[col] = df[col].astype("category")
+        elif col in schema["string"]:
+            continue
+        else:
+            df[col] = _coerce_numeric(df[col], schema["numeric"].get(col, "float64"))
+    return df
+
+
+def _usecols(columns):
+    return None if columns is None else (lambda c: c in columns)
+
+
+def parse_table(path, kind, columns=None):
+    """
+    Parse a raw table into a typed DataFrame according to SCHEMAS[kind].
+    This is the uncached path; most callers want load_table().
+    """
+    schema = SCHEMAS[kind]
+    return _apply_schema(pd.read_csv(path, usecols=_usecols(columns), **_read_options(schema)), schema)
+
+
+def iter_table(path, kind, chunksize=100_000, columns=None):
+    """
+    Yield a table as typed chunks of at most chunksize rows, without loading
+    (or caching) the whole file.  columns limits the parsed columns; names
+    missing from the file are ignored.
+    """
+    if kind not in SCHEMAS:
+        raise ValueError(f"Unknown table kind '{kind}'. Expected one of: {', '.join(SCHEMAS)}")
+    schema = SCHEMAS[kind]
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=_usecols(columns), **_read_options(schema)):
+        yield _apply_schema(chunk, schema)
+
+
+def _cache_path(path, kind, digest):
+    abspath = os.path.abspath(path)
+    stem = os.path.basename(abspath)
+    path_tag = hashlib.sha256(abspath.encode()).hexdigest()[:8]
+    prefix = f"{stem}-{path_tag}.{kind}.v{SCHEMA_VERSION}"
+    return prefix, os.path.join(CACHE_DIR, f"{prefix}.{digest[:16]}.parquet")
+
+
+def _parse_to_parquet(path, kind, out):
+    """
+    Parse a source larger than CHUNKED_PARSE_BYTES chunk by chunk into one
+    Parquet file, one row group per chunk, so the peak memory is one chunk
+    rather than the whole table.  Categorical columns are written with int32
+    dictionary indices and string values in every row group, so chunks with
+    different (or no) categories share the first chunk's schema; reading the
+    file unifies the dictionaries back into one categorical.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = schema = None
+    try:
+        for chunk in iter_table(path, kind, CHUNKED_PARSE_ROWS):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                fields = [pa.field(f.name, pa.dictionary(pa.int32(), pa.string()))
+                          if pa.types.is_dictionary(f.type) else f for f in table.schema]
+                schema = pa.schema(fields, metadata=table.schema.metadata)
+                writer = pq.ParquetWriter(out, schema)
+            writer.write_table(table.cast(schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def load_table(path, kind, columns=None):
+    """
+    Load a table through the content-hash keyed Parquet cache.
+    kind is one of SCHEMAS: benchmarks, concordance, alignstats, aggregated.
+    columns limits the columns read (names missing from the file are
+    ignored); the cache itself always holds every column.
+    """
+    if kind not in SCHEMAS:
+        raise ValueError(f"Unknown table kind '{kind}'. Expected one of: {', '.join(SCHEMAS)}")
+    if not HAVE_PARQUET:
+        return parse_table(path, kind, columns)
+
+    prefix, cached = _cache_path(path, kind, file_digest(path))
+    if not os.path.exists(cached):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write to a temp file then rename, so concurrent readers never see a partial file.
+        tmp = f"{cached}.{os.getpid()}.tmp"
+        if os.path.getsize(path) > CHUNKED_PARSE_BYTES:
+            _parse_to_parquet(path, kind, tmp)
+        else:
+            parse_table(path, kind).to_parquet(tmp, index=False)
+        os.replace(tmp, cached)
+        _drop_stale(prefix, cached)
+
+    if columns is None:
+        return pd.read_parquet(cached)
+    import pyarrow.parquet as pq
+    present = pq.read_schema(cached).names
+    return pd.read_parquet(cached, columns=[c for c in present if c in columns])
+
+
+def _drop_stale(prefix, cached):
+    """Drop copies built from older versions of the same source file."""
+    for stale in glob.glob(os.path.join(CACHE_DIR, f"{prefix}.*.parquet")):
+        if stale != cached:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def load_benchmarks(path):
+    """Snakemake benchmarks_summary.tsv."""
+    return load_table(path, "benchmarks")
+
+
+def load_concordance(path, columns=None):
+    """giab_concordance_mqc.tsv (only `columns` when given, e.g. for tens of millions of stratified rows)."""
+    return load_table(path, "concordance", columns)
+
+
+def load_alignstats(path):
+    """alignstats.tsv."""
+    return load_table(path, "alignstats")
+
+
+def load_aggregated_metrics(path):
+    """aggregated_task_metrics.csv written by generate_benchmark_plots.py."""
+    return load_table(path, "aggregated")
+
+
+# sentieon_case_study.tsv column -> name used by the loaders' callers
+SPOT_PRICE_COLUMNS = {
+    "Region-AZ": "region_az",
+    "#InstanceTypes": "n_instance_types",
+    "MedianSpot$": "median_spot",
+    "MinSpot$": "min_spot",
+    "MaxSpot$": "max_spot",
+    "HarmonicMeanSpot $": "harmonic_spot",
+    "SpotStability": "spot_stability",
+    "$pervCPU-min-harmonic": "vcpu_min_harmonic",
+    "~EC2$harmonic": "ec2_harmonic",
+}
+
+
+def load_spot_prices(path):
+    """
+    Spot market report (data/sentieon_case_study.tsv): one row per region-AZ
+    with the spot price statistics ($/h) of the 192-vCPU instance types it
+    covers.  Headers and values are whitespace-padded and the AZ is numbered
+    ('4. us-west-2d'); AZs without offers are dropped.
+    """
+    df = pd.read_csv(path, sep="\t", dtype=str)
+    df.columns = [c.strip() for c in df.columns]
+    df = df[list(SPOT_PRICE_COLUMNS)].rename(columns=SPOT_PRICE_COLUMNS)
+    df["region_az"] = df["region_az"].str.strip().str.replace(r"^\d+\.\s*", "", regex=True)
+    for col in df.columns[1:]:
+        df[col] = pd.to_numeric(df[col].str.strip(), errors="coerce")
+    return df[df["n_instance_types"] > 0].reset_index(drop=True)
+
+
+def pipeline_labels(df, aligner_col="Aligner", caller_col="SNVCaller"):
+    """Return the 'Aligner-Caller' pipeline label for each row as a plain string Series."""
+    return df[aligner_col].astype(str) + "-" + df[caller_col].astype(str)
+
+
+def prepare_concordance(df):
+    """
+    Keep the whole-genome rows (see strata.whole_genome), drop the '_gt50'
+    SNPClasses (not plotted) and add the 'Pipeline' column.
+    Shared by the PvR/boxplot and heatmap scripts.
+    """
+    df = whole_genome(df)
+    df = df[~df['SNPClass'].str.contains('_gt50', na=False)].copy()
+    df['Pipeline'] = pipeline_labels(df)
+    return df
@@ -0,0 +1,374 @@
+"""
+The meta_ana table without plotting: aggregated benchmark rows folded per
+(Sample, aligner, var_caller) and joined with the concordance F-scores and
+the alignstats yield / coverage.
+
+  rows = build_rows(load_aggregated_metrics(b), load_concordance(c), load_alignstats(a))
+  write_tsv(rows, "meta_ana.tsv")          # or meta_table(rows) for a DataFrame
+  stream_meta_analysis(read_manifests(["runs/*.tsv"]), "meta_ana.tsv")
+"""
+
+import csv
+import glob
+import os
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from daylily_giab import loaders, metrics
+from daylily_giab.samples import normalize_samples
+from daylily_giab.strata import STRATA_COLUMNS, whole_genome
+
+# Columns of the meta_ana.tsv output (streaming mode appends RUN_FIELDS).
+FIELDS = [
+    "Sample", "aligner", "var_caller",
+    "cpu_time", "wall_time", "compute_efficiency", "num_task_threads",
+    "cost_per_task", "per_vcpu_seconds", "theoretical_min_cost_per_task",
+    "Fscore(all)", "Fscore(SNPts)", "Fscore(SNPtv)", "Fscore(SNPall)",
+    "Fscore(INS50)", "Fscore(Del50)", "Fscore(Indel50)",
+    "YieldBases", "WgsCoverageMedian", "WgsCoverageMean",
+    "cost_per_vcpu_sec", "cost_per_vcpu_sec_gb"
+]
+RUN_FIELDS = ["region", "run"]
+
+# Manifest columns for --runs (alignstats may be empty)
+MANIFEST_FIELDS = ["region", "run", "benchmarks", "concordance", "alignstats"]
+
+# Only these columns are read in streaming mode
+BENCHMARK_COLUMNS = ["sample", "normalized_rule", "Total_runtime_cpu", "Total_runtime_user",
+                     "Total_cost", "Avg_cpu_efficiency", "Total_snake_threads"]
+CONCORDANCE_COLUMNS = (["SNPClass", "Sample", "Aligner", "SNVCaller", "Fscore"] + metrics.COUNT_COLUMNS
+                       + STRATA_COLUMNS)
+
+
+class PipelineMetrics:
+    """Running totals for one (sample, aligner, var_caller), updated in place."""
+
+    __slots__ = ("cpu_time", "wall_time", "cost", "avg_cpu_efficiency", "num_task_threads")
+
+    def __init__(self):
+        self.cpu_time = 0
+        self.wall_time = 0
+        self.cost = 0
+        self.avg_cpu_efficiency = 0
+        self.num_task_threads = 0
+
+    def add(self, cpu_time, wall_time, cost, eff, num_threads):
+        # Weighted avg of CPU efficiency
+        total_prev_cpu = self.cpu_time
+        combined_cpu = total_prev_cpu + cpu_time
+        if combined_cpu > 0:
+            self.avg_cpu_efficiency = (
+                self.avg_cpu_efficiency * total_prev_cpu + eff * cpu_time
+            ) / combined_cpu
+        else:
+            self.avg_cpu_efficiency = eff
+
+        self.cpu_time = combined_cpu
+        self.wall_time = self.wall_time + wall_time
+        self.cost = self.cost + cost
+
+        # We'll just keep the max threads encountered
+        self.num_task_threads = max(self.num_task_threads, num_threads)
+
+def load_alignstats(alignstats_file):
+    """
+    Load alignstats info keyed by (sample, aligner).
+    """
+    return alignstats_lookup(loaders.load_alignstats(alignstats_file))
+
+def alignstats_lookup(df):
+    """
+    Key an alignstats table by (sample, aligner).
+    """
+    alignstats_data = {}
+    df = df.assign(sample=normalize_samples(df["sample"], df["aligner"])["sample"])
+    for row in df[["sample", "aligner", "YieldBases", "WgsCoverageMedian", "WgsCoverageMean"]].to_dict("records"):
+        key = (row["sample"], row["aligner"])
+
+        alignstats_data[key] = {
+            "YieldBases": safe_float(row["YieldBases"]),
+            "WgsCoverageMedian": safe_float(row["WgsCoverageMedian"]),
+            "WgsCoverageMean": safe_float(row["WgsCoverageMean"])
+        }
+    return alignstats_data
+
+def safe_float(x):
+    """Convert x to float, or 0.0 on failure (including NaN from the typed loaders)."""
+    try:
+        x = float(x)
+    except:
+        return 0.0
+    return 0.0 if x != x else x
+
+def load_data(benchmarks_csv, concord_file, alignstats_file):
+    """
+    Load the three input files and return build_rows() for them.
+    """
+    return build_rows(
+        loaders.load_aggregated_metrics(benchmarks_csv),
+        loaders.load_concordance(concord_file),
+        loaders.load_alignstats(alignstats_file)
+    )
+
+def build_rows(benchmarks_df, concord_df, alignstats_df):
+    """
+    1) Fold aggregated benchmark rows by (sample, aligner, var_caller).
+    2) Store concordance f-scores in dict keyed by (sample, aligner, var_caller).
+    3) Store alignstats coverage data in dict keyed by (sample, aligner).
+    4) Combine everything into a single list of rows (dicts) suitable for a DataFrame,
+       skipping rows where aligner/var_caller is 'dirsetupunknown'.
+    """
+    # --------------------------------------
+    # Load alignstats
+    # --------------------------------------
+    alignstats_data = alignstats_lookup(alignstats_df)
+
+    # --------------------------------------
+    # Aggregate tasks from benchmarks
+    # --------------------------------------
+    pipeline_sums = defaultdict(PipelineMetrics)
+    fold_benchmarks(benchmarks_df, pipeline_sums)
+
+    # --------------------------------------
+    # Load concordance
+    # --------------------------------------
+    concord_data = defaultdict(dict)
+    class_counts = defaultdict(dict)
+    fold_concordance(concord_df, concord_data, class_counts)
+
+    return make_rows(pipeline_sums, concord_data, alignstats_data, class_counts)
+
+def fold_benchmarks(df, pipeline_sums):
+    """
+    Add aggregated benchmark rows into pipeline_sums, a
+    defaultdict(PipelineMetrics) keyed by (sample, aligner, var_caller).
+    """
+    df = df.assign(sample=normalize_samples(df["sample"])["sample"])
+    for row in df.to_dict("records"):
+        sample_raw = row["sample"]
+        norm_rule = row["normalized_rule"]
+
+        cpu_time  = safe_float(row.get("Total_runtime_cpu", 0.0))
+        # pick your "wall_time" column
+        wall_time = safe_float(row.get("Total_runtime_user", 0.0))
+        cost      = safe_float(row.get("Total_cost", 0.0))
+        eff       = safe_float(row.get("Avg_cpu_efficiency", 0.0))
+        num_threads = safe_float(row.get("Total_snake_threads", 1.0))
+
+        parts = norm_rule.split(".")
+        if len(parts) < 2:
+            aligner = parts[0]
+            var_caller = "unknown"
+        else:
+            aligner = parts[0]
+            var_caller = parts[1]
+
+        # -------- Skip if aligner or var_caller is 'dirsetupunknown' --------
+        if aligner == "dirsetupunknown" or var_caller == "dirsetupunknown":
+            continue
+
+        pipeline_sums[(sample_raw, aligner, var_caller)].add(cpu_time, wall_time, cost, eff, num_threads)
+
+def fold_concordance(df, concord_data, class_counts):
+    """
+    Store concordance f-scores into concord_data, a defaultdict(dict)
+    keyed by (sample, aligner, var_caller) -> {SNPClass: Fscore}, and the
+    TP/FP/FN/TN of the classes in metrics.CLASS_POOLS into class_counts
+    (same keys) -> {SNPClass: counts}.  Stratified rows are skipped.
+    """
+    pooled_classes = {c for classes in metrics.CLASS_POOLS.values() for c in classes}
+    df = whole_genome(df)
+    df = df.assign(Sample=normalize_samples(df["Sample"])["sample"])
+    for row in df.to_dict("records"):
+        snp_class = row["SNPClass"]  # e.g. SNPts, SNPtv, ...
+        sample_name = row["Sample"]
+        aligner = row.get("Aligner", "NA")
+        varcaller = row.get("SNVCaller", "NA")
+        fscore_val = safe_float(row.get("Fscore", 0.0))
+
+        # -------- Skip if aligner or var_caller is 'dirsetupunknown' --------
+        if aligner == "dirsetupunknown" or varcaller == "dirsetupunknown":
+            continue
+
+        key = (sample_name, aligner, varcaller)
+        concord_data[key][snp_class] = fscore_val
+        if snp_class in pooled_classes:
+            class_counts[key][snp_class] = [safe_float(row.get(c)) for c in metrics.COUNT_COLUMNS]
+
+def pool_fscores(class_counts, classes):
+    """
+    {key: Fscore} of the counts of `classes` summed per key, computed for all
+    keys at once (e.g. SNPall = SNPts + SNPtv pooled; keys without any of the
+    classes are left out).
+    """
+    keys = [k for k, per_class in class_counts.items() if any(c in per_class for c in classes)]
+    if not keys:
+        return {}
+    counts = np.array([[class_counts[k].get(c, [0.0] * 4) for c in classes] for k in keys]).sum(axis=1)
+    fscore = metrics.compute_metrics(*counts.T)["Fscore"]
+    return {k: safe_float(f) for k, f in zip(keys, fscore)}
+
+def make_rows(pipeline_sums, concord_data, alignstats_data, class_counts):
+    """
+    Combine folded benchmarks, concordance and alignstats into meta_ana row dicts.
+    """
+    # "SNPall" from the pooled SNPts + SNPtv counts (not the mean of the two F-scores)
+    for pool, classes in metrics.CLASS_POOLS.items():
+        for k, fscore in pool_fscores(class_counts, classes).items():
+            concord_data[k][pool] = fscore
+
+    # --------------------------------------
+    # Create final list of row dicts
+    # --------------------------------------
+    final_rows = []
+    for (sample, aligner, varcaller), pm in pipeline_sums.items():
+        cpu_time = pm.cpu_time
+        wall_time = pm.wall_time
+        eff = pm.avg_cpu_efficiency
+        cost_per_task = pm.cost
+        threads = pm.num_task_threads
+
+        per_vcpu_sec = cpu_time / threads if threads > 0 else cpu_time
+        if eff > 0:
+            theoretical_min_cost = cost_per_task / eff
+        else:
+            theoretical_min_cost = cost_per_task
+
+        cdata = concord_data.get((sample, aligner, varcaller), {})
+        f_all    = cdata.get("All", 0.0)
+        f_snp_ts = cdata.get("SNPts", 0.0)
+        f_snp_tv = cdata.get("SNPtv", 0.0)
+        f_snpall = cdata.get("SNPall", 0.0)
+        f_ins50  = cdata.get("INS_50", 0.0)
+        f_del50  = cdata.get("DEL_50", 0.0)
+        f_ind50  = cdata.get("Indel_50", 0.0)
+
+        # Alignstats
+        alignrow = alignstats_data.get((sample, aligner), {})
+        yield_bases = alignrow.get("YieldBases", 0.0)
+        wgs_cov_median = alignrow.get("WgsCoverageMedian", 0.0)
+        wgs_cov_mean = alignrow.get("WgsCoverageMean", 0.0)
+
+        # cost_per_vcpu_sec
+        if per_vcpu_sec > 0:
+            cost_per_vcpu_sec = cost_per_task / per_vcpu_sec / threads
+        else:
+            cost_per_vcpu_sec = 0.0
+
+        # cost_per_vcpu_sec_gb
+        if yield_bases > 0:
+            cost_per_vcpu_sec_gb = cost_per_vcpu_sec / (yield_bases / 1e9)
+        else:
+            cost_per_vcpu_sec_gb = 0.0
+
+        rowdict = {
+            "Sample": sample,
+            "aligner": aligner,
+            "var_caller": varcaller,
+            "cpu_time": cpu_time,
+            "wall_time": wall_time,
+            "compute_efficiency": eff,
+            "num_task_threads": threads,
+            "cost_per_task": cost_per_task,
+            "per_vcpu_seconds": per_vcpu_sec,
+            "theoretical_min_cost_per_task": theoretical_min_cost,
+            "Fscore(all)": f_all,
+            "Fscore(SNPts)": f_snp_ts,
+            "Fscore(SNPtv)": f_snp_tv,
+            "Fscore(SNPall)": f_snpall,
+            "Fscore(INS50)": f_ins50,
+            "Fscore(Del50)": f_del50,
+            "Fscore(Indel50)": f_ind50,
+            "YieldBases": yield_bases,
+            "WgsCoverageMedian": wgs_cov_median,
+            "WgsCoverageMean": wgs_cov_mean,
+            "cost_per_vcpu_sec": cost_per_vcpu_sec,
+            "cost_per_vcpu_sec_gb": cost_per_vcpu_sec_gb
+        }
+        final_rows.append(rowdict)
+
+    return final_rows
+
+def write_tsv(rows, output_file):
+    """
+    Write list of row-dicts to a TSV file, with a consistent field order.
+    """
+    with open(output_file, "w", newline="") as out_f:
+        writer = csv.DictWriter(out_f, fieldnames=FIELDS, delimiter="\t")
+        writer.writeheader()
+        for row in rows:
+            # Convert to string or format as needed
+            writer.writerow({fn: row[fn] for fn in FIELDS})
+
+def read_manifests(patterns):
+    """
+    Runs listed in manifest TSVs (paths or globs).  Relative input paths are
+    resolved against the manifest's directory; an empty alignstats is allowed.
+    """
+    runs = []
+    for pattern in patterns:
+        paths = sorted(glob.glob(pattern)) or [pattern]
+        for manifest in paths:
+            base = os.path.dirname(os.path.abspath(manifest))
+            with open(manifest, newline="") as fh:
+                reader = csv.DictReader((line for line in fh if not line.startswith("#")), delimiter="\t")
+                missing = set(MANIFEST_FIELDS) - set(reader.fieldnames or []) - {"alignstats"}
+                if missing:
+                    raise ValueError(f"{manifest}: missing manifest column(s) {', '.join(sorted(missing))}")
+                for row in reader:
+                    run = {k: (row.get(k) or "").strip() for k in MANIFEST_FIELDS}
+                    for k in ("benchmarks", "concordance", "alignstats"):
+                        if run[k]:
+                            run[k] = os.path.join(base, run[k])
+                    runs.append(run)
+    return runs
+
+def stream_run_rows(run, chunksize=100_000):
+    """
+    meta_ana rows for one manifest run, tagged with region and run.
+    Inputs are read in chunks of chunksize rows, so memory is bounded by the
+    number of (sample, aligner, var_caller) keys rather than the file sizes.
+    """
+    pipeline_sums = defaultdict(PipelineMetrics)
+    for chunk in loaders.iter_table(run["benchmarks"], "aggregated", chunksize, BENCHMARK_COLUMNS):
+        fold_benchmarks(chunk, pipeline_sums)
+
+    concord_data = defaultdict(dict)
+    class_counts = defaultdict(dict)
+    for chunk in loaders.iter_table(run["concordance"], "concordance", chunksize, CONCORDANCE_COLUMNS):
+        fold_concordance(chunk, concord_data, class_counts)
+
+    alignstats_data = load_alignstats(run["alignstats"]) if run["alignstats"] else {}
+
+    rows = make_rows(pipeline_sums, concord_data, alignstats_data, class_counts)
+    for row in rows:
+        row["region"] = run["region"]
+        row["run"] = run["run"]
+    return rows
+
+def stream_meta_analysis(runs, output_file, chunksize=100_000):
+    """
+    Fold every run and append its rows to output_file as soon as the run is
+    done: FIELDS followed by RUN_FIELDS.  Returns the number of rows written.
+    """
+    fields = FIELDS + RUN_FIELDS
+    n_rows = 0
+    with open(output_file, "w", newline="") as out_f:
+        writer = csv.DictWriter(out_f, fieldnames=fields, delimiter="\t")
+        writer.writeheader()
+        for run in runs:
+            rows = stream_run_rows(run, chunksize)
+            writer.writerows({fn: row[fn] for fn in fields} for row in rows)
+            n_rows += len(rows)
+            print(f"{run['region']}/{run['run']}: {len(rows)} rows")
+    return n_rows
+
+def meta_table(rows):
+    """
+    build_rows() / stream_run_rows() rows as a DataFrame with the FIELDS
+    columns (plus RUN_FIELDS when the rows carry them), even when empty.
+    """
+    df = pd.DataFrame(rows)
+    return df.reindex(columns=FIELDS + [f for f in RUN_FIELDS if f in df.columns])
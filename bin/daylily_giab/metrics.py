@@ -0,0 +1,142 @@
+"""
+Concordance metrics recomputed from TP/FP/FN/TN counts, vectorized.
+
+The concordance tables store counts next to precomputed Fscore,
+Sensitivity-Recall, Specificity, FDR, PPV and Precision.  Averaging those
+ratios across classes, samples or runs is not the same as the ratio of the
+pooled counts; this module sums counts for any grouping and derives every
+metric from the sums, for all groups at once:
+
+  pooled(df, ["Aligner", "SNVCaller"])                 micro average per pipeline
+  pooled(df, ["Sample", "Aligner", "SNVCaller"],
+         classes=["SNPts", "SNPtv"])                    SNPts + SNPtv pooled ('SNPall')
+  summarize(df, ["Aligner", "SNVCaller"], over="Sample")  micro_* and macro_* side by side
+  cross_check(df)                                       stored vs. recomputed mismatches
+
+Metrics with a zero denominator are NaN.  TN and TgtRegionSize are summed
+like the other counts, so a pooled Specificity is over the summed per-class
+opportunities.
+"""
+
+import numpy as np
+import pandas as pd
+
+COUNT_COLUMNS = ["TP", "FP", "FN", "TN"]
+
+METRIC_COLUMNS = ["Fscore", "Sensitivity-Recall", "Specificity", "FDR", "PPV", "Precision"]
+
+# Named SNPClass pools, e.g. for SNPClass='SNPall' rows in pool_classes()
+CLASS_POOLS = {
+    "SNPall": ["SNPts", "SNPtv"],
+}
+
+
+def _ratio(num, den):
+    num = np.asarray(num, dtype="float64")
+    den = np.asarray(den, dtype="float64")
+    out = np.full(np.broadcast(num, den).shape, np.nan)
+    np.divide(num, den, out=out, where=den != 0)
+    return out
+
+
+def compute_metrics(tp, fp, fn, tn):
+    """
+    Every metric from count arrays (any matching shapes).
+    Returns {metric column: float64 array}.
+    """
+    tp, fp, fn, tn = (np.asarray(x, dtype="float64") for x in (tp, fp, fn, tn))
+    precision = _ratio(tp, tp + fp)
+    recall = _ratio(tp, tp + fn)
+    return {
+        # NaN when P or R is undefined or both are 0, as in the stored column
+        "Fscore": _ratio(2 * precision * recall, precision + recall),
+        "Sensitivity-Recall": recall,
+        "Specificity": _ratio(tn, tn + fp),
+        "FDR": _ratio(fp, tp + fp),
+        "PPV": precision,
+        "Precision": precision,
+    }
+
+
+def with_metrics(df, prefix=""):
+    """Copy of df with METRIC_COLUMNS (named prefix + metric) recomputed from its counts."""
+    out = df.copy()
+    for col, values in compute_metrics(*(df[c].to_numpy() for c in COUNT_COLUMNS)).items():
+        out[prefix + col] = values
+    return out
+
+
+def pooled(df, by, classes=None):
+    """
+    Sum counts per group of `by` columns (optionally only rows whose SNPClass
+    is in classes) and recompute every metric from the sums: the micro average.
+    Returns one row per group with by, n_rows, COUNT_COLUMNS and METRIC_COLUMNS.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    if classes is not None:
+        df = df[df["SNPClass"].isin(classes)]
+    counts = [c for c in COUNT_COLUMNS + ["TgtRegionSize"] if c in df.columns]
+    grouped = df.groupby(by, observed=True, sort=True)
+    sums = grouped[counts].sum()
+    sums.insert(0, "n_rows", grouped.size())
+    return with_metrics(sums).reset_index()
+
+
+def pool_classes(df, pools=None, keys=("Sample", "Aligner", "SNVCaller")):
+    """
+    Rows for named SNPClass pools (default CLASS_POOLS), one per keys group,
+    with SNPClass set to the pool name; ready to concat onto df.
+    """
+    pools = CLASS_POOLS if pools is None else pools
+    frames = []
+    for name, classes in pools.items():
+        part = pooled(df, list(keys), classes=classes).drop(columns="n_rows")
+        part.insert(0, "SNPClass", name)
+        frames.append(part)
+    return pd.concat(frames, ignore_index=True)
+
+
+def summarize(df, by, over="Sample", classes=None):
+    """
+    Micro and macro averages per group of `by`.
+    micro_<metric>: from counts summed over every row of the group.
+    macro_<metric>: mean over the `over` groups (e.g. samples) of the metric
+    of each (by + over) group's summed counts.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    micro = pooled(df, by, classes=classes)
+    micro = micro.rename(columns={m: f"micro_{m}" for m in METRIC_COLUMNS})
+
+    per_over = pooled(df, by + [over], classes=classes)
+    macro = per_over.groupby(by, observed=True, sort=True)[METRIC_COLUMNS].mean()
+    macro.columns = [f"macro_{m}" for m in METRIC_COLUMNS]
+    macro.insert(0, f"n_{over}", per_over.groupby(by, observed=True, sort=True).size())
+    return micro.merge(macro.reset_index(), on=by, how="left")
+
+
+def cross_check(df, atol=1e-9, rtol=0.0):
+    """
+    Compare the stored metric columns with the values recomputed from the
+    counts.  Returns the mismatching (row, metric) pairs as a long table with
+    the row's identifying columns, stored, recomputed and abs_diff; empty if
+    everything agrees within atol + rtol * |recomputed| (NaN == NaN).
+    """
+    recomputed = compute_metrics(*(df[c].to_numpy() for c in COUNT_COLUMNS))
+    id_cols = [c for c in ("SNPClass", "Sample", "Aligner", "SNVCaller") if c in df.columns]
+    frames = []
+    for metric in METRIC_COLUMNS:
+        if metric not in df.columns:
+            continue
+        stored = df[metric].to_numpy(dtype="float64")
+        new = recomputed[metric]
+        ok = np.isclose(stored, new, atol=atol, rtol=rtol, equal_nan=True)
+        if ok.all():
+            continue
+        bad = df.loc[~ok, id_cols].copy()
+        bad["metric"] = metric
+        bad["stored"] = stored[~ok]
+        bad["recomputed"] = new[~ok]
+        bad["abs_diff"] = np.abs(bad["stored"] - bad["recomputed"])
+        frames.append(bad)
+    columns = id_cols + ["metric", "stored", "recomputed", "abs_diff"]
+    return pd.concat(frames) if frames else pd.DataFrame(columns=columns)
@@ -0,0 +1,136 @@
+"""
+Pareto frontiers (skylines) of cost, wall time and accuracy.
+
+pareto_mask(points) marks the rows of an (n, d) array that no other row
+dominates, every column minimized (negate columns to maximize).  A row
+dominates another if it is <= in every column and < in at least one, so
+identical rows are all kept.
+
+  d = 1, 2   sort, then a running minimum (vectorized)
+  d = 3      Kung's sweep: rows in lexicographic order, with a staircase of
+             the (col 1, col 2) minima seen so far kept in sorted lists;
+             each row is one bisect query plus an insert
+Both are O(n log n) comparisons instead of the O(n^2) pairwise check, so
+tens of thousands of (run, sample, pipeline) points take milliseconds.
+
+pipeline_points() turns meta_ana rows into one point per (run, Sample,
+aligner, var_caller) caller pipeline, by default charging each caller the
+cost and wall time of its aligner's own rows (alNsort, mrkdup, QC), and
+frontier() takes the frontier per Fscore class on
+(cost_per_task, wall_time, -Fscore).
+"""
+
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pandas as pd
+
+from daylily_giab.rules import CALLERS
+
+
+def _runs(sorted_points):
+    """Index of the first row of each row's run of identical rows."""
+    same = np.r_[False, (sorted_points[1:] == sorted_points[:-1]).all(axis=1)]
+    return np.maximum.accumulate(np.where(same, 0, np.arange(len(sorted_points))))
+
+
+def _mask_2d(points):
+    order = np.lexsort(points.T[::-1])
+    p = points[order]
+    first = _runs(p)
+    # smallest column-1 value strictly before each row's run of duplicates
+    before = np.r_[np.inf, np.minimum.accumulate(p[:, 1])[:-1]][first]
+    mask = np.empty(len(p), dtype=bool)
+    mask[order] = before > p[:, 1]
+    return mask
+
+
+def _mask_3d(points):
+    order = np.lexsort(points.T[::-1])
+    p = points[order]
+    first = _runs(p)
+    keep = np.zeros(len(p), dtype=bool)
+    ys, zs = [], []  # staircase: ys ascending, zs strictly descending
+    for i, (y, z) in enumerate(p[:, 1:].tolist()):
+        if first[i] != i:
+            keep[i] = keep[first[i]]
+            continue
+        j = bisect_right(ys, y) - 1
+        if j >= 0 and zs[j] <= z:
+            continue
+        keep[i] = True
+        lo = bisect_left(ys, y)
+        hi = lo
+        while hi < len(ys) and zs[hi] >= z:
+            hi += 1
+        ys[lo:hi] = [y]
+        zs[lo:hi] = [z]
+    mask = np.empty(len(p), dtype=bool)
+    mask[order] = keep
+    return mask
+
+
+def pareto_mask(points):
+    """Boolean mask of the non-dominated rows of an (n, d <= 3) array, all columns minimized."""
+    points = np.asarray(points, dtype="float64")
+    if points.ndim != 2:
+        raise ValueError("points must be an (n, d) array")
+    n, d = points.shape
+    if n == 0:
+        return np.zeros(0, dtype=bool)
+    if d == 1:
+        return points[:, 0] == points[:, 0].min()
+    if d == 2:
+        return _mask_2d(points)
+    if d == 3:
+        return _mask_3d(points)
+    raise ValueError(f"pareto_mask handles up to 3 columns, got {d}")
+
+
+def pipeline_points(meta, include_alignment=True):
+    """
+    Caller rows of a (multi-run) meta_ana table.  With include_alignment,
+    cost_per_task and wall_time gain the sums of the same run, Sample and
+    aligner's non-caller rows, so each point is the whole pipeline.
+    """
+    is_caller = meta["var_caller"].isin(CALLERS)
+    points = meta[is_caller].copy()
+    if include_alignment:
+        keys = ["run", "Sample", "aligner"]
+        shared = meta[~is_caller & (meta["aligner"] != "dirsetup")].groupby(keys, sort=False)[
+            ["cost_per_task", "wall_time"]].sum()
+        extra = points[keys].merge(shared, left_on=keys, right_index=True, how="left")
+        for col in ["cost_per_task", "wall_time"]:
+            points[col] = points[col] + extra[col].fillna(0).to_numpy()
+    return points.reset_index(drop=True)
+
+
+def fscore_classes(df):
+    """{class: column} for the Fscore(<class>) columns of a meta_ana table."""
+    return {c[len("Fscore("):-1]: c for c in df.columns if c.startswith("Fscore(") and c.endswith(")")}
+
+
+def frontier(points, classes=None, objectives=("cost_per_task", "wall_time")):
+    """
+    Long table of the points on the Pareto frontier of (objectives..., -Fscore)
+    for each Fscore class, with an on_cost_front flag for the 2-D
+    (cost_per_task, -Fscore) frontier used to draw the step line.  Rows with a
+    missing objective or an Fscore of 0 (no concordance) are left out.
+    """
+    columns = fscore_classes(points)
+    classes = list(columns) if classes is None else list(classes)
+    frames = []
+    for snp_class in classes:
+        fcol = columns[snp_class]
+        valid = points[fcol].gt(0) & points[list(objectives)].notna().all(axis=1)
+        sub = points[valid]
+        values = np.column_stack([sub[c].to_numpy(dtype="float64") for c in objectives]
+                                 + [-sub[fcol].to_numpy(dtype="float64")])
+        mask = pareto_mask(values)
+        front = sub[mask].copy()
+        front["on_cost_front"] = pareto_mask(values[mask][:, [0, -1]])
+        front.insert(0, "SNPClass", snp_class)
+        front["Fscore"] = front[fcol]
+        front["n_points"] = len(sub)
+        frames.append(front.sort_values(list(objectives[:1]), kind="stable"))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
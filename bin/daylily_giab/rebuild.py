@@ -0,0 +1,130 @@
+"""
+Incremental rebuilds: skip figures whose inputs have not changed.
+
+A BuildManifest (JSON, default <output dir>/.build_manifest.json) maps each
+output file to the fingerprint it was last rendered from.  A fingerprint is
+the sha256 of exactly what the figure depends on: the rows/columns of its
+data slice (in order), its parameters (build, annotation, format, DPI, ...)
+and the source of the code that draws it.  Before rendering, callers ask the
+manifest which outputs are stale (missing file or different fingerprint),
+render only those, then record them.
+
+  manifest = BuildManifest.for_outputs(out_dir)
+  fp = fingerprint(df_slice, {"genome_build": build}, code_digest(__file__))
+  if not manifest.is_current(out_png, fp):
+      ... draw + save ...
+      manifest.record(out_png, fp)
+  manifest.save()
+
+Scripts add --force (add_rebuild_arguments) to ignore the manifest.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+MANIFEST_NAME = ".build_manifest.json"
+
+# Bump to invalidate every recorded fingerprint.
+MANIFEST_VERSION = 1
+
+_CODE_DIGESTS = {}
+
+
+def frame_digest(df):
+    """sha256 of a DataFrame's columns, dtypes and values (row order matters, the index does not)."""
+    h = hashlib.sha256()
+    h.update(json.dumps([str(c) for c in df.columns]).encode())
+    h.update(json.dumps([str(t) for t in df.dtypes]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def code_digest(*paths):
+    """sha256 of source files (e.g. a plotting module's __file__), cached per process."""
+    key = tuple(os.path.abspath(p) for p in paths)
+    if key not in _CODE_DIGESTS:
+        h = hashlib.sha256()
+        for path in key:
+            with open(path, "rb") as f:
+                h.update(f.read())
+        _CODE_DIGESTS[key] = h.hexdigest()
+    return _CODE_DIGESTS[key]
+
+
+def _jsonable(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return {"frame": frame_digest(value.to_frame() if isinstance(value, pd.Series) else value)}
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_jsonable(v) for v in value]
+        return sorted(items, key=json.dumps) if isinstance(value, (set, frozenset)) else items
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+def fingerprint(*parts):
+    """Fingerprint of frames, params (dicts/lists/scalars, namedtuples) and digests."""
+    payload = json.dumps([MANIFEST_VERSION] + [_jsonable(p) for p in parts], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def add_rebuild_arguments(parser):
+    """Add --force (re-render even when the manifest says a figure is current)."""
+    parser.add_argument("--force", action="store_true",
+                        help=f"Re-render every figure, ignoring {MANIFEST_NAME}")
+
+
+class BuildManifest:
+    """Output file -> fingerprint record, stored as JSON next to the outputs."""
+
+    def __init__(self, path, force=False):
+        self.path = path
+        self.force = force
+        self.base = os.path.dirname(os.path.abspath(path))
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f).get("outputs", {})
+
+    @classmethod
+    def for_outputs(cls, output_dir, force=False):
+        return cls(os.path.join(output_dir or ".", MANIFEST_NAME), force=force)
+
+    def _key(self, output):
+        return os.path.relpath(os.path.abspath(output), self.base)
+
+    def is_current(self, output, fp):
+        """True if output exists and was last rendered from fingerprint fp."""
+        if self.force or not os.path.exists(output):
+            return False
+        return self.entries.get(self._key(output)) == fp
+
+    def stale(self, outputs):
+        """Names in {name: (output, fingerprint)} whose output needs rendering."""
+        return [name for name, (out, fp) in outputs.items() if not self.is_current(out, fp)]
+
+    def record_all(self, outputs, names=None):
+        """record() every (output, fingerprint) in outputs, or only those in names."""
+        for name, (out, fp) in outputs.items():
+            if names is None or name in names:
+                self.record(out, fp)
+
+    def record(self, output, fp):
+        """Record a rendered output; outputs that were not written are ignored."""
+        if os.path.exists(output):
+            self.entries[self._key(output)] = fp
+
+    def save(self):
+        os.makedirs(self.base, exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "outputs": self.entries}, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
@@ -0,0 +1,167 @@
+"""
+Per-task, per-host and per-instance-type performance regression tracking
+over benchmark history (after generate_benchmark_plots.prepare_benchmarks).
+
+Baseline: tasks are compared with the same work in every other run, i.e.
+the same rightsizing.rule_family, shard and genome build (a chr1 shard is
+never compared with a chr22 one).  Per task,
+
+  thread_s        s * snakemake_threads   reserved core-seconds
+  eff_per_thread  cpu_efficiency / snakemake_threads
+
+and per baseline group the median and MAD (scaled by 1.4826 to match a
+standard deviation for normal data) give robust z-scores:
+
+  z_s    of log(thread_s), so a 2x slowdown scores the same for long and short rules
+  z_eff  of eff_per_thread
+
+Groups with fewer than min_tasks tasks or a zero MAD get no z-scores.
+Tasks with z_s above the threshold are 'slow' ('fast' below minus the
+threshold); eff z-scores below minus the threshold mark 'low_eff'.
+
+Every step is a grouped transform / aggregation over the whole table, so
+the full archive is scored in one pass.
+"""
+
+import numpy as np
+import pandas as pd
+
+from daylily_giab.rightsizing import rule_family
+from daylily_giab.samples import normalize_samples
+
+MAD_SCALE = 1.4826
+
+BASELINE_KEYS = ["build", "family", "shard"]
+
+HOST_KEYS = ["run", "hostname", "instance_type", "region_az"]
+
+
+def task_metrics(df):
+    """Plain-string keys, family and the normalized metrics of every task."""
+    tasks = df.copy()
+    for col in ["build", "run", "hostname", "instance_type", "region_az", "sample", "aligner"]:
+        if col in tasks.columns:
+            tasks[col] = tasks[col].astype(object)
+    if "build" not in tasks.columns:
+        tasks["build"] = ""
+    tasks["family"] = rule_family(tasks)
+    tasks["shard"] = tasks["shard"].astype(object).fillna("")
+    threads = tasks["snakemake_threads"].clip(lower=1)
+    tasks["thread_s"] = tasks["s"] * threads
+    tasks["eff_per_thread"] = tasks["cpu_efficiency"] / threads
+    return tasks
+
+
+def robust_z(values, groups, min_tasks=5):
+    """
+    (z, median, n) of values against their group's median and scaled MAD;
+    z is NaN in groups smaller than min_tasks or with zero MAD.
+    """
+    grouped = values.groupby(groups, sort=False)
+    median = grouped.transform("median")
+    mad = (values - median).abs().groupby(groups, sort=False).transform("median") * MAD_SCALE
+    n = grouped.transform("count")
+    z = (values - median) / mad.where((mad > 0) & (n >= min_tasks))
+    return z, median, n
+
+
+def score_tasks(df, threshold=3.5, min_tasks=5, keys=BASELINE_KEYS):
+    """
+    Tasks with baseline_thread_s (group median), rel_s (thread_s / baseline),
+    z_s, z_eff, n_baseline and flag ('slow', 'fast', 'low_eff' or '').
+    """
+    tasks = task_metrics(df)
+    groups = [tasks[k] for k in keys]
+    log_s = np.log(tasks["thread_s"].where(tasks["thread_s"] > 0))
+    tasks["z_s"], log_median, tasks["n_baseline"] = robust_z(log_s, groups, min_tasks)
+    tasks["baseline_thread_s"] = np.exp(log_median)
+    tasks["rel_s"] = tasks["thread_s"] / tasks["baseline_thread_s"]
+    tasks["z_eff"], _, _ = robust_z(tasks["eff_per_thread"], groups, min_tasks)
+
+    flag = np.full(len(tasks), "", dtype=object)
+    flag[(tasks["z_eff"] < -threshold).to_numpy()] = "low_eff"
+    flag[(tasks["z_s"] < -threshold).to_numpy()] = "fast"
+    flag[(tasks["z_s"] > threshold).to_numpy()] = "slow"
+    tasks["flag"] = flag
+    return tasks
+
+
+def host_table(tasks, host_z=2.0, min_tasks=3, keys=HOST_KEYS):
+    """
+    One row per host (hostnames are reused across runs, so per run): scored
+    tasks, flagged tasks, median z_s / z_eff, geometric-mean rel_s, and
+    suspect=True when the median z_s is at least host_z over min_tasks tasks.
+    """
+    keys = [k for k in keys if k in tasks.columns]
+    scored = tasks.assign(log_rel=np.log(tasks["rel_s"]), slow=tasks["flag"].eq("slow"),
+                          low_eff=tasks["flag"].eq("low_eff"))
+    hosts = scored[scored["z_s"].notna()].groupby(keys, sort=True).agg(
+        n_tasks=("z_s", "size"),
+        n_slow=("slow", "sum"),
+        n_low_eff=("low_eff", "sum"),
+        median_z_s=("z_s", "median"),
+        median_z_eff=("z_eff", "median"),
+        log_rel=("log_rel", "mean"),
+    )
+    hosts["rel_s"] = np.exp(hosts.pop("log_rel"))
+    hosts["suspect"] = (hosts["median_z_s"] >= host_z) & (hosts["n_tasks"] >= min_tasks)
+    return hosts.reset_index().sort_values(["suspect", "median_z_s"], ascending=False, kind="stable")
+
+
+def yield_table(alignstats):
+    """
+    (run,) sample, aligner, YieldBases from an alignstats table; sample names
+    lose their '_<aligner>' suffix to match the benchmarks
+    (samples.normalize_samples).
+    """
+    keys = [c for c in ["run"] if c in alignstats.columns]
+    out = alignstats[keys + ["aligner", "YieldBases"]].astype({"aligner": object})
+    for key in keys:
+        out[key] = out[key].astype(object)
+    out.insert(len(keys), "sample", normalize_samples(alignstats["sample"], alignstats["aligner"])["sample"])
+    return out.drop_duplicates(keys + ["sample", "aligner"])
+
+
+def attach_yield(tasks, yields):
+    """
+    Add gbases, the YieldBases / 1e9 of each task's (run,) sample and aligner
+    (the first yield wins when yields carry no run column but tasks span runs).
+    """
+    keys = [k for k in ["run", "sample", "aligner"] if k in yields.columns and k in tasks.columns]
+    left = tasks[keys].astype(object)
+    left["sample"] = normalize_samples(left["sample"])["sample"]
+    right = yields[keys + ["YieldBases"]].drop_duplicates(keys)
+    gbases = left.merge(right, on=keys, how="left")["YieldBases"].to_numpy() / 1e9
+    return tasks.assign(gbases=gbases)
+
+
+def instance_throughput(tasks, by=("instance_type",)):
+    """
+    Per group of `by` (e.g. instance_type, or instance_type + family): tasks,
+    geometric-mean rel_s against the baselines (< 1 is faster than typical),
+    median z_s, and core_s_per_gbase / cpu_s_per_gbase = summed thread_s /
+    cpu_time over summed Gbases of tasks with a known YieldBases.
+    """
+    by = list(by)
+    gbases = tasks["gbases"] if "gbases" in tasks.columns else pd.Series(np.nan, index=tasks.index)
+    has_yield = gbases.gt(0)
+    frame = tasks.assign(
+        log_rel=np.log(tasks["rel_s"].where(tasks["rel_s"] > 0)),
+        y_thread_s=tasks["thread_s"].where(has_yield, 0.0),
+        y_cpu_s=tasks["cpu_time"].where(has_yield, 0.0),
+        y_gbases=gbases.where(has_yield, 0.0),
+    )
+    out = frame.groupby(by, sort=True).agg(
+        n_tasks=("thread_s", "size"),
+        n_hosts=("hostname", "nunique"),
+        median_z_s=("z_s", "median"),
+        log_rel=("log_rel", "mean"),
+        thread_s=("y_thread_s", "sum"),
+        cpu_s=("y_cpu_s", "sum"),
+        gbases=("y_gbases", "sum"),
+    )
+    out["rel_s"] = np.exp(out.pop("log_rel"))
+    gbases = out["gbases"].where(out["gbases"] > 0)
+    out["core_s_per_gbase"] = out.pop("thread_s") / gbases
+    out["cpu_s_per_gbase"] = out.pop("cpu_s") / gbases
+    return out.reset_index()
@@ -0,0 +1,187 @@
+"""
+What-if repricing of benchmark tables under other regions and spot prices.
+
+task_cost in the benchmarks is spot_cost * s * snakemake_threads / nproc / 3600:
+the task's share of its instance's hourly spot price at run time.  A price
+scenario is a row of a scenarios x instance_type matrix of $/instance-hour;
+reprice() recomputes task_cost for every task under every scenario in one
+broadcasted pass,
+
+  costs[n, k] = instance_hours[n] * prices[k, instance_type[n]]
+
+and the totals used downstream are grouped sums of those columns:
+rule_costs() gives aggregate_benchmarks' Total_cost per (sample,
+normalized_rule); pipeline_costs() gives generate_meta_analysis's
+cost_per_task, cost_per_vcpu_sec and cost_per_vcpu_sec_gb per
+(Sample, aligner, var_caller); cost_matrix() pivots those into a
+scenario x pipeline table.
+
+Scenario sources:
+  case_study_scenarios()  sentieon_case_study.tsv: '<az>:<stat>' for median /
+                          min / max / harmonic spot, scaled from its 192-vCPU
+                          prices by each instance type's vCPUs
+  series_scenarios()      a spot price history: '<az>@<timestamp>', one per
+                          AZ and time point, prices carried forward in time
+The recorded task_cost is kept as the 'observed' scenario.
+"""
+
+import numpy as np
+import pandas as pd
+
+from daylily_giab.samples import normalize_samples
+from daylily_giab.simulate import PRICE_STATS, PRICE_VCPUS
+
+OBSERVED = "observed"
+
+# Spot price history columns (AWS describe-spot-price-history names accepted)
+SERIES_COLUMNS = {
+    "AvailabilityZone": "region_az",
+    "InstanceType": "instance_type",
+    "SpotPrice": "spot_price",
+    "Timestamp": "timestamp",
+}
+
+
+def instance_vcpus(df):
+    """{instance_type: nproc} as observed in a benchmark table."""
+    pairs = df[["instance_type", "nproc"]].dropna().drop_duplicates("instance_type")
+    return dict(zip(pairs["instance_type"].astype(str), pairs["nproc"].astype("int64")))
+
+
+def case_study_scenarios(spot_prices, vcpus, stats=None, azs=None):
+    """
+    Scenario x instance_type $/h from loaders.load_spot_prices(): one
+    scenario per (AZ, statistic), each instance type priced at the AZ's
+    192-vCPU price scaled by its vCPUs.
+    """
+    stats = list(PRICE_STATS) if stats is None else list(stats)
+    if azs is not None:
+        spot_prices = spot_prices[spot_prices["region_az"].isin(azs)]
+    per_vcpu = np.stack([spot_prices[PRICE_STATS[s]].to_numpy() for s in stats], axis=1) / PRICE_VCPUS
+    names = [f"{az}:{s}" for az in spot_prices["region_az"] for s in stats]
+    types = list(vcpus)
+    prices = per_vcpu.reshape(-1, 1) * np.array([vcpus[t] for t in types], dtype="float64")[None, :]
+    return pd.DataFrame(prices, index=pd.Index(names, name="scenario"), columns=types)
+
+
+def read_price_series(path):
+    """Spot price history TSV/CSV with region_az, instance_type, spot_price, timestamp."""
+    df = pd.read_csv(path, sep=None, engine="python").rename(columns=SERIES_COLUMNS)
+    missing = {"region_az", "instance_type", "spot_price", "timestamp"} - set(df.columns)
+    if missing:
+        raise ValueError(f"{path}: missing price series columns {', '.join(sorted(missing))}")
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+    return df
+
+
+def series_scenarios(series, azs=None):
+    """
+    Scenario x instance_type $/h from a spot price history: one scenario per
+    (AZ, timestamp); an instance type without a quote at a time point keeps
+    its AZ's last earlier price.
+    """
+    if azs is not None:
+        series = series[series["region_az"].isin(azs)]
+    wide = series.pivot_table(index=["region_az", "timestamp"], columns="instance_type",
+                              values="spot_price", aggfunc="last").sort_index()
+    wide = wide.groupby(level="region_az").ffill()
+    names = [f"{az}@{ts.isoformat()}" for az, ts in wide.index]
+    wide.index = pd.Index(names, name="scenario")
+    wide.columns = wide.columns.astype(str)
+    return wide
+
+
+def reprice(df, scenarios):
+    """
+    (n_rows, n_scenarios) task costs of every benchmark row under every
+    scenario; NaN where a scenario has no price for the row's instance type.
+    """
+    hours = (df["s"].to_numpy(dtype="float64") * df["snakemake_threads"].to_numpy(dtype="float64")
+             / df["nproc"].to_numpy(dtype="float64") / 3600)
+    types = df["instance_type"].astype(str).to_numpy()
+    columns = pd.Index(scenarios.columns)
+    codes = columns.get_indexer(types)
+    prices = np.concatenate([scenarios.to_numpy(dtype="float64"),
+                             np.full((len(scenarios), 1), np.nan)], axis=1)
+    return hours[:, None] * prices[:, codes].T
+
+
+def _group_sums(keys, values):
+    """Sum the rows of a 2-D array per key group; returns (unique keys frame, sums)."""
+    codes, uniques = pd.MultiIndex.from_frame(keys).factorize(sort=True)
+    order = np.argsort(codes, kind="stable")
+    starts = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0])
+    sums = np.add.reduceat(values[order], starts, axis=0)
+    uniques = uniques.to_frame(index=False)
+    uniques.columns = list(keys.columns)
+    return uniques, sums
+
+
+def _with_observed(df, scenarios, observed):
+    costs = reprice(df, scenarios)
+    names = list(scenarios.index)
+    if observed:
+        costs = np.concatenate([df["task_cost"].to_numpy(dtype="float64")[:, None], costs], axis=1)
+        names = [OBSERVED] + names
+    return costs, names
+
+
+def _long(keys, sums, names, value):
+    out = keys.loc[np.repeat(np.arange(len(keys)), len(names))].reset_index(drop=True)
+    out.insert(0, "scenario", np.tile(names, len(keys)))
+    out[value] = sums.ravel()
+    return out
+
+
+def rule_costs(df, scenarios, observed=True):
+    """Total_cost per (scenario, sample, normalized_rule), as in aggregate_benchmarks."""
+    costs, names = _with_observed(df, scenarios, observed)
+    keys = df[["sample", "normalized_rule"]].astype(str)
+    uniques, sums = _group_sums(keys, costs)
+    return _long(uniques, sums, names, "Total_cost")
+
+
+def pipeline_keys(df):
+    """(Sample, aligner, var_caller) of each row, split from normalized_rule as generate_meta_analysis does."""
+    parts = df["normalized_rule"].astype(str).str.split(".", n=2, expand=True)
+    second = parts[1] if 1 in parts.columns else pd.Series(None, index=df.index)
+    return pd.DataFrame({
+        "Sample": normalize_samples(df["sample"])["sample"],
+        "aligner": parts[0],
+        "var_caller": second.fillna("unknown"),
+    }, index=df.index)
+
+
+def pipeline_costs(df, scenarios, yield_bases=None, observed=True):
+    """
+    Long table per (scenario, Sample, aligner, var_caller): cost_per_task,
+    cpu_time (sum of cpu_time * threads), cost_per_vcpu_sec and, with
+    yield_bases {(Sample, aligner): YieldBases}, cost_per_vcpu_sec_gb.
+    """
+    costs, names = _with_observed(df, scenarios, observed)
+    cpu = (df["cpu_time"].to_numpy(dtype="float64") * df["snakemake_threads"].to_numpy(dtype="float64"))
+    uniques, sums = _group_sums(pipeline_keys(df), np.concatenate([cpu[:, None], costs], axis=1))
+    cpu_time, costs = sums[:, 0], sums[:, 1:]
+
+    out = _long(uniques, costs, names, "cost_per_task")
+    out["cpu_time"] = np.tile(cpu_time[:, None], (1, len(names))).ravel()
+    out["cost_per_vcpu_sec"] = np.where(out["cpu_time"] > 0, out["cost_per_task"] / out["cpu_time"].where(
+        out["cpu_time"] > 0), 0.0)
+    if yield_bases is not None:
+        gb = np.array([yield_bases.get(k, 0.0) for k in zip(out["Sample"], out["aligner"])]) / 1e9
+        out["cost_per_vcpu_sec_gb"] = np.where(gb > 0, out["cost_per_vcpu_sec"] / np.where(gb > 0, gb, 1), 0.0)
+    return out
+
+
+def cost_matrix(pipelines, value="cost_per_task"):
+    """
+    Scenario x '<aligner>-<var_caller>' pivot of pipeline_costs() summed over
+    samples, plus a total; NaN wherever a scenario could not price a task.
+    """
+    table = pipelines.assign(pipeline=pipelines["aligner"] + "-" + pipelines["var_caller"],
+                             unpriced=pipelines[value].isna())
+    grouped = table.groupby(["scenario", "pipeline"], sort=False)
+    matrix = grouped[value].sum().mask(grouped["unpriced"].any()).unstack("pipeline")
+    matrix = matrix.reindex(pd.unique(pipelines["scenario"]))
+    matrix["total"] = matrix.sum(axis=1, skipna=False)
+    return matrix
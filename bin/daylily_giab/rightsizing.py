@@ -0,0 +1,162 @@
+"""
+Thread and memory right-sizing per rule family from the Snakemake benchmarks
+(after generate_benchmark_plots.prepare_benchmarks).
+
+A rule family is the rule without its aligner and shard: '<caller>.<step>'
+for caller rules ('deep.call', 'oct.concordance'), the step otherwise
+('alNsort', 'mrkdup.sort.picard').  Tasks from every run and aligner are
+pooled per family.
+
+Scaling model (Amdahl): a task with parallel fraction f that takes T1 on one
+thread takes s(t) = T1 * ((1 - f) + f / t) on t threads.  Each task's busy
+cores p = max(cpu_time / s, mean_load / 100), clipped to [1, threads], is its
+speedup at its thread count, so
+
+  f = (1 - 1/p) / (1 - 1/threads)
+
+and a family's f is the median over its tasks (single-thread tasks carry no
+information).  cpu_time misses work done in child processes (piped
+aligners), which is why mean_load is taken into account.
+
+Recommended threads: under Amdahl a task's cost (threads * s) only grows
+with t, so the recommendation is the smallest t whose predicted runtime is
+at most max_slowdown times the runtime at the family's observed threads;
+threads are never raised beyond what was observed.  Recommended mem_mb: the family's peak
+max(max_rss, max_pss) plus headroom, rounded up, but at most the RAM of the
+instance type the peak task ran on (simulate.INSTANCE_TYPES): the peak is
+known to fit there, and headroom beyond it would rule out the very instance
+the family needs (mrkdup peaks at 686 GB on a 768 GiB m7i.48xlarge).
+mem_capped flags those families, whose headroom is smaller than asked.
+
+task_cost is prorated by reserved threads (spot_cost * s * threads / nproc),
+so on the same instance a task's projected cost scales with t * s(t).
+"""
+
+import numpy as np
+import pandas as pd
+
+from daylily_giab import simulate
+
+
+def rule_family(df):
+    """'<caller>.<step>' for caller rules, else step; a Series on df.index."""
+    step = df["step"].astype(object)
+    caller = df["caller"].astype(object)
+    return (caller + "." + step).where(caller.notna(), step)
+
+
+def task_scaling(df):
+    """
+    Per-task family, threads, busy_cores and parallel_fraction (NaN for
+    single-thread tasks).
+    """
+    threads = df["snakemake_threads"].to_numpy(dtype="float64")
+    s = df["s"].to_numpy(dtype="float64")
+    busy = np.fmax(np.divide(df["cpu_time"].to_numpy(dtype="float64"), s, out=np.zeros_like(s), where=s > 0),
+                   df["mean_load"].to_numpy(dtype="float64") / 100.0)
+    speedup = np.clip(busy, 1.0, np.maximum(threads, 1.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(threads > 1, (1 - 1 / speedup) / (1 - 1 / threads), np.nan)
+
+    return pd.DataFrame({
+        "family": rule_family(df).to_numpy(),
+        "threads": threads,
+        "s": s,
+        "busy_cores": busy,
+        "parallel_fraction": fraction,
+        "mem_peak_mb": np.fmax(df["max_rss"].to_numpy(dtype="float64"), df["max_pss"].to_numpy(dtype="float64")),
+        "task_cost": df["task_cost"].to_numpy(dtype="float64"),
+        "instance_mem_mb": instance_mem_mb(df),
+    }, index=df.index)
+
+
+def instance_mem_mb(df):
+    """RAM (MB) of each task's instance_type per simulate.INSTANCE_TYPES (NaN when unknown or absent)."""
+    if "instance_type" not in df.columns:
+        return np.full(len(df), np.nan)
+    mem = {name: gib * 1024.0 for name, (_, gib) in simulate.INSTANCE_TYPES.items()}
+    return df["instance_type"].astype(object).map(mem).to_numpy(dtype="float64")
+
+
+def amdahl_time(t1, fraction, threads):
+    """Runtime on `threads` of a task that takes t1 on one thread (f=NaN: serial)."""
+    fraction = np.nan_to_num(np.asarray(fraction, dtype="float64"), nan=0.0)
+    return t1 * ((1 - fraction) + fraction / threads)
+
+
+def right_threads(fraction, threads, max_slowdown=1.25):
+    """
+    Smallest t in [1, threads] with s(t) <= max_slowdown * s(threads):
+    (1 - f) + f / t <= k * ((1 - f) + f / threads)  <=>  t >= f / (k * (...) - (1 - f)).
+    """
+    fraction = np.nan_to_num(np.asarray(fraction, dtype="float64"), nan=0.0)
+    threads = np.maximum(np.asarray(threads, dtype="float64"), 1.0)
+    budget = max_slowdown * ((1 - fraction) + fraction / threads) - (1 - fraction)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        needed = np.where(fraction > 0, np.ceil(fraction / budget - 1e-9), 1.0)
+    return np.clip(needed, 1, threads).astype("int64")
+
+
+def recommend(df, max_slowdown=1.25, mem_headroom=0.2, mem_round_mb=256):
+    """
+    One row per rule family:
+      n_tasks, threads (most common observed), thread_counts (all observed)
+      busy_cores, cpu_efficiency (busy / threads), parallel_fraction   medians
+      mem_peak_mb                      largest max(max_rss, max_pss)
+      mem_cap_mb                       RAM of the instance type of the peak-memory task
+      rec_threads, rec_mem_mb          the recommendation
+      mem_capped                       rec_mem_mb was lowered to mem_cap_mb
+      cost, rec_cost, cost_saved, cost_saved_frac
+      core_h, rec_core_h               reserved thread-hours, now and projected
+      mean_s, rec_mean_s               mean task wall time, now and projected
+    Projections apply the family's f to every task at its observed threads.
+    """
+    tasks = task_scaling(df)
+    tasks["cpu_efficiency"] = tasks["busy_cores"] / tasks["threads"].clip(lower=1)
+    grouped = tasks.groupby("family", sort=True)
+    fits = grouped.agg(
+        n_tasks=("s", "size"),
+        threads=("threads", lambda t: int(t.mode().iloc[0])),
+        thread_counts=("threads", lambda t: ",".join(str(int(v)) for v in sorted(t.unique()))),
+        busy_cores=("busy_cores", "median"),
+        cpu_efficiency=("cpu_efficiency", "median"),
+        parallel_fraction=("parallel_fraction", "median"),
+        mem_peak_mb=("mem_peak_mb", "max"),
+    )
+    peak = tasks["mem_peak_mb"].fillna(-1.0).groupby(tasks["family"], sort=True).idxmax()
+    fits["mem_cap_mb"] = tasks.loc[peak.to_numpy(), "instance_mem_mb"].to_numpy()
+    fits["rec_threads"] = right_threads(fits["parallel_fraction"], fits["threads"], max_slowdown)
+    mem_mb = (np.ceil(fits["mem_peak_mb"].fillna(0) * (1 + mem_headroom) / mem_round_mb)
+              .clip(lower=1).astype("int64") * mem_round_mb)
+    fits["mem_capped"] = (mem_mb > fits["mem_cap_mb"]).to_numpy()
+    fits["rec_mem_mb"] = mem_mb.where(~fits["mem_capped"], fits["mem_cap_mb"]).astype("int64")
+
+    # every task from its observed threads to its family's recommendation
+    f = tasks["family"].map(fits["parallel_fraction"]).to_numpy()
+    new_threads = tasks["family"].map(fits["rec_threads"]).to_numpy(dtype="float64")
+    threads = tasks["threads"].clip(lower=1).to_numpy()
+    t1 = tasks["s"].to_numpy() / amdahl_time(1.0, f, threads)
+    tasks["rec_s"] = amdahl_time(t1, f, new_threads)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(tasks["s"] > 0, new_threads * tasks["rec_s"] / (threads * tasks["s"]), 1.0)
+    tasks["rec_cost"] = tasks["task_cost"] * ratio
+    tasks["core_h"] = threads * tasks["s"] / 3600
+    tasks["rec_core_h"] = new_threads * tasks["rec_s"] / 3600
+
+    totals = tasks.groupby("family", sort=True).agg(
+        cost=("task_cost", "sum"), rec_cost=("rec_cost", "sum"),
+        core_h=("core_h", "sum"), rec_core_h=("rec_core_h", "sum"),
+        mean_s=("s", "mean"), rec_mean_s=("rec_s", "mean"),
+    )
+    out = fits.join(totals)
+    out["cost_saved"] = out["cost"] - out["rec_cost"]
+    out["cost_saved_frac"] = np.where(out["cost"] > 0, out["cost_saved"] / out["cost"].where(out["cost"] > 0), 0.0)
+    return out.reset_index()
+
+
+def resources(recommendations):
+    """{family: {"threads": int, "mem_mb": int}} for a workflow config."""
+    return {
+        row.family: {"threads": int(row.rec_threads), "mem_mb": int(row.rec_mem_mb)}
+        for row in recommendations.itertuples(index=False)
+    }
@@ -0,0 +1,100 @@
+"""
+Vectorized parsing of daylily Snakemake rule names.
+
+Benchmark rule names follow <aligner>.<caller|step>[.<step|shard>], e.g.
+
+  bwa2a.alNsort                  aligner=bwa2a  step=alNsort
+  bwa2a.mrkdup.sort.picard       aligner=bwa2a  step=mrkdup.sort.picard
+  bwa2a.deep.1                   aligner=bwa2a  caller=deep   step=call  shard=1
+  strobe.oct.9~1-50000000        aligner=strobe caller=oct    step=call  shard=9~1-50000000
+                                 (shard_chrom=9, shard_start=1, shard_end=50000000)
+  strobe.sentd.1-24              aligner=strobe caller=sentd  step=call  shard=1-24
+  sent.deep.concat.fofn          aligner=sent   caller=deep   step=concat.fofn
+  dirsetup                       step=dirsetup (no aligner)
+
+normalized_rule drops the shard, so every shard of a caller folds into
+'<aligner>.<caller>'; all other rules are kept verbatim.
+
+Parsing runs once per distinct rule name (a few hundred, even when the table
+has millions of rows) and is broadcast back to rows through categorical codes.
+"""
+
+import pandas as pd
+
+# Second rule component values that name a variant caller rather than a step.
+CALLERS = ("deep", "clair3", "oct", "lfq2", "sentd", "tiddit", "dysgu", "manta")
+
+RULE_COLUMNS = [
+    "aligner", "caller", "step", "shard",
+    "shard_chrom", "shard_start", "shard_end", "normalized_rule",
+]
+
+_RULE_RE = r"^(?P<head>[^.]+)(?:\.(?P<second>[^.]+))?(?:\.(?P<rest>.+))?$"
+_SHARD_RE = r"^(?P<shard>(?P<chrom>\d+)(?:~(?P<start>\d+)-(?P<end>\d+)|-(?P<chrom_last>\d+))?)$"
+
+
+def parse_rule_names(names):
+    """
+    Parse distinct rule names into a DataFrame indexed by rule name with
+    RULE_COLUMNS.  names may contain duplicates; they are parsed once.
+    """
+    names = pd.Index(pd.unique(pd.Series(names, dtype="object").dropna()), name="rule")
+    s = pd.Series(names, index=names, dtype="object")
+
+    parts = s.str.extract(_RULE_RE)
+    dotted = parts["second"].notna()
+    shard = parts["rest"].str.extract(_SHARD_RE)
+    is_shard = dotted & shard["shard"].notna()
+    is_caller = dotted & parts["second"].isin(CALLERS)
+
+    out = pd.DataFrame(index=names)
+    out["aligner"] = parts["head"].where(dotted)
+    out["caller"] = parts["second"].where(is_caller)
+
+    # step: 'call' for shards, the tail after the caller, or everything after the aligner
+    after_aligner = parts["second"].str.cat(parts["rest"], sep=".", na_rep="").str.rstrip(".")
+    step = after_aligner.where(~is_caller, parts["rest"])
+    step = step.mask(is_shard | (is_caller & parts["rest"].isna()), "call")
+    out["step"] = step.where(dotted, s)
+
+    out["shard"] = shard["shard"].where(is_shard)
+    chrom = shard["chrom"].where(shard["chrom_last"].isna(), shard["chrom"] + "-" + shard["chrom_last"])
+    out["shard_chrom"] = chrom.where(is_shard)
+    out["shard_start"] = pd.to_numeric(shard["start"].where(is_shard), errors="coerce")
+    out["shard_end"] = pd.to_numeric(shard["end"].where(is_shard), errors="coerce")
+
+    out["normalized_rule"] = s.where(~is_shard, parts["head"] + "." + parts["second"])
+    return out
+
+
+def parse_rules(rules):
+    """
+    Row-aligned parsed-rule columns for a Series of rule names (categorical or not).
+    Returns a DataFrame with RULE_COLUMNS on rules.index; text columns are categorical.
+    """
+    if isinstance(rules.dtype, pd.CategoricalDtype):
+        codes, uniques = rules.cat.codes.to_numpy(), rules.cat.categories.astype("object")
+    else:
+        codes, uniques = pd.factorize(rules.astype("object"))
+    table = parse_rule_names(uniques)
+    out = {}
+    for col in RULE_COLUMNS:
+        values = table[col].to_numpy()
+        if col in ("shard_start", "shard_end"):
+            column = pd.Series(values.astype("float64")[codes], index=rules.index)
+            column[codes < 0] = float("nan")
+        else:
+            # Sorted categories, so groupby(observed=True) orders rows like plain strings would
+            cats = pd.Index(table[col].dropna().unique()).sort_values()
+            col_codes = pd.Categorical(values, categories=cats).codes
+            row_codes = col_codes[codes]
+            row_codes[codes < 0] = -1
+            column = pd.Series(pd.Categorical.from_codes(row_codes, categories=cats), index=rules.index)
+        out[col] = column
+    return pd.DataFrame(out, index=rules.index)
+
+
+def chrom_sort_key(chrom):
+    """Natural order for shard_chrom values: 1, 2, ..., 24, then ranges like '1-24'."""
+    head, _, tail = str(chrom).partition("-")
+    return (1 if tail else 0, int(head) if head.isdigit() else 10**6, str(chrom))
@@ -0,0 +1,37 @@
+"""
+One place for sample-ID normalization.
+
+The same library shows up under different names depending on the table:
+
+  benchmarks_summary / aggregated CSV   RIH0_ANA0-HG001-19
+  concordance Sample                    RIH0_ANA0-HG001-19_DBC0_0
+  alignstats sample                     RIH0_ANA0-HG001-19_bwa2a      (+ '_<aligner>')
+
+normalize_samples() maps all of them to the run-local sample ID
+('RIH0_ANA0-HG001-19', the key the meta analysis joins on) and to the GIAB
+AltId ('HG001', the key runs are compared on: the RIH/ANA/DBC parts change
+between campaigns, the GIAB sample does not).
+"""
+
+import pandas as pd
+
+# Concordance / MultiQC suffix of a sample ID
+_DBC_SUFFIX_RE = r"_DBC\d+_\d+$"
+
+_ALTID_RE = r"(HG\d+)"
+
+
+def normalize_samples(samples, aligners=None):
+    """
+    DataFrame (same index as samples) with 'sample', the run-local sample ID
+    without the '_DBC<n>_<n>' suffix or, where aligners (a matching sequence,
+    e.g. the alignstats aligner column) is given, the '_<aligner>' suffix,
+    and 'AltId', the GIAB ID (NaN for names without one, such as 'all.').
+    """
+    samples = pd.Series(samples, dtype="object")
+    base = samples.str.replace(_DBC_SUFFIX_RE, "", regex=True)
+    if aligners is not None:
+        suffixes = "_" + pd.Series(aligners, index=samples.index, dtype="object").astype(str)
+        base = pd.Series([b[:-len(x)] if isinstance(b, str) and b.endswith(x) else b
+                          for b, x in zip(base, suffixes)], index=samples.index, dtype="object")
+    return pd.DataFrame({"sample": base, "AltId": samples.str.extract(_ALTID_RE, expand=False)})
@@ -0,0 +1,192 @@
+"""
+Bootstrap confidence intervals and paired permutation tests for the
+concordance metrics of every pipeline and SNPClass.
+
+The unit of resampling is the GIAB sample.  Every metric is recomputed from
+the TP/FP/FN/TN counts summed over the (re)sampled samples, as in
+metrics.pooled, so a CI is the interval of the pooled (micro) metric:
+
+  cube, present, axes = count_cube(df)          SNPClass x Pipeline x Sample x count
+  ci = bootstrap_ci(df, n_resamples=10_000)     one row per SNPClass, Pipeline, metric
+  pairs = paired_tests(df, n_resamples=10_000)  one row per SNPClass, metric, pipeline pair
+
+bootstrap_ci draws multinomial sample weights once for all classes and
+pipelines, so all pipelines see the same resamples.  paired_tests swaps the
+two pipelines' counts per sample (a random or, when 2**n_samples <=
+n_resamples, every one of the 2**n_samples swap patterns: an exact test) and
+compares the pooled metric difference with the observed one; only samples
+both pipelines have are used.  p-values are two-sided, and q_value is the
+Benjamini-Hochberg adjustment within each SNPClass and metric.
+
+Resamples are applied as one einsum per chunk of resamples (chunks keep the
+resamples x classes x pipelines x counts array under MAX_ELEMENTS), never as a
+Python loop over resamples, pairs or classes.
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from daylily_giab.metrics import COUNT_COLUMNS, METRIC_COLUMNS, compute_metrics
+
+# Upper bound on the elements of one chunk of resampled counts
+MAX_ELEMENTS = 1 << 23
+
+
+def count_cube(df):
+    """
+    Counts of a prepared concordance table as a float64 array
+    [SNPClass, Pipeline, Sample, TP/FP/FN/TN] (duplicate rows summed, missing
+    cells 0), a bool array [SNPClass, Pipeline, Sample] of the cells present,
+    and the axis labels (classes, pipelines, samples), each sorted.
+    """
+    codes, axes = [], []
+    for col in ("SNPClass", "Pipeline", "Sample"):
+        cat = pd.Categorical(df[col].astype(str))
+        codes.append(cat.codes)
+        axes.append(list(cat.categories))
+    shape = tuple(len(a) for a in axes)
+    cube = np.zeros(shape + (len(COUNT_COLUMNS),))
+    np.add.at(cube, tuple(codes), df[COUNT_COLUMNS].to_numpy(dtype="float64"))
+    present = np.zeros(shape, dtype=bool)
+    present[tuple(codes)] = True
+    return cube, present, tuple(axes)
+
+
+def _chunks(n, per_resample):
+    step = max(1, MAX_ELEMENTS // max(1, per_resample))
+    for start in range(0, n, step):
+        yield slice(start, min(n, start + step))
+
+
+def _metrics(counts, metrics):
+    values = compute_metrics(*np.moveaxis(counts, -1, 0))
+    return np.stack([values[m] for m in metrics])
+
+
+def bootstrap_ci(df, n_resamples=10_000, confidence=0.95, metrics=METRIC_COLUMNS, seed=0):
+    """
+    Percentile bootstrap CI of each pooled metric per SNPClass and Pipeline.
+    Columns: SNPClass, Pipeline, metric, n_samples, estimate (all samples),
+    ci_low, ci_high.
+    """
+    cube, present, (classes, pipelines, samples) = count_cube(df)
+    metrics = list(metrics)
+    n_samples = len(samples)
+    rng = np.random.default_rng(seed)
+    weights = rng.multinomial(n_samples, np.full(n_samples, 1.0 / n_samples), size=n_resamples).astype("float64")
+
+    draws = np.empty((len(metrics), n_resamples) + cube.shape[:2])
+    for part in _chunks(n_resamples, cube[:, :, 0, :].size):
+        resampled = np.einsum("bs,cpsk->bcpk", weights[part], cube)
+        draws[:, part] = _metrics(resampled, metrics)
+
+    alpha = (1.0 - confidence) / 2
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN slices: metric undefined in a class
+        low, high = np.nanpercentile(draws, [100 * alpha, 100 * (1 - alpha)], axis=1)
+    estimate = _metrics(cube.sum(axis=2), metrics)
+
+    index = pd.MultiIndex.from_product([metrics, classes, pipelines], names=["metric", "SNPClass", "Pipeline"])
+    out = pd.DataFrame({
+        "n_samples": np.broadcast_to(present.sum(axis=2), estimate.shape).ravel(),
+        "estimate": estimate.ravel(),
+        "ci_low": low.ravel(),
+        "ci_high": high.ravel(),
+    }, index=index).reset_index()
+    out = out[np.broadcast_to(present.any(axis=2), estimate.shape).ravel()]
+    return out[["SNPClass", "Pipeline", "metric", "n_samples", "estimate", "ci_low", "ci_high"]].reset_index(drop=True)
+
+
+def swap_patterns(n_samples, n_resamples, rng):
+    """
+    [patterns, n_samples] 0/1 array of which samples swap pipelines, and
+    whether it is exact (all 2**n_samples patterns, used when that is no more
+    than n_resamples) or n_resamples random patterns.
+    """
+    if 2 ** n_samples <= n_resamples:
+        return ((np.arange(2 ** n_samples)[:, None] >> np.arange(n_samples)) & 1).astype("float64"), True
+    return rng.integers(0, 2, size=(n_resamples, n_samples)).astype("float64"), False
+
+
+def paired_tests(df, n_resamples=10_000, metrics=METRIC_COLUMNS, seed=0):
+    """
+    Paired permutation test of the pooled metric difference for every pair of
+    pipelines in every SNPClass.  Columns: SNPClass, metric, pipeline_a,
+    pipeline_b, n_samples (shared), estimate_a, estimate_b, diff (a - b),
+    p_value, q_value, exact.
+    """
+    cube, present, (classes, pipelines, samples) = count_cube(df)
+    metrics = list(metrics)
+    ia, ib = np.triu_indices(len(pipelines), 1)
+    shared = present[:, ia, :] & present[:, ib, :]
+    counts_a = cube[:, ia] * shared[..., None]
+    counts_b = cube[:, ib] * shared[..., None]
+    obs_a, obs_b = counts_a.sum(axis=2), counts_b.sum(axis=2)
+    estimate_a, estimate_b = _metrics(obs_a, metrics), _metrics(obs_b, metrics)
+    observed = np.abs(estimate_a - estimate_b)
+
+    patterns, exact = swap_patterns(len(samples), n_resamples, np.random.default_rng(seed))
+    delta = counts_b - counts_a
+    total = obs_a + obs_b
+    extreme = np.zeros(observed.shape)
+    for part in _chunks(len(patterns), obs_a.size):
+        perm_a = obs_a + np.einsum("rs,cqsk->rcqk", patterns[part], delta)
+        diff = np.abs(_metrics(perm_a, metrics) - _metrics(total - perm_a, metrics))
+        # a small tolerance so permutations tying the observed difference count as extreme
+        with np.errstate(invalid="ignore"):
+            extreme += (diff >= observed[:, None] - 1e-12).sum(axis=1)
+    n = len(patterns)
+    p_value = extreme / n if exact else (extreme + 1) / (n + 1)
+    p_value[np.isnan(observed)] = np.nan
+
+    index = pd.MultiIndex.from_product([metrics, classes, range(len(ia))], names=["metric", "SNPClass", "pair"])
+    out = pd.DataFrame({
+        "n_samples": np.broadcast_to(shared.sum(axis=2), observed.shape).ravel(),
+        "estimate_a": estimate_a.ravel(),
+        "estimate_b": estimate_b.ravel(),
+        "p_value": p_value.ravel(),
+    }, index=index).reset_index()
+    out = out[out["n_samples"] > 0]
+    out.insert(2, "pipeline_a", np.asarray(pipelines, dtype=object)[ia[out["pair"]]])
+    out.insert(3, "pipeline_b", np.asarray(pipelines, dtype=object)[ib[out["pair"]]])
+    out["diff"] = out["estimate_a"] - out["estimate_b"]
+    out["q_value"] = out.groupby(["SNPClass", "metric"], sort=False)["p_value"].transform(bh_adjust)
+    out["exact"] = exact
+    return out[["SNPClass", "metric", "pipeline_a", "pipeline_b", "n_samples", "estimate_a", "estimate_b", "diff",
+                "p_value", "q_value", "exact"]].reset_index(drop=True)
+
+
+def bh_adjust(p):
+    """Benjamini-Hochberg q-values of a p-value Series (NaN stays NaN and is not counted)."""
+    values = p.to_numpy(dtype="float64")
+    q = np.full(values.shape, np.nan)
+    ok = ~np.isnan(values)
+    if ok.any():
+        v = values[ok]
+        order = np.argsort(v)
+        ranked = v[order] * len(v) / np.arange(1, len(v) + 1)
+        ranked = np.minimum.accumulate(ranked[::-1])[::-1]
+        adjusted = np.empty_like(v)
+        adjusted[order] = np.minimum(ranked, 1.0)
+        q[ok] = adjusted
+    return pd.Series(q, index=p.index)
+
+
+def versus_best(ci, pairs, snp_class, metric, alpha=0.05, higher_is_better=True):
+    """
+    The best pipeline by pooled estimate for one SNPClass and metric, and a
+    {pipeline: q_value} of every other pipeline compared with it; a q_value
+    >= alpha means the difference is not significant.  (None, {}) when the
+    class has no estimates.
+    """
+    rows = ci[(ci["SNPClass"] == snp_class) & (ci["metric"] == metric)].dropna(subset=["estimate"])
+    if rows.empty:
+        return None, {}
+    best = rows.loc[rows["estimate"].idxmax() if higher_is_better else rows["estimate"].idxmin(), "Pipeline"]
+    sub = pairs[(pairs["SNPClass"] == snp_class) & (pairs["metric"] == metric)
+                & ((pairs["pipeline_a"] == best) | (pairs["pipeline_b"] == best))]
+    other = sub["pipeline_b"].where(sub["pipeline_a"] == best, sub["pipeline_a"])
+    return best, dict(zip(other, sub["q_value"]))
+
@@ -0,0 +1,358 @@
+"""
+Discrete-event simulation of a projected batch on a fixed fleet of instances,
+seeded from the Snakemake benchmarks (after
+generate_benchmark_plots.prepare_benchmarks).
+
+Workload: every simulated sample copies the calling-path tasks of one
+historical sample (drawn with a fixed seed): alNsort -> mrkdup per aligner,
+then per caller the call shards -> concat.fofn -> merge -> concordance
+(critical_path.STAGES).  A stage starts when every task of the previous
+stage has finished.  Tasks reserve snakemake_threads cores (capped at the
+largest instance with room for their memory, as Snakemake caps threads at
+the node's cores) and their family's peak max(max_rss, max_pss); with a right-sizing table
+(rightsizing.recommend) they reserve rec_threads / rec_mem_mb instead and
+their runtime is rescaled with the family's Amdahl fit.
+
+Scheduler: greedy first-fit in ready order, driven by a heap of task
+completions.  Ready tasks that fit nowhere wait in one FIFO per (cores,
+mem_mb) shape; since capacity only grows on the host that just released a
+task, only that host is refilled, so each event costs O(shapes + hosts)
+rather than a rescan of every waiting task.
+
+Costs: the sentieon_case_study.tsv prices are $/h for 192-vCPU spot
+instances of an AZ; an instance is charged price * vcpus / 192.  'fixed'
+bills every instance for the whole makespan, 'span' only from its first
+task start to its last task end (an autoscaling fleet).
+"""
+
+import heapq
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from daylily_giab import critical_path, rightsizing
+
+# vCPUs and memory (GiB) per instance type
+INSTANCE_TYPES = {
+    "c6i.32xlarge": (128, 256),
+    "m6i.32xlarge": (128, 512),
+    "m6i.metal": (128, 512),
+    "r6i.metal": (128, 1024),
+    "c7i.48xlarge": (192, 384),
+    "c7i.metal-48xl": (192, 384),
+    "m7i.48xlarge": (192, 768),
+    "m7i.metal-48xl": (192, 768),
+    "r7i.48xlarge": (192, 1536),
+    "r7i.metal-48xl": (192, 1536),
+    "r7i.2xlarge": (8, 64),
+}
+
+# sentieon_case_study.tsv prices are for instances of this many vCPUs
+PRICE_VCPUS = 192
+
+PRICE_STATS = {"median": "median_spot", "min": "min_spot", "max": "max_spot", "harmonic": "harmonic_spot"}
+
+CALL_STAGES = critical_path.STAGES[critical_path.STAGES.index("call"):]
+
+
+def parse_fleet(spec):
+    """
+    'm7i.48xlarge:4,r7i.48xlarge' -> DataFrame with one row per host:
+    host, instance_type, vcpus, mem_mb.
+    """
+    rows = []
+    for item in str(spec).split(","):
+        name, _, count = item.strip().partition(":")
+        if name not in INSTANCE_TYPES:
+            raise ValueError(f"Unknown instance type '{name}'. Expected one of: {', '.join(INSTANCE_TYPES)}")
+        vcpus, mem_gib = INSTANCE_TYPES[name]
+        rows.extend([(name, vcpus, mem_gib * 1024)] * int(count or 1))
+    fleet = pd.DataFrame(rows, columns=["instance_type", "vcpus", "mem_mb"])
+    fleet.insert(0, "host", np.arange(len(fleet)))
+    return fleet
+
+
+def parse_pipelines(labels):
+    """['bwa2a-deep', 'sent-sentd'] -> [('bwa2a', 'deep'), ('sent', 'sentd')]."""
+    pipelines = []
+    for label in labels:
+        aligner, sep, caller = label.partition("-")
+        if not sep:
+            raise ValueError(f"Pipeline '{label}' is not <aligner>-<caller>")
+        pipelines.append((aligner, caller))
+    return pipelines
+
+
+def task_table(df, pipelines, sizing=None, mem_round_mb=256):
+    """
+    Calling-path tasks of the selected (aligner, caller) pipelines with
+    sample, aligner, caller, step, family, s, cores and mem_mb reservations.
+    sizing: rightsizing.recommend() output (or its TSV) to apply.
+    """
+    keys = ["sample", "aligner", "caller", "step"]
+    tasks = df.loc[df["step"].isin(critical_path.ALIGNER_STAGES + CALL_STAGES),
+                   keys + ["s", "snakemake_threads", "max_rss", "max_pss"]].copy()
+    for col in keys:
+        tasks[col] = tasks[col].astype(object)
+
+    aligners = {a for a, _ in pipelines}
+    pairs = pd.MultiIndex.from_tuples(pipelines)
+    is_align = tasks["step"].isin(critical_path.ALIGNER_STAGES) & tasks["aligner"].isin(aligners)
+    is_call = pd.MultiIndex.from_frame(tasks[["aligner", "caller"]]).isin(pairs)
+    tasks = tasks[is_align | is_call].reset_index(drop=True)
+
+    tasks["family"] = rightsizing.rule_family(tasks)
+    peak = np.fmax(tasks["max_rss"], tasks["max_pss"]).groupby(tasks["family"]).transform("max")
+    tasks["mem_mb"] = np.ceil(peak.fillna(0) / mem_round_mb).clip(lower=1) * mem_round_mb
+    tasks["cores"] = tasks["snakemake_threads"].clip(lower=1)
+
+    if sizing is not None:
+        fam = sizing.set_index("family")
+        new = tasks["family"].map(fam["rec_threads"])
+        known = new.notna().to_numpy()
+        f = tasks["family"].map(fam["parallel_fraction"]).to_numpy()
+        new = new.fillna(tasks["cores"]).to_numpy(dtype="float64")
+        scale = rightsizing.amdahl_time(1.0, f, new) / rightsizing.amdahl_time(1.0, f, tasks["cores"].to_numpy())
+        tasks["s"] = np.where(known, tasks["s"] * scale, tasks["s"])
+        tasks["cores"] = np.where(known, new, tasks["cores"])
+        tasks["mem_mb"] = np.where(known, tasks["family"].map(fam["rec_mem_mb"]), tasks["mem_mb"])
+
+    tasks["cores"] = tasks["cores"].astype("int64")
+    tasks["mem_mb"] = tasks["mem_mb"].astype("int64")
+    return tasks.drop(columns=["snakemake_threads", "max_rss", "max_pss"])
+
+
+def _sample_template(sample_tasks, pipelines):
+    """
+    Stages of one historical sample as ([task index arrays], [successor
+    stage lists], [root stages]); empty stages are skipped.
+    """
+    groups = sample_tasks.assign(caller=sample_tasks["caller"].fillna("")).groupby(
+        ["aligner", "caller", "step"], sort=False).indices
+    stages, succ, roots = [], [], []
+
+    def chain(names, lookup, prev):
+        for name in names:
+            idx = groups.get(lookup + (name,))
+            if idx is None or not len(idx):
+                continue
+            stages.append(sample_tasks.index.to_numpy()[idx])
+            succ.append([])
+            if prev is None:
+                roots.append(len(stages) - 1)
+            else:
+                succ[prev].append(len(stages) - 1)
+            prev = len(stages) - 1
+        return prev
+
+    for aligner in dict.fromkeys(a for a, _ in pipelines):
+        aligned = chain(critical_path.ALIGNER_STAGES, (aligner, ""), None)
+        for caller in (c for a, c in pipelines if a == aligner):
+            chain(CALL_STAGES, (aligner, caller), aligned)
+    return stages, succ, roots
+
+
+def fit_cores(cores, mem_mb, fleet):
+    """
+    cores capped, per task, at the vCPUs of the largest host of the fleet
+    with at least mem_mb of memory.  Tasks no host has the memory for keep
+    their cores (simulate() rejects them).
+    """
+    order = np.argsort(fleet["mem_mb"].to_numpy(), kind="stable")
+    host_mem = fleet["mem_mb"].to_numpy()[order]
+    # most vCPUs among the hosts with at least host_mem[i] of memory
+    most = np.maximum.accumulate(fleet["vcpus"].to_numpy()[order][::-1])[::-1]
+    i = np.searchsorted(host_mem, mem_mb, side="left")
+    fits = i < len(host_mem)
+    return np.where(fits, np.minimum(cores, most[np.minimum(i, len(most) - 1)]), cores)
+
+
+def _unplaceable(cores, mem_mb, fleet):
+    """Mask of the tasks that no single host has both the cores and the memory for."""
+    vcpus = fleet["vcpus"].to_numpy()
+    mems = fleet["mem_mb"].to_numpy()
+    shapes, shape_of = np.unique(np.stack([cores, mem_mb]), axis=1, return_inverse=True)
+    fits = ((shapes[0][:, None] <= vcpus) & (shapes[1][:, None] <= mems)).any(axis=1)
+    return ~fits[shape_of.ravel()]
+
+
+class Workload:
+    """
+    Tasks (dur, cores, mem_mb, stage) and the stage DAG of a simulated batch;
+    with a fleet, cores are capped with fit_cores().
+    """
+
+    __slots__ = ("dur", "cores", "mem_mb", "stage", "stage_tasks", "stage_next", "roots", "n_samples")
+
+    def __init__(self, tasks, pipelines, n_samples, seed=0, fleet=None):
+        eligible = [
+            sample for sample, part in tasks.groupby("sample", sort=True)
+            if all(((part["aligner"] == a) & (part["caller"] == c) & (part["step"] == "call")).any()
+                   for a, c in pipelines)
+        ]
+        if not eligible:
+            raise ValueError("No historical sample has call tasks for every selected pipeline")
+        templates = {s: _sample_template(tasks[tasks["sample"] == s], pipelines) for s in eligible}
+        drawn = np.random.default_rng(seed).choice(len(eligible), size=n_samples)
+
+        cores = tasks["cores"].to_numpy()
+        if fleet is not None:
+            cores = fit_cores(cores, tasks["mem_mb"].to_numpy(), fleet)
+
+        rows, stage, stage_tasks, stage_next, roots = [], [], [], [], []
+        n_tasks = 0
+        for i in drawn:
+            stages, succ, sample_roots = templates[eligible[i]]
+            offset = len(stage_tasks)
+            for sid, (idx, nxt) in enumerate(zip(stages, succ)):
+                rows.append(idx)
+                stage.append(np.full(len(idx), offset + sid))
+                stage_tasks.append(range(n_tasks, n_tasks + len(idx)))
+                stage_next.append([offset + n for n in nxt])
+                n_tasks += len(idx)
+            roots.extend(offset + r for r in sample_roots)
+
+        rows = np.concatenate(rows)
+        self.dur = tasks["s"].to_numpy(dtype="float64")[rows]
+        self.cores = cores[rows]
+        self.mem_mb = tasks["mem_mb"].to_numpy()[rows]
+        self.stage = np.concatenate(stage)
+        self.stage_tasks = stage_tasks
+        self.stage_next = stage_next
+        self.roots = roots
+        self.n_samples = n_samples
+
+
+def simulate(workload, fleet):
+    """
+    Run the batch on the fleet.  Returns (hosts, starts): the fleet with
+    n_tasks, busy_core_s (cores * s reserved), first_start_s and last_end_s
+    per host, and every task's start time.
+    """
+    vcpus = fleet["vcpus"].to_numpy()
+    mems = fleet["mem_mb"].to_numpy()
+    too_big = _unplaceable(workload.cores, workload.mem_mb, fleet)
+    if too_big.any():
+        worst = np.flatnonzero(too_big)[np.argmax(workload.mem_mb[too_big])]
+        raise ValueError(f"{int(too_big.sum())} tasks fit on no instance of the fleet, e.g. "
+                         f"{int(workload.cores[worst])} cores with {int(workload.mem_mb[worst])} MB")
+
+    dur = workload.dur.tolist()
+    cores = workload.cores.tolist()
+    mem = workload.mem_mb.tolist()
+    stage_of = workload.stage.tolist()
+    shape_ids, shape_of = np.unique(np.stack([workload.cores, workload.mem_mb]), axis=1, return_inverse=True)
+    shape_of = shape_of.ravel().tolist()
+
+    n_hosts = len(fleet)
+    free_c, free_m = vcpus.tolist(), mems.tolist()
+    host_tasks = [0] * n_hosts
+    busy = [0.0] * n_hosts
+    first = [np.inf] * n_hosts
+    last = [0.0] * n_hosts
+    starts = [np.nan] * len(dur)
+
+    left = [len(r) for r in workload.stage_tasks]
+    deps = [0] * len(left)
+    for nxt in workload.stage_next:
+        for n in nxt:
+            deps[n] += 1
+
+    queues = [deque() for _ in range(shape_ids.shape[1])]
+    waiting = set()
+    events = []
+    seq = 0
+
+    def start(t, h, now):
+        free_c[h] -= cores[t]
+        free_m[h] -= mem[t]
+        starts[t] = now
+        host_tasks[h] += 1
+        busy[h] += cores[t] * dur[t]
+        if now < first[h]:
+            first[h] = now
+        heapq.heappush(events, (now + dur[t], t, h))
+
+    def submit(stage_id, now):
+        nonlocal seq
+        for t in workload.stage_tasks[stage_id]:
+            q = queues[shape_of[t]]
+            if not q:
+                c, m = cores[t], mem[t]
+                for h in range(n_hosts):
+                    if free_c[h] >= c and free_m[h] >= m:
+                        start(t, h, now)
+                        break
+                else:
+                    q.append((seq, t))
+                    waiting.add(shape_of[t])
+            else:
+                q.append((seq, t))
+            seq += 1
+
+    def refill(h, now):
+        while waiting:
+            best = None
+            for shape in waiting:
+                s, t = queues[shape][0]
+                if cores[t] <= free_c[h] and mem[t] <= free_m[h] and (best is None or s < best[0]):
+                    best = (s, shape)
+            if best is None:
+                return
+            _, t = queues[best[1]].popleft()
+            if not queues[best[1]]:
+                waiting.discard(best[1])
+            start(t, h, now)
+
+    for root in workload.roots:
+        submit(root, 0.0)
+    while events:
+        now, t, h = heapq.heappop(events)
+        free_c[h] += cores[t]
+        free_m[h] += mem[t]
+        if now > last[h]:
+            last[h] = now
+        refill(h, now)
+        st = stage_of[t]
+        left[st] -= 1
+        if not left[st]:
+            for n in workload.stage_next[st]:
+                deps[n] -= 1
+                if not deps[n]:
+                    submit(n, now)
+    unstarted = int(np.isnan(starts).sum())
+    if waiting or unstarted:
+        raise RuntimeError(f"{unstarted} tasks never started "
+                           f"({sum(len(queues[shape]) for shape in waiting)} still queued)")
+
+    hosts = fleet.copy()
+    hosts["n_tasks"] = host_tasks
+    hosts["busy_core_s"] = busy
+    hosts["first_start_s"] = np.where(np.isfinite(first), first, np.nan)
+    hosts["last_end_s"] = np.where(np.array(host_tasks) > 0, last, np.nan)
+    return hosts, np.array(starts)
+
+
+def price_schedule(hosts, prices, stat="harmonic", n_samples=1):
+    """
+    Cost of a simulated schedule in every AZ of prices (loaders.load_spot_prices):
+    region_az, makespan_h, core_utilization, busy_core_h, instance_h (fixed /
+    span), cost_fixed, cost_span and per-sample costs, cheapest first.
+    """
+    makespan = np.nanmax(hosts["last_end_s"].to_numpy())
+    span_h = (hosts["last_end_s"] - hosts["first_start_s"]).fillna(0).to_numpy() / 3600
+    weight = hosts["vcpus"].to_numpy() / PRICE_VCPUS
+    hourly = prices[PRICE_STATS[stat]].to_numpy()[:, None] * weight[None, :]
+
+    out = pd.DataFrame({"region_az": prices["region_az"], "price_stat": stat})
+    out["makespan_h"] = makespan / 3600
+    out["core_utilization"] = hosts["busy_core_s"].sum() / (hosts["vcpus"].sum() * makespan)
+    out["busy_core_h"] = hosts["busy_core_s"].sum() / 3600
+    out["instance_h_fixed"] = len(hosts) * makespan / 3600
+    out["instance_h_span"] = span_h.sum()
+    out["cost_fixed"] = hourly.sum(axis=1) * makespan / 3600
+    out["cost_span"] = hourly @ span_h
+    out["cost_fixed_per_sample"] = out["cost_fixed"] / n_samples
+    out["cost_span_per_sample"] = out["cost_span"] / n_samples
+    return out.sort_values("cost_span", kind="stable").reset_index(drop=True)
@@ -0,0 +1,160 @@
+"""
+Stratified concordance: rows per coverage bin, GIAB stratification region
+and comparison footprint next to the whole-genome rows.
+
+The concordance schema carries three stratum dimensions, each with a value
+that means "not stratified" (WHOLE_GENOME):
+
+  CmpFootprint   comparison footprint       wgsHC (GIAB high-confidence WGS)
+  Stratum        GIAB stratification region all, or missing / no column
+  CovBin         coverage bin               -2
+
+Strata overlap (a variant is in one CovBin, but also in several GIAB
+regions), so counts may only be summed within one level of each dimension.
+Tables that ignore the strata take whole_genome(df) first; select_strata(df,
+keep) keeps every level of the dimensions in keep and the whole-genome level
+of the others.
+
+pool_strata() sums TP/FP/FN/TN per group with one np.bincount per count over
+the categorical codes (no Python loop over groups) and recomputes every
+metric (metrics.compute_metrics); drilldown() adds, per stratum, the change
+against the same pipeline and class over the whole genome and the stratum's
+share of the whole-genome errors.
+"""
+
+import numpy as np
+import pandas as pd
+
+from daylily_giab.metrics import COUNT_COLUMNS, compute_metrics
+
+STRATA_COLUMNS = ["CmpFootprint", "Stratum", "CovBin"]
+
+# The level of each stratum dimension that stands for the whole genome
+WHOLE_GENOME = {"CmpFootprint": "wgsHC", "Stratum": "all", "CovBin": -2}
+
+# Above this many possible groups (product of the key cardinalities), pool_strata numbers the
+# groups present with np.unique instead of counting into a dense array
+MAX_DENSE_GROUPS = 1 << 26
+
+
+def strata_columns(df):
+    """The STRATA_COLUMNS present in df."""
+    return [c for c in STRATA_COLUMNS if c in df.columns]
+
+
+def _whole_genome_mask(df, column):
+    values = df[column]
+    level = WHOLE_GENOME[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.isna().to_numpy() | (values.astype(object) == level).to_numpy()
+    return (values.isna() | (values == level)).to_numpy()
+
+
+def select_strata(df, keep=()):
+    """Rows at the whole-genome level of every stratum dimension not in keep."""
+    mask = np.ones(len(df), dtype=bool)
+    for column in strata_columns(df):
+        if column not in keep:
+            mask &= _whole_genome_mask(df, column)
+    return df if mask.all() else df[mask]
+
+
+def whole_genome(df):
+    """Rows that are not stratified (see WHOLE_GENOME); all rows of unstratified tables."""
+    return select_strata(df)
+
+
+def _codes(values):
+    """Integer codes and labels of a column (categorical codes when it already is one; NaN gets its own code)."""
+    cat = values.array if isinstance(values.dtype, pd.CategoricalDtype) else pd.Categorical(values)
+    codes = np.asarray(cat.codes, dtype=np.int64)
+    labels = pd.Index(cat.categories)
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(labels), codes)
+        labels = labels.append(pd.Index([np.nan]))
+    return codes, labels
+
+
+def pool_strata(df, by, counts=COUNT_COLUMNS):
+    """
+    Summed counts per group of `by`, with n_rows and every metric recomputed
+    from the sums; one row per group present, sorted by the by columns.
+    """
+    by = list(by)
+    codes, labels = zip(*(_codes(df[c]) for c in by)) if by else ((), ())
+    sizes = tuple(len(l) for l in labels)
+    n_dense = int(np.prod(sizes, dtype="float64")) if by else 1
+    flat = np.ravel_multi_index(codes, sizes) if by else np.zeros(len(df), dtype=np.int64)
+    if n_dense > MAX_DENSE_GROUPS:
+        present, flat = np.unique(flat, return_inverse=True)
+        n_groups, keep = len(present), slice(None)
+    else:
+        n_groups = n_dense
+        keep = present = np.flatnonzero(np.bincount(flat, minlength=n_dense))
+    key_codes = np.unravel_index(present, sizes) if by else ()
+
+    out = pd.DataFrame({c: labels[i].take(key_codes[i]) for i, c in enumerate(by)})
+    out["n_rows"] = np.bincount(flat, minlength=n_groups)[keep]
+    for c in counts:
+        out[c] = np.bincount(flat, weights=df[c].to_numpy(dtype="float64"), minlength=n_groups)[keep]
+    if all(c in out.columns for c in COUNT_COLUMNS):
+        for metric, values in compute_metrics(*(out[c].to_numpy() for c in COUNT_COLUMNS)).items():
+            out[metric] = values
+    return out
+
+
+def drilldown(df, by=("Aligner", "SNVCaller"), strata=None, classes=None, metric="Fscore"):
+    """
+    One row per group of by, SNPClass and stratum (every level of the
+    strata dimensions, default: all present), pooled over the other rows
+    (e.g. samples), with n_samples, the whole-genome metric and counts of the
+    same by + SNPClass group (wg_<metric>, wg_errors), delta = metric -
+    wg_<metric>, and error_share = the stratum's FP + FN over wg_errors.
+    """
+    by = list(by)
+    strata = strata_columns(df) if strata is None else list(strata)
+    if classes is not None:
+        df = df[df["SNPClass"].isin(classes)]
+    keys = by + ["SNPClass"]
+
+    rows = select_strata(df, keep=strata)
+    table = pool_strata(rows, keys + strata)
+    if "Sample" in rows.columns:
+        per_sample = pool_strata(rows, keys + strata + ["Sample"], counts=["TP"])
+        n_samples = per_sample.groupby(keys + strata, sort=False, observed=True, dropna=False).size()
+        table = table.merge(n_samples.rename("n_samples").reset_index(), on=keys + strata, how="left")
+
+    wg = pool_strata(whole_genome(df), keys)
+    wg = wg.assign(wg_errors=wg["FP"] + wg["FN"])[keys + [metric, "wg_errors"]]
+    table = table.merge(wg.rename(columns={metric: f"wg_{metric}"}), on=keys, how="left")
+    table["delta"] = table[metric] - table[f"wg_{metric}"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        table["error_share"] = np.where(table["wg_errors"] > 0,
+                                        (table["FP"] + table["FN"]) / table["wg_errors"], np.nan)
+    is_wg = np.ones(len(table), dtype=bool)
+    for column in strata:
+        is_wg &= _whole_genome_mask(table, column)
+    table["whole_genome"] = is_wg
+    return table
+
+
+def worst_strata(table, top=20, by=("Aligner", "SNVCaller"), min_truth=0):
+    """
+    The `top` strata with the lowest delta per by + SNPClass group
+    (whole-genome rows and strata with fewer than min_truth TP + FN left out).
+    """
+    sub = table[~table["whole_genome"] & (table["TP"] + table["FN"] >= min_truth)].dropna(subset=["delta"])
+    order = sub.sort_values("delta", kind="stable")
+    return order.groupby(list(by) + ["SNPClass"], sort=True, observed=True).head(top).sort_values(
+        list(by) + ["SNPClass", "delta"], kind="stable").reset_index(drop=True)
+
+
+def where(table, filters):
+    """Rows of table matching every {column: value} in filters (values compared as text)."""
+    mask = np.ones(len(table), dtype=bool)
+    for column, value in filters.items():
+        if column not in table.columns:
+            raise KeyError(f"Unknown column {column!r}")
+        mask &= (table[column].astype(str) == str(value)).to_numpy()
+    return table[mask]
+
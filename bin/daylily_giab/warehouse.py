@@ -0,0 +1,225 @@
+"""
+Append-only, partitioned Parquet store for benchmarks, concordance and alignstats.
+
+Layout (hive partitioning, one directory per table):
+
+  <root>/<table>/build=<build>/region_az=<region_az>/run=<run>/part-<sha16>.parquet
+
+Each ingested source TSV becomes one Parquet file named by the sha256 of the
+source, typed with the loaders.SCHEMAS schema.  Re-ingesting the same file is
+a no-op; ingesting different content into an existing run partition is
+refused (append-only: new runs get new partitions).  Files are sorted by
+their common filter columns and written in modest row groups, so
+query()'s filters skip row groups via Parquet statistics (predicate pushdown)
+and skip whole directories via the partition keys (partition pruning).
+
+The root defaults to ./warehouse and can be moved with DAYLILY_GIAB_WAREHOUSE.
+
+  from daylily_giab import warehouse
+  warehouse.query("concordance", build="hg38",
+                  where={"Aligner": "bwa2a", "SNVCaller": "deep", "SNPClass": "SNPts"})
+  warehouse.query("benchmarks", where={"rule": "sent.alNsort"})
+"""
+
+import glob
+import os
+
+import pandas as pd
+
+from daylily_giab import loaders
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = ds = pq = None
+
+WAREHOUSE_DIR = os.environ.get("DAYLILY_GIAB_WAREHOUSE", "warehouse")
+
+TABLES = ("benchmarks", "concordance", "alignstats")
+
+PARTITION_KEYS = ("build", "region_az", "run")
+
+# Sort order inside each file: the columns queries filter on, so row-group
+# min/max statistics are tight.
+SORT_KEYS = {
+    "benchmarks": ["rule", "sample"],
+    "concordance": ["SNPClass", "Aligner", "SNVCaller", "Sample"],
+    "alignstats": ["aligner", "sample"],
+}
+
+ROW_GROUP_SIZE = 4096
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("The warehouse needs pyarrow (pip install pyarrow)")
+
+
+def _partitioning():
+    # Explicit string schema: run names like '2024' must not be inferred as ints.
+    return ds.partitioning(pa.schema([(k, pa.string()) for k in PARTITION_KEYS]), flavor="hive")
+
+
+def _table_dir(root, table):
+    if table not in TABLES:
+        raise ValueError(f"Unknown warehouse table '{table}'. Expected one of: {', '.join(TABLES)}")
+    return os.path.join(root or WAREHOUSE_DIR, table)
+
+
+def _partition_dir(root, table, build, region_az, run):
+    return os.path.join(_table_dir(root, table), f"build={build}", f"region_az={region_az}", f"run={run}")
+
+
+def _to_storage(df):
+    """Categoricals are stored as plain strings so every file shares one schema."""
+    df = df.copy()
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object).where(df[col].notna(), None)
+    return df
+
+
+def _write_partition(df, table, path_dir, digest):
+    """Write one source file into its partition; returns (path, written?)."""
+    target = os.path.join(path_dir, f"part-{digest[:16]}.parquet")
+    if os.path.exists(target):
+        return target, False
+    existing = glob.glob(os.path.join(path_dir, "part-*.parquet"))
+    if existing:
+        raise ValueError(
+            f"{path_dir} already holds {os.path.basename(existing[0])} from different source data; "
+            "the warehouse is append-only, ingest changed data under a new run name"
+        )
+    sort_keys = [c for c in SORT_KEYS[table] if c in df.columns]
+    df = _to_storage(df.sort_values(sort_keys, kind="stable") if sort_keys else df)
+
+    os.makedirs(path_dir, exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp, row_group_size=ROW_GROUP_SIZE)
+    os.replace(tmp, target)
+    return target, True
+
+
+def ingest_file(path, table, build, run, region_az=None, root=None):
+    """
+    Append one source TSV to the warehouse.  Benchmarks rows are split by
+    their own region_az column; concordance and alignstats carry no region,
+    so region_az must be given.  Returns a list of (partition file, written?).
+    """
+    _require_pyarrow()
+    digest = loaders.file_digest(path)
+    df = loaders.parse_table(path, table)
+
+    if "region_az" in df.columns:
+        df["region_az"] = df["region_az"].astype(object).fillna(region_az or "unknown")
+        groups = list(df.groupby("region_az", sort=True))
+    elif region_az is None:
+        raise ValueError(f"{table} has no region_az column; pass region_az for {path}")
+    else:
+        groups = [(region_az, df)]
+
+    results = []
+    for az, part in groups:
+        part = part.drop(columns=["region_az"], errors="ignore")
+        results.append(_write_partition(part, table, _partition_dir(root, table, build, az, run), digest))
+    return results
+
+
+def ingest_run(build, run, benchmarks=None, concordance=None, alignstats=None, region_az=None, root=None):
+    """
+    Ingest one run's inputs (any subset).  Without region_az, concordance and
+    alignstats take the benchmarks' most frequent region_az.
+    Returns {table: [(partition file, written?), ...]}.
+    """
+    _require_pyarrow()
+    if region_az is None and benchmarks is not None:
+        counts = loaders.parse_table(benchmarks, "benchmarks")["region_az"].value_counts()
+        region_az = counts.index[0] if len(counts) else None
+
+    results = {}
+    for table, path in (("benchmarks", benchmarks), ("concordance", concordance), ("alignstats", alignstats)):
+        if path is not None:
+            results[table] = ingest_file(path, table, build, run, region_az=region_az, root=root)
+    return results
+
+
+def _expression(where, schema):
+    """
+    {column: value or list of values} -> pyarrow filter expression (AND of
+    terms).  Values are cast to the column's type in schema, so '64' from the
+    command line filters an integer column; an unknown column or a value the
+    type cannot hold is a ValueError.
+    """
+    expr = None
+    for col, value in (where or {}).items():
+        if value is None:
+            continue
+        if col not in schema.names:
+            raise ValueError(f"Unknown column '{col}'. Expected one of: {', '.join(schema.names)}")
+        many = isinstance(value, (list, tuple, set, frozenset))
+        typ = schema.field(col).type
+        if pa.types.is_dictionary(typ):
+            typ = typ.value_type
+        try:
+            values = pa.array(list(value) if many else [value]).cast(typ)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as e:
+            raise ValueError(f"Cannot filter {col} ({typ}) on {value!r}: {str(e).splitlines()[0]}") from None
+        term = ds.field(col).isin(values) if many else ds.field(col) == values[0]
+        expr = term if expr is None else expr & term
+    return expr
+
+
+def dataset(table, root=None):
+    """
+    The pyarrow Dataset behind a warehouse table (partition keys included as
+    columns).  Its schema is the union of every file's schema, so files
+    written under an older SCHEMAS version (e.g. concordance before the
+    Stratum column) read back with the missing columns as null and narrower
+    integer types widened, instead of the first file's schema hiding
+    columns of the others.
+    """
+    _require_pyarrow()
+    path = _table_dir(root, table)
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"No '{table}' data in warehouse {os.path.dirname(path)}")
+    files = ds.dataset(path, format="parquet", partitioning=_partitioning())
+    schema = pa.unify_schemas([pq.read_schema(f) for f in files.files] + [files.partitioning.schema],
+                              promote_options="permissive")
+    return ds.dataset(path, schema=schema, format="parquet", partitioning=_partitioning())
+
+
+def query(table, build=None, region_az=None, run=None, where=None, columns=None, root=None):
+    """
+    Select rows from a warehouse table as a typed DataFrame.
+
+    build / region_az / run and where values may be a single value or a list.
+    Partition keys prune directories; the other where columns are pushed down
+    to the Parquet row-group statistics; values are cast to the column types
+    (ValueError for an unknown column or an uncastable value).  columns limits
+    the columns read.  Text columns come back categorical, as from the loaders.
+    """
+    filters = {"build": build, "region_az": region_az, "run": run}
+    filters.update(where or {})
+    data = dataset(table, root)
+
+    if columns is not None:
+        columns = list(dict.fromkeys(list(columns)))
+    df = data.to_table(columns=columns, filter=_expression(filters, data.schema)).to_pandas()
+
+    categorical = set(loaders.SCHEMAS[table]["categorical"]) | set(PARTITION_KEYS)
+    for col in df.columns:
+        if col in categorical:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def partitions(table, root=None):
+    """DataFrame of (build, region_az, run, files) for the partitions of a table."""
+    rows = []
+    for path in sorted(glob.glob(os.path.join(_table_dir(root, table), "build=*", "region_az=*", "run=*"))):
+        keys = dict(part.split("=", 1) for part in os.path.relpath(path, _table_dir(root, table)).split(os.sep))
+        keys["files"] = len(glob.glob(os.path.join(path, "part-*.parquet")))
+        rows.append(keys)
+    return pd.DataFrame(rows, columns=list(PARTITION_KEYS) + ["files"])
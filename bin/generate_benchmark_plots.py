@@ -1,101 +1,115 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import re
 import argparse
 
-# Parse command line arguments
-parser = argparse.ArgumentParser(description="Process Snakemake benchmark data and generate plots")
-parser.add_argument("data_file", type=str, help="Path to the benchmark data file")
-parser.add_argument("genome_build", type=str, help="Genome build identifier for output files")
-parser.add_argument("identifier", type=str, help="Human-readable identifier for output file names")
-args = parser.parse_args()
-
-# Load the Snakemake benchmark data
-df = pd.read_csv(args.data_file, sep="\t")
-
-# Convert relevant columns to numeric where necessary
-df["s"] = pd.to_numeric(df["s"], errors="coerce")
-df["cpu_time"] = pd.to_numeric(df["cpu_time"], errors="coerce")
-df["cpu_efficiency"] = pd.to_numeric(df["cpu_efficiency"], errors="coerce")
-df["spot_cost"] = pd.to_numeric(df["spot_cost"], errors="coerce")
-df["snakemake_threads"] = pd.to_numeric(df["snakemake_threads"], errors="coerce")
-df["nproc"] = pd.to_numeric(df["nproc"], errors="coerce")
-df["task_cost"] = pd.to_numeric(df["task_cost"], errors="coerce")
-
-# Calculate theoretical minimum CPU time
-# df["theoretical_min_cost"] = df["task_cost"] * (1-df["cpu_efficiency"])
-
-# Extract HG00# sample identifier
-df["HG_sample"] = df["sample"].str.extract(r'(HG\d+)')
-
-# Normalize task names for sharded tasks
-def normalize_task_name(task_name):
-    match = re.match(r"([^.]+\.[^.]+)\.\d+", task_name)
-    return match.group(1) if match else task_name
-
-df["normalized_rule"] = df["rule"].apply(normalize_task_name)
-
-# Aggregate metrics for each sample and normalized rule
-aggregated_df = df.groupby(["sample", "normalized_rule"]).agg(
-    Total_runtime_user=("s", "sum"),
-    # Multiply cpu_time by threads before summing to get "Total_runtime_cpu":
-    Total_runtime_cpu=("cpu_time", lambda x: (x * df.loc[x.index, "snakemake_threads"]).sum()),
-    Total_cost=("task_cost", "sum"),
-    Total_snake_threads=("snakemake_threads", "sum"),
-    Avg_cpu_efficiency=("cpu_efficiency", "mean"),
-    Avg_task_cost=("task_cost", "mean")
-).reset_index()
-
-# Compute Runtime_cpu_per_vcpu (optional)
-aggregated_df["Runtime_cpu_per_vcpu"] = (
-    aggregated_df["Total_runtime_cpu"] / aggregated_df["Total_snake_threads"]
-)
-
-# ---------------------
-# Raw pre-aggregated boxplot for Task Cost
-# ---------------------
-plt.figure(figsize=(12, max(8, len(df["rule"].unique()) * 0.3)))
-sns.boxplot(x="task_cost", y="rule", data=df, palette="pastel")
-sns.stripplot(x="task_cost", y="rule", data=df, hue="HG_sample", dodge=True, jitter=True, size=4, alpha=0.7)
-plt.xlabel("Task Cost ($)", fontsize=12)
-plt.ylabel("Rule", fontsize=12)
-plt.title("Task Cost Across Raw Rules", fontsize=14)
-plt.legend(title="Sample", loc='lower center', bbox_to_anchor=(0.5, -0.2), ncol=5, frameon=False, fontsize=10)
-plt.tight_layout()
-plt.savefig(f"{args.identifier}_{args.genome_build}_raw_task_cost.png", dpi=300, bbox_inches='tight')
-plt.close()
-
-# ---------------------
-# Aggregated boxplot for Total Cost
-# ---------------------
-plt.figure(figsize=(12, max(8, len(aggregated_df["normalized_rule"].unique()) * 0.3)))
-sns.boxplot(x="Total_cost", y="normalized_rule", data=aggregated_df, palette="pastel")
-sns.stripplot(x="Total_cost", y="normalized_rule", data=aggregated_df, hue="sample", dodge=True, jitter=True, size=4, alpha=0.7)
-plt.xlabel("Total Task Cost ($)", fontsize=12)
-plt.ylabel("Aggregated Rule", fontsize=12)
-plt.title("Total Task Cost Across Aggregated Rules", fontsize=14)
-plt.legend(title="Sample", loc='lower center', bbox_to_anchor=(0.5, -0.2), ncol=5, frameon=False, fontsize=10)
-plt.tight_layout()
-plt.savefig(f"{args.identifier}_{args.genome_build}_aggregated_task_cost.png", dpi=300, bbox_inches='tight')
-plt.close()
-
-# ---------------------
-# New boxplot for Total Runtime CPU
-# ---------------------
-plt.figure(figsize=(12, max(8, len(aggregated_df["normalized_rule"].unique()) * 0.3)))
-sns.boxplot(x="Total_runtime_cpu", y="normalized_rule", data=aggregated_df, palette="pastel")
-sns.stripplot(x="Total_runtime_cpu", y="normalized_rule", data=aggregated_df, hue="sample", dodge=True, jitter=True, size=4, alpha=0.7)
-plt.xlabel("Total Runtime CPU (core-seconds)", fontsize=12)
-plt.ylabel("Aggregated Rule", fontsize=12)
-plt.title("Total Runtime CPU Across Aggregated Rules", fontsize=14)
-plt.legend(title="Sample", loc='lower center', bbox_to_anchor=(0.5, -0.2), ncol=5, frameon=False, fontsize=10)
-plt.tight_layout()
-plt.savefig(f"{args.identifier}_{args.genome_build}_aggregated_runtime_cpu.png", dpi=300, bbox_inches='tight')
-plt.close()
-
-# Save aggregated metrics
-aggregated_df.to_csv(f"{args.identifier}_{args.genome_build}_aggregated_task_metrics.csv", index=False)
-
-# Save task cost data
-df[["sample", "rule", "task_cost", "HG_sample"]].to_csv(f"{args.identifier}_{args.genome_build}_task_costs.csv", index=False)
+from daylily_giab import tracing
+# Table functions live in daylily_giab.benchmarks; re-exported for the scripts that import this module
+from daylily_giab.benchmarks import (aggregate_benchmarks, chromosome_summary, prepare_benchmarks,  # noqa: F401
+                                     shard_metrics, write_tables)
+from daylily_giab.loaders import load_benchmarks
+from daylily_giab.rules import chrom_sort_key
+
+
+def plot_shard_distribution(shards, out_png):
+    """Per-chromosome shard runtime and cost, one box per chromosome, colored by caller."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    order = sorted(shards["shard_chrom"].dropna().unique(), key=chrom_sort_key)
+    fig, axes = plt.subplots(2, 1, figsize=(max(12, len(order) * 0.6), 10), sharex=True)
+    for ax, (metric, label) in zip(axes, [("s", "Shard Wall Time (s)"), ("task_cost", "Shard Task Cost ($)")]):
+        sns.boxplot(x="shard_chrom", y=metric, hue="caller", data=shards, order=order,
+                    showfliers=False, ax=ax)
+        ax.set_ylabel(label, fontsize=12)
+        ax.set_xlabel("")
+    axes[0].set_title("Per-Chromosome Shard Runtime and Cost", fontsize=14)
+    axes[1].set_xlabel("Chromosome (shard)", fontsize=12)
+    axes[1].legend([], [], frameon=False)
+    plt.tight_layout()
+    with tracing.figure(out_png):
+        plt.savefig(out_png, dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def plot_raw_task_cost(df, out_png):
+    """Raw pre-aggregated boxplot for Task Cost."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(12, max(8, len(df["rule"].unique()) * 0.3)))
+    sns.boxplot(x="task_cost", y="rule", data=df, palette="pastel")
+    sns.stripplot(x="task_cost", y="rule", data=df, hue="HG_sample", dodge=True, jitter=True, size=4, alpha=0.7)
+    plt.xlabel("Task Cost ($)", fontsize=12)
+    plt.ylabel("Rule", fontsize=12)
+    plt.title("Task Cost Across Raw Rules", fontsize=14)
+    plt.legend(title="Sample", loc='lower center', bbox_to_anchor=(0.5, -0.2), ncol=5, frameon=False, fontsize=10)
+    plt.tight_layout()
+    with tracing.figure(out_png):
+        plt.savefig(out_png, dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+def plot_aggregated_boxplot(aggregated_df, metric, xlabel, title, out_png):
+    """Boxplot + per-sample strip of an aggregated metric by normalized rule."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(12, max(8, len(aggregated_df["normalized_rule"].unique()) * 0.3)))
+    sns.boxplot(x=metric, y="normalized_rule", data=aggregated_df, palette="pastel")
+    sns.stripplot(x=metric, y="normalized_rule", data=aggregated_df, hue="sample", dodge=True, jitter=True, size=4, alpha=0.7)
+    plt.xlabel(xlabel, fontsize=12)
+    plt.ylabel("Aggregated Rule", fontsize=12)
+    plt.title(title, fontsize=14)
+    plt.legend(title="Sample", loc='lower center', bbox_to_anchor=(0.5, -0.2), ncol=5, frameon=False, fontsize=10)
+    plt.tight_layout()
+    with tracing.figure(out_png):
+        plt.savefig(out_png, dpi=300, bbox_inches='tight')
+    plt.close()
+
+
+# Aggregated figures: (metric column, x label, title, file suffix)
+AGGREGATED_PLOTS = [
+    ("Total_cost", "Total Task Cost ($)",
+     "Total Task Cost Across Aggregated Rules", "aggregated_task_cost"),
+    ("Total_runtime_cpu", "Total Runtime CPU (core-seconds)",
+     "Total Runtime CPU Across Aggregated Rules", "aggregated_runtime_cpu"),
+]
+
+
+def main():
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description="Process Snakemake benchmark data and generate plots")
+    parser.add_argument("data_file", type=str, help="Path to the benchmark data file")
+    parser.add_argument("genome_build", type=str, help="Genome build identifier for output files")
+    parser.add_argument("identifier", type=str, help="Human-readable identifier for output file names")
+    parser.add_argument("--tables-only", action="store_true",
+                        help="Only write the CSV tables (matplotlib and seaborn are never imported)")
+    tracing.add_trace_arguments(parser)
+    args = parser.parse_args()
+    tracing.start_from_args(args, "generate_benchmark_plots")
+
+    # Load the Snakemake benchmark data (typed + cached; numeric columns already coerced)
+    with tracing.stage("load"):
+        df = load_benchmarks(args.data_file)
+    with tracing.stage("aggregate"):
+        df = prepare_benchmarks(df)
+        aggregated_df = aggregate_benchmarks(df)
+        shards = shard_metrics(df)
+
+    prefix = f"{args.identifier}_{args.genome_build}"
+    if not args.tables_only:
+        with tracing.stage("render"):
+            with tracing.stage("raw_task_cost"):
+                plot_raw_task_cost(df, f"{prefix}_raw_task_cost.png")
+            for metric, xlabel, title, suffix in AGGREGATED_PLOTS:
+                with tracing.stage(suffix):
+                    plot_aggregated_boxplot(aggregated_df, metric, xlabel, title, f"{prefix}_{suffix}.png")
+            if not shards.empty:
+                with tracing.stage("shard_distribution"):
+                    plot_shard_distribution(shards, f"{prefix}_shard_distribution.png")
+
+    with tracing.stage("write"):
+        write_tables(df, aggregated_df, prefix)
+    tracing.finish()
+
+
+if __name__ == "__main__":
+    main()
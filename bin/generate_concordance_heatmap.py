@@ -1,75 +1,178 @@
-import sys
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
+import os
+import argparse
 import numpy as np
 
-def plot_heatmap(csv_file="variants.csv", metric_col="Fscore", genome_build="na", ana_anno="na"):
-    # 1) Read in the CSV
-    df = pd.read_csv(csv_file, sep="\t")
-
+from daylily_giab import figures, tracing
+from daylily_giab.concordance import cluster_order, cube_class, heatmap_cube, heatmap_matrix
+from daylily_giab.loaders import load_concordance, prepare_concordance
+from daylily_giab.figures import (DEFAULT_SAVE, add_output_arguments, output_path, parse_list, save_figure,
+                                  save_options_from_args)
+from daylily_giab.rebuild import BuildManifest, add_rebuild_arguments, code_digest, fingerprint
+
+# Above this many cells the heatmap drops the per-cell text and draws the cells as one raster image
+ANNOTATE_MAX_CELLS = 400
+
+def ordered(matrix, cluster=False):
+    """matrix with rows and columns in cluster_order when cluster is set, else unchanged."""
+    if not cluster:
+        return matrix
+    return matrix.iloc[cluster_order(matrix), cluster_order(matrix.T)]
+
+def heatmap_output(df, snp_class, metric_col="Fscore", genome_build="na", ana_anno="na", output_dir=".",
+                   save=DEFAULT_SAVE, cluster=False, annotate_max=ANNOTATE_MAX_CELLS):
+    """
+    (output file, fingerprint) of one SNPClass heatmap: the Pipeline/Sample/metric
+    slice, the parameters and this module's code (see daylily_giab.rebuild).
+    """
+    subset_df = df[df['SNPClass'] == snp_class]
+    out_file = output_path(os.path.join(output_dir, f"heatmap_{snp_class}_{genome_build}_{ana_anno}.png"), save)
+    params = {"snp_class": snp_class, "metric_col": metric_col, "genome_build": genome_build,
+              "ana_anno": ana_anno, "save": save, "cluster": cluster, "annotate_max": annotate_max}
+    return out_file, fingerprint("heatmap", subset_df[["Pipeline", "Sample", metric_col]], params,
+                                 code_digest(__file__, figures.__file__))
+
+def plot_class_heatmap(df, snp_class, metric_col="Fscore", genome_build="na", ana_anno="na", output_dir=".",
+                       save=DEFAULT_SAVE, matrix=None, cluster=False, annotate_max=ANNOTATE_MAX_CELLS):
+    """
+    Heatmap of metric_col for one SNPClass of a prepared concordance table
+    (see loaders.prepare_concordance), saved as heatmap_<SNPClass>_<build>_<anno>.png.
+
+    matrix is the class's Pipeline x Sample matrix when already at hand (see
+    concordance.cube_class).  Pipeline / sample pairs without a concordance row
+    are masked (grey), not drawn as 0.  Up to annotate_max cells each cell is
+    labelled; above that the cells are rasterized without labels.
+    """
+    import matplotlib.colors as mcolors
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # 5) Pivot table: Pipelines as rows, Samples as columns
+    heatmap_data = ordered(heatmap_matrix(df, snp_class, metric_col) if matrix is None else matrix, cluster)
+    values = heatmap_data.to_numpy(dtype="float64")
+    missing = np.isnan(values)
+
+    # 6) Define color range emphasizing top scores (over the cells that exist)
+    vmin = np.nanmin(values)
+    vmax = np.nanpercentile(values, 90)
+    if vmax <= vmin:
+        vmax = np.nanmax(values)
+    print(f"SNPClass: {snp_class}, Min: {vmin}, Max: {vmax}")
+
+    # 7) Use a perceptually uniform colormap with intense contrast at the top
+    cmap = sns.color_palette("magma", as_cmap=True)
+
+    # 8) Apply power scaling to emphasize top values
+    norm = mcolors.PowerNorm(gamma=1.3, vmin=vmin, vmax=vmax)
+
+    n_rows, n_cols = heatmap_data.shape
+    annotate = heatmap_data.size <= annotate_max
+    fig, ax = plt.subplots(figsize=(min(max(12, 0.2 * n_cols + 4), 30), min(max(8, 0.2 * n_rows + 3), 20)))
+    ax.set_facecolor("lightgrey")
+
+    # 9) Draw heatmap
+    sns.heatmap(
+        heatmap_data,
+        mask=missing,
+        annot=annotate,
+        fmt=".5f",
+        cmap=cmap,
+        cbar_kws={"shrink": 0.8},
+        linewidths=0.5 if annotate else 0,
+        norm=norm,
+        rasterized=not annotate,
+        ax=ax,
+    )
+
+    # 10) Formatting
+    plt.xticks(rotation=45, ha="right")
+    plt.yticks(rotation=0)
+    title = f"{metric_col} by Pipeline & Sample (SNPClass: {snp_class}), {genome_build}, {ana_anno}"
+    if missing.any():
+        title += f"\n{int(missing.sum())} cells without a concordance row (grey)"
+    plt.title(title)
+
+    fig.tight_layout()
+
+    # 11) Save and close the plot
+    out_file = save_figure(fig, os.path.join(output_dir, f"heatmap_{snp_class}_{genome_build}_{ana_anno}.png"), save)
+    print(f"Saved: {out_file}")
+
+def write_class_matrix(df, snp_class, metric_col="Fscore", genome_build="na", ana_anno="na", output_dir=".",
+                       matrix=None, cluster=False):
+    """
+    The Pipeline x Sample matrix of one SNPClass as heatmap_<SNPClass>_<build>_<anno>.tsv
+    (NaN left empty), in the heatmap's order.
+    """
+    out_file = os.path.join(output_dir, f"heatmap_{snp_class}_{genome_build}_{ana_anno}.tsv")
+    if matrix is None:
+        matrix = heatmap_matrix(df, snp_class, metric_col)
+    ordered(matrix, cluster).to_csv(out_file, sep="\t")
+    return out_file
+
+def plot_heatmap(csv_file="variants.csv", metric_col="Fscore", genome_build="na", ana_anno="na",
+                 save=DEFAULT_SAVE, classes=None, force=False, tables_only=False, cluster=False,
+                 annotate_max=ANNOTATE_MAX_CELLS):
+    # 1) Read in the CSV (typed + cached)
     # 2) Filter out rows containing '_gt50' in SNPClass
-    df = df[~df['SNPClass'].str.contains('_gt50', na=False)]
-
     # 3) Create a pipeline identifier
-    df['Pipeline'] = df['Aligner'] + "-" + df['SNVCaller']
-
-    # 4) Iterate over each unique SNPClass
-    for snp_class in df['SNPClass'].unique():
-        subset_df = df[df['SNPClass'] == snp_class]
-
-        # 5) Pivot table: Pipelines as rows, Samples as columns
-        heatmap_data = subset_df.pivot_table(
-            index='Pipeline',
-            columns='Sample',  # Assuming 'Sample' exists in CSV
-            values=metric_col,
-            aggfunc='mean'
-        )
-        vmin = heatmap_data.min().min()
-
-        heatmap_data = heatmap_data.fillna(0)
-
-
-        # 6) Define color range emphasizing top scores
-
-        vmax = np.percentile(heatmap_data.values, 90)  # Focus on top 0.5%
-        print(f"SNPClass: {snp_class}, Min: {vmin}, Max: {vmax}")
-
-        # 7) Use a perceptually uniform colormap with intense contrast at the top
-        cmap = sns.color_palette("magma", as_cmap=True)
-
-        # 8) Apply power scaling to emphasize top values
-        norm = mcolors.PowerNorm(gamma=1.3, vmin=vmin, vmax=vmax)
-
-        plt.figure(figsize=(12, 8))
-
-        print(f"Max: {vmax}, Min: {vmin}")
-        # 9) Draw heatmap
-        sns.heatmap(
-            heatmap_data,
-            annot=True,
-            fmt=".5f",
-            cmap=cmap,
-            cbar_kws={"shrink": 0.8},
-            linewidths=0.5,
-            norm=norm
-        )
-
-        # 10) Formatting
-        plt.xticks(rotation=45, ha="right")
-        plt.yticks(rotation=0)
-        plt.title(f"{metric_col} by Pipeline & Sample (SNPClass: {snp_class}), {genome_build}, {ana_anno}")
-
-        plt.tight_layout()
-
-        # 11) Save and show the plot
-        plt.savefig(f"heatmap_{snp_class}_{genome_build}_{ana_anno}.png", dpi=300)
-        plt.show()
+    with tracing.stage("load"):
+        df = load_concordance(csv_file)
+    with tracing.stage("aggregate"):
+        df = prepare_concordance(df)
+        # 4) One Pipeline x (SNPClass, Sample) pivot for every class
+        cube = heatmap_cube(df, metric_col)
+    selected = [c for c in df['SNPClass'].unique() if classes is None or c in classes]
+
+    if tables_only:
+        with tracing.stage("write"):
+            for snp_class in selected:
+                out_file = write_class_matrix(df, snp_class, metric_col, genome_build, ana_anno,
+                                              matrix=cube_class(cube, snp_class), cluster=cluster)
+                print(f"Saved: {out_file}")
+        return
+
+    # Heatmaps whose slice, parameters and code are unchanged since the last run are skipped
+    manifest = BuildManifest.for_outputs(".", force=force)
+
+    try:
+        for snp_class in selected:
+            out_file, fp = heatmap_output(df, snp_class, metric_col, genome_build, ana_anno, save=save,
+                                          cluster=cluster, annotate_max=annotate_max)
+            if manifest.is_current(out_file, fp):
+                print(f"Up to date: {out_file}")
+                continue
+            with tracing.stage(f"render {snp_class}"):
+                plot_class_heatmap(df, snp_class, metric_col, genome_build, ana_anno, save=save,
+                                   matrix=cube_class(cube, snp_class), cluster=cluster, annotate_max=annotate_max)
+            manifest.record(out_file, fp)
+    finally:
+        manifest.save()
 
 if __name__ == "__main__":
-    file_n=sys.argv[1]
-    genome_build=sys.argv[2]
-    ana_anno=sys.argv[3]
-    metric_col=sys.argv[4] if len(sys.argv) > 4 else "Fscore"
-    plot_heatmap(sys.argv[1], metric_col, genome_build, ana_anno)
+    parser = argparse.ArgumentParser(
+        description="Per-SNPClass heatmaps of a concordance metric (Pipelines x Samples)."
+    )
+    parser.add_argument("file_n", help="Input concordance TSV file")
+    parser.add_argument("genome_build", help="Genome build")
+    parser.add_argument("ana_anno", help="Annotation")
+    parser.add_argument("metric_col", nargs="?", default="Fscore", help="Metric column (default: Fscore)")
+    parser.add_argument("--classes", type=parse_list, default=None,
+                        help="Comma-separated SNPClasses to render (default: all)")
+    parser.add_argument("--tables-only", action="store_true",
+                        help="Write each heatmap's matrix as heatmap_<SNPClass>_<build>_<anno>.tsv instead "
+                             "of drawing it (matplotlib and seaborn are never imported)")
+    parser.add_argument("--cluster", action="store_true",
+                        help="Order pipelines and samples by hierarchical clustering (average linkage)")
+    parser.add_argument("--annotate-max", type=int, default=ANNOTATE_MAX_CELLS,
+                        help="Label each cell up to this many cells; larger heatmaps are rasterized "
+                             f"without labels (default: {ANNOTATE_MAX_CELLS}; 0 never labels)")
+    add_output_arguments(parser)
+    add_rebuild_arguments(parser)
+    tracing.add_trace_arguments(parser)
+
+    args = parser.parse_args()
+    tracing.start_from_args(args, "generate_concordance_heatmap")
+    plot_heatmap(args.file_n, args.metric_col, args.genome_build, args.ana_anno,
+                 save=save_options_from_args(args), classes=args.classes, force=args.force,
+                 tables_only=args.tables_only, cluster=args.cluster, annotate_max=args.annotate_max)
+    tracing.finish()
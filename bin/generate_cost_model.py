@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Coverage-normalized cost model: per-pipeline cost and wall time against the
+yield, coverage and duplicate rate of each sample, projected to a standard
+30x genome or any other coverage (see bin/daylily_giab/costmodel.py).
+
+Inputs are the same as generate_meta_analysis.py: -b/-c/-a for one run, or
+--runs manifests (runs without alignstats are skipped).  Each run gets its
+own model per pipeline: builds and regions differ several-fold in cost at
+the same coverage, so pooling them blurs every fit.  --by aligner,var_caller
+pools all runs per pipeline; only do that for runs of one build and region.
+
+Writes, for --output-prefix <prefix>:
+  <prefix>_cost_samples.tsv      every run, sample and pipeline with the joined
+                                 alignstats, fitted values and residuals
+  <prefix>_cost_fits.tsv         coefficients, n, r2 and rmse per pipeline and target
+  <prefix>_cost_projection.tsv   predicted cost and wall time per pipeline at each
+                                 --coverage, with cost_per_gbase and gbases_per_hour
+  <prefix>_cost_vs_coverage.png  projected cost per pipeline over coverage, observed
+                                 samples as points
+
+Examples:
+  python bin/generate_cost_model.py --runs data/meta_runs.tsv -o all_runs --coverage 30,60
+  python bin/generate_cost_model.py --runs <hg38_usw2d_runs.tsv> -o usw2d_history --by aligner,var_caller
+  python bin/generate_cost_model.py -b <aggregated_task_metrics.csv> -c <concordance.tsv> \\
+      -a data/us_west_2d/hg38_7giab_us-west-2d_alignstats.tsv -o usw2d_hg38 --features gbases,dup_pct
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from daylily_giab import costmodel, loaders, tracing
+from daylily_giab.figures import DEFAULT_SAVE, add_output_arguments, parse_list, save_figure, save_options_from_args
+from daylily_giab.meta_analysis import MANIFEST_FIELDS, meta_table, read_manifests, stream_run_rows
+from daylily_giab.pareto import pipeline_points
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Per-pipeline cost model on alignstats, projected to a coverage.")
+    parser.add_argument("-b", "--benchmarks", help="Path to aggregated_task_metrics.csv")
+    parser.add_argument("-c", "--concordance", help="Path to concordance_results.tsv")
+    parser.add_argument("-a", "--alignstats", help="Path to alignstats.tsv")
+    parser.add_argument("-r", "--runs", nargs="+",
+                        help="Manifest TSV(s) or globs of them, one run per line with columns "
+                             f"{', '.join(MANIFEST_FIELDS)}; replaces -b/-c/-a")
+    parser.add_argument("--features", type=parse_list, default=costmodel.DEFAULT_FEATURES,
+                        help="Comma-separated features: "
+                             f"{', '.join(costmodel.FEATURES)} or any alignstats column, e.g. "
+                             f"WgsCoverageBases30Pct,InsertSizeMean (default: {','.join(costmodel.DEFAULT_FEATURES)})")
+    parser.add_argument("--coverage", type=parse_list, default=["30"],
+                        help="Comma-separated target coverages to project to (default: 30)")
+    parser.add_argument("--shrinkage", type=float, default=1.0,
+                        help="Pull of the slopes towards cost proportional to yield; 0 is plain least squares "
+                             "(default: 1.0)")
+    parser.add_argument("--by", type=parse_list, default=costmodel.GROUP,
+                        help="Columns that define one model (default: run,aligner,var_caller, one model per "
+                             "run; aligner,var_caller pools all runs, for runs of one build and region only)")
+    parser.add_argument("-o", "--output-prefix", default="costmodel", help="Prefix of the outputs")
+    parser.add_argument("--no-plots", "--tables-only", dest="no_plots", action="store_true",
+                        help="Write the TSVs only (matplotlib is never imported)")
+    add_output_arguments(parser)
+    tracing.add_trace_arguments(parser)
+    args = parser.parse_args()
+    if args.runs is None and not (args.benchmarks and args.concordance and args.alignstats):
+        parser.error("either -b/-c/-a or --runs is required")
+    if args.runs is not None and (args.benchmarks or args.concordance or args.alignstats):
+        parser.error("--runs cannot be combined with -b/-c/-a")
+    return args
+
+
+def load_runs(runs):
+    """Pipeline points of every run with alignstats, and the runs' alignstats features."""
+    points, features = [], []
+    for run in runs:
+        if not run["alignstats"]:
+            print(f"{run['region']}/{run['run']}: no alignstats, skipped")
+            continue
+        points.append(pipeline_points(meta_table(stream_run_rows(run))))
+        features.append(costmodel.alignstats_features(
+            loaders.load_alignstats(run["alignstats"]).assign(run=run["run"])))
+    if not points:
+        raise SystemExit("No run has alignstats")
+    return pd.concat(points, ignore_index=True), pd.concat(features, ignore_index=True)
+
+
+def plot_cost_vs_coverage(samples, fits, table, out_png, by=costmodel.GROUP, save=DEFAULT_SAVE):
+    """Projected cost per sample over coverage, one line per model (by), observed samples as points."""
+    import matplotlib.pyplot as plt
+
+    coverages = np.linspace(5, 80, 76)
+    curve = costmodel.project(fits, table, coverages, by)
+    fig, ax = plt.subplots(figsize=(12, 8))
+    cmap = plt.get_cmap("tab20")
+    seen_by = samples.groupby(list(by), sort=True)
+    for i, (key, line) in enumerate(curve.groupby(list(by), sort=True)):
+        colour = cmap(i % 20)
+        ax.plot(line["target_coverage"], line["predicted_cost_per_task"], color=colour, linewidth=1,
+                label="-".join(map(str, key)))
+        seen = seen_by.get_group(key)
+        ax.scatter(seen["coverage"], seen["cost_per_task"], color=colour, s=14, edgecolor="k", linewidth=0.3)
+    ax.axvline(30, color="grey", linestyle="--", linewidth=0.8)
+    ax.set_xlabel("Mean WGS coverage (x)", fontsize=12)
+    ax.set_ylabel("Cost per sample ($)", fontsize=12)
+    ax.set_title(f"Projected pipeline cost by coverage ({len(samples)} observed samples)", fontsize=14)
+    ax.legend(fontsize=7, ncol=2, loc="upper left")
+    fig.tight_layout()
+    return save_figure(fig, out_png, save)
+
+
+def main():
+    args = parse_arguments()
+    tracing.start_from_args(args, "generate_cost_model")
+
+    if args.runs is not None:
+        runs = read_manifests(args.runs)
+    else:
+        runs = [{"region": "", "run": "run", "benchmarks": args.benchmarks,
+                 "concordance": args.concordance, "alignstats": args.alignstats}]
+    with tracing.stage("load"):
+        points, features = load_runs(runs)
+    with tracing.stage("join"):
+        table = costmodel.join_alignstats(points, features)
+        unknown = set(args.features) | set(args.by)
+        unknown -= set(table.columns)
+        if unknown:
+            raise SystemExit(f"Unknown feature or --by column(s): {', '.join(sorted(unknown))}")
+    with tracing.stage("fit"):
+        fits = costmodel.fit(table, args.features, shrinkage=args.shrinkage, by=args.by)
+        samples = costmodel.predict(fits, table, args.by)
+        for target in costmodel.TARGETS:
+            samples[f"residual_{target}"] = samples[target] - samples[f"predicted_{target}"]
+        projection = costmodel.project(fits, table, [float(c) for c in args.coverage], args.by)
+
+    with tracing.stage("write"):
+        outputs = {"samples": samples, "fits": fits, "projection": projection}
+        for name, df in outputs.items():
+            out_tsv = f"{args.output_prefix}_cost_{name}.tsv"
+            df.to_csv(out_tsv, sep="\t", index=False)
+            print(f"Saved: {out_tsv} ({len(df)} rows)")
+
+    cols = list(args.by) + ["target_coverage", "predicted_cost_per_task", "cost_per_gbase",
+                            "predicted_wall_time", "gbases_per_hour"]
+    print(projection[cols].sort_values(["target_coverage", "predicted_cost_per_task"]).to_string(index=False))
+
+    if not args.no_plots:
+        with tracing.stage("render"):
+            out_png = f"{args.output_prefix}_cost_vs_coverage.png"
+            out_png = plot_cost_vs_coverage(samples, fits, table, out_png, args.by, save_options_from_args(args))
+            print(f"Saved: {out_png}")
+    tracing.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Critical path, makespan and shard-imbalance analysis of a benchmarks_summary.tsv
+(see bin/daylily_giab/critical_path.py), plus a Gantt-style figure per sample.
+
+Writes, for prefix <identifier>_<genome_build>:
+  <prefix>_critical_path.tsv          one row per (sample, aligner, caller)
+  <prefix>_critical_path_summary.tsv  one row per (aligner, caller), medians over samples
+  <prefix>_stage_schedule.tsv         asap start/end of every stage of every pipeline
+  <prefix>_shard_slack.tsv            per-shard slack behind the slowest shard
+  <prefix>_gantt_<sample>.png         stages per pipeline, call shards drawn individually
+
+Example:
+  python bin/generate_critical_path.py data/us_west_2d/hg38_7giab_us-west-2d_benchmarks_summary.tsv hg38 usw2d-all
+"""
+
+import argparse
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import seaborn as sns
+
+import generate_benchmark_plots as bench
+from daylily_giab import critical_path
+from daylily_giab.figures import DEFAULT_SAVE, add_output_arguments, parse_list, save_figure, save_options_from_args
+from daylily_giab.loaders import load_benchmarks
+
+
+def plot_gantt(stages, shards, sample, out_png, save=DEFAULT_SAVE):
+    """
+    One row per pipeline of `sample`: a bar per stage on the asap schedule;
+    the call stage is drawn as one thin bar per shard, so a long tail of
+    short shards behind one straggler is visible.
+    """
+    sub = stages[stages["sample"] == sample]
+    sub_shards = shards[shards["sample"] == sample]
+    pipelines = sorted(sub[["aligner", "caller"]].drop_duplicates().itertuples(index=False, name=None))
+    colors = dict(zip(critical_path.STAGES, sns.color_palette("tab10", len(critical_path.STAGES))))
+
+    fig, ax = plt.subplots(figsize=(14, max(4, 0.6 * len(pipelines) + 1.5)))
+    for row, (aligner, caller) in enumerate(pipelines):
+        pstages = sub[(sub["aligner"] == aligner) & (sub["caller"] == caller)]
+        for stage in pstages.itertuples(index=False):
+            if stage.step == "call":
+                continue
+            ax.barh(row, stage.stage_s, left=stage.start_s, height=0.8, color=colors[stage.step],
+                    edgecolor="k", linewidth=0.3)
+
+        call = pstages[pstages["step"] == "call"]
+        pshards = sub_shards[(sub_shards["aligner"] == aligner) & (sub_shards["caller"] == caller)]
+        if len(call) and len(pshards):
+            start = call["start_s"].iloc[0]
+            # shard i gets a 0.8/n slice of the row, longest at the top
+            durations = pshards["s"].sort_values().to_numpy()
+            height = 0.8 / len(durations)
+            offsets = row - 0.4 + height * (0.5 + np.arange(len(durations)))
+            ax.barh(offsets, durations, left=start, height=height, color=colors["call"], linewidth=0)
+
+    ax.set_yticks(range(len(pipelines)))
+    ax.set_yticklabels([f"{a}-{c}" for a, c in pipelines])
+    ax.invert_yaxis()
+    ax.set_xlabel("Time since run start, as-soon-as-possible schedule (s)", fontsize=12)
+    ax.set_title(f"Stage schedule and shard spread: {sample}", fontsize=14)
+    handles = [plt.Rectangle((0, 0), 1, 1, color=colors[s]) for s in critical_path.STAGES]
+    ax.legend(handles, critical_path.STAGES, loc="lower right", fontsize=9, frameon=True)
+    fig.tight_layout()
+    return save_figure(fig, out_png, save, bbox_inches="tight")
+
+
+def write_tables(df, prefix, cores=None):
+    """Write the four critical-path tables; returns (stages, shards)."""
+    stages = critical_path.stage_table(df)
+    shards = critical_path.shard_slack(df)
+    pipelines = critical_path.pipeline_table(df, cores=cores)
+
+    pipelines.to_csv(f"{prefix}_critical_path.tsv", sep="\t", index=False)
+    critical_path.pipeline_summary(pipelines).to_csv(f"{prefix}_critical_path_summary.tsv", sep="\t", index=False)
+    stages.to_csv(f"{prefix}_stage_schedule.tsv", sep="\t", index=False)
+    shards.to_csv(f"{prefix}_shard_slack.tsv", sep="\t", index=False)
+    return stages, shards
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Critical path, makespan and shard imbalance per pipeline.")
+    parser.add_argument("data_file", type=str, help="Path to the benchmark data file")
+    parser.add_argument("genome_build", type=str, help="Genome build identifier for output files")
+    parser.add_argument("identifier", type=str, help="Human-readable identifier for output file names")
+    parser.add_argument("--cores", type=int, default=None,
+                        help="Cluster core count for the resource bound on makespan (default: no bound)")
+    parser.add_argument("--samples", type=parse_list, default=None,
+                        help="Comma-separated samples to draw a Gantt figure for (default: all)")
+    add_output_arguments(parser)
+    args = parser.parse_args()
+
+    df = bench.prepare_benchmarks(load_benchmarks(args.data_file))
+    prefix = f"{args.identifier}_{args.genome_build}"
+    stages, shards = write_tables(df, prefix, cores=args.cores)
+
+    save = save_options_from_args(args)
+    for sample in args.samples or sorted(stages["sample"].unique()):
+        print(f"Saved: {plot_gantt(stages, shards, sample, f'{prefix}_gantt_{sample}.png', save)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+I/O throughput and memory-pressure profile per rule from one or more
+benchmarks_summary.tsv files (see bin/daylily_giab/ioprofile.py): read and
+write MB/s, memory per thread, headroom against the instance's RAM, and a
+CPU- / I/O- / memory-bound (or idle) class per rule.
+
+Writes, for --output-prefix <prefix>:
+  <prefix>_io_profile.tsv        one row per region_az, pipeline and rule family
+  <prefix>_io_profile_rules.tsv  one row per rule family, all regions and pipelines pooled
+  <prefix>_bound_classes.png     class per rule family (rows) and region / aligner (columns)
+  <prefix>_pressure.png          cpu vs io pressure per profile row, sized by mem pressure
+
+Example:
+  python bin/generate_io_profile.py data/*/*benchmarks*.tsv -o all_runs --io-ref-mb-s 250
+"""
+
+import argparse
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.colors import ListedColormap
+from matplotlib.patches import Patch
+
+import generate_benchmark_plots as bench
+from daylily_giab import ioprofile
+from daylily_giab.figures import DEFAULT_SAVE, add_output_arguments, save_figure, save_options_from_args
+from daylily_giab.loaders import load_benchmarks
+
+BOUND_ORDER = ioprofile.CLASSES + [ioprofile.IDLE]
+BOUND_COLORS = dict(zip(BOUND_ORDER, sns.color_palette("Set2", len(BOUND_ORDER))))
+
+
+def plot_classes(profile, out_png, save=DEFAULT_SAVE):
+    """
+    Rule families (rows) by region_az / aligner (columns), each cell coloured
+    by its bound class and labelled with the largest pressure.
+    """
+    table = profile.assign(column=profile["region_az"] + "\n" + profile["pipeline"].str.split("-").str[0])
+    table["pressure"] = table[[f"{c}_pressure" for c in ioprofile.CLASSES]].max(axis=1)
+    # one cell per family and column: the caller pipelines of an aligner differ by family already
+    cells = table.sort_values("n_tasks").drop_duplicates(["family", "column"], keep="last")
+    codes = cells.pivot(index="family", columns="column", values="bound").map(
+        lambda b: BOUND_ORDER.index(b) if isinstance(b, str) else np.nan)
+    labels = cells.pivot(index="family", columns="column", values="pressure").reindex_like(codes)
+
+    fig, ax = plt.subplots(figsize=(max(6, 1.2 * codes.shape[1] + 3), max(6, 0.28 * codes.shape[0] + 2)))
+    cmap = ListedColormap([BOUND_COLORS[b] for b in BOUND_ORDER])
+    cmap.set_bad("white")
+    ax.imshow(np.ma.masked_invalid(codes.to_numpy(dtype="float64")), cmap=cmap, vmin=-0.5,
+              vmax=len(BOUND_ORDER) - 0.5, aspect="auto")
+    for (i, j), value in np.ndenumerate(labels.to_numpy(dtype="float64")):
+        if not np.isnan(value):
+            ax.text(j, i, f"{value:.2f}", ha="center", va="center", fontsize=6)
+    ax.set_xticks(range(codes.shape[1]), codes.columns, fontsize=8)
+    ax.set_yticks(range(codes.shape[0]), codes.index, fontsize=8)
+    ax.legend(handles=[Patch(color=BOUND_COLORS[b], label=b) for b in BOUND_ORDER], title="bound",
+              bbox_to_anchor=(1.01, 1), loc="upper left")
+    ax.set_title("Rule bound class (cell text: largest pressure)", fontsize=12)
+    fig.tight_layout()
+    return save_figure(fig, out_png, save)
+
+
+def plot_pressure(profile, out_png, save=DEFAULT_SAVE):
+    """cpu vs io pressure (log x) per profile row, coloured by class, sized by mem pressure."""
+    fig, ax = plt.subplots(figsize=(11, 7))
+    floor = 1e-4
+    markers = dict(zip(sorted(profile["region_az"].unique()), "osD^vP*X"))
+    for (bound, region), sub in profile.groupby(["bound", "region_az"], sort=True):
+        ax.scatter(sub["io_pressure"].clip(lower=floor), sub["cpu_pressure"],
+                   s=20 + 200 * sub["mem_pressure"].clip(upper=2), color=BOUND_COLORS[bound],
+                   marker=markers.get(region, "o"), edgecolor="k", linewidth=0.3, alpha=0.8,
+                   label=f"{bound}, {region}")
+    ax.axvline(1.0, color="grey", linestyle="--", linewidth=0.8)
+    ax.axhline(1.0, color="grey", linestyle="--", linewidth=0.8)
+    ax.set_xscale("log")
+    ax.set_xlabel("I/O pressure (MB/s / reference throughput, log scale)", fontsize=12)
+    ax.set_ylabel("CPU pressure (busy cores / threads)", fontsize=12)
+    ax.set_title("Rule pressure per region and pipeline (marker size: memory pressure)", fontsize=13)
+    ax.legend(bbox_to_anchor=(1.01, 1), loc="upper left", fontsize=8)
+    fig.tight_layout()
+    return save_figure(fig, out_png, save)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="I/O throughput, memory pressure and bound class per rule.")
+    parser.add_argument("data_files", nargs="+", help="benchmarks_summary.tsv files (all runs are pooled)")
+    parser.add_argument("-o", "--output-prefix", default="io_profile", help="Prefix of the outputs")
+    parser.add_argument("--io-ref-mb-s", type=float, default=125.0,
+                        help="Read + write MB/s counted as full I/O pressure (default: 125, gp3 baseline)")
+    parser.add_argument("--min-pressure", type=float, default=0.1,
+                        help="Below this on every resource a rule is 'idle' (default: 0.1)")
+    parser.add_argument("--no-plots", action="store_true", help="Only write the tables")
+    add_output_arguments(parser)
+    args = parser.parse_args()
+
+    df = pd.concat([bench.prepare_benchmarks(load_benchmarks(f)) for f in args.data_files], ignore_index=True)
+    tasks = ioprofile.task_profile(df, io_ref_mb_s=args.io_ref_mb_s, min_pressure=args.min_pressure)
+    profile = ioprofile.rule_profile(tasks, min_pressure=args.min_pressure)
+    rules = ioprofile.rule_profile(tasks, keys=["family"], min_pressure=args.min_pressure)
+
+    for name, table in [("io_profile", profile), ("io_profile_rules", rules)]:
+        table.to_csv(f"{args.output_prefix}_{name}.tsv", sep="\t", index=False)
+        print(f"Saved: {args.output_prefix}_{name}.tsv")
+
+    if not args.no_plots:
+        save = save_options_from_args(args)
+        print(f"Saved: {plot_classes(profile, f'{args.output_prefix}_bound_classes.png', save)}")
+        print(f"Saved: {plot_pressure(profile, f'{args.output_prefix}_pressure.png', save)}")
+
+    counts = rules["bound"].value_counts()
+    print("Rule families: " + ", ".join(f"{counts.get(b, 0)} {b}" for b in BOUND_ORDER))
+
+
+if __name__ == "__main__":
+    main()
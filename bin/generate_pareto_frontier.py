@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Cost / wall time / accuracy Pareto frontier over every run, sample and
+pipeline of one or more meta_ana tables (see bin/daylily_giab/pareto.py).
+
+Inputs are meta_ana.tsv files from generate_meta_analysis.py: single-run
+tables (<build>_<run>_meta_ana.tsv, run taken from the file name) or a
+streaming-mode table with region/run columns.
+
+Writes, for --output-prefix <prefix>:
+  <prefix>_pareto_frontier.tsv        frontier points of every Fscore class
+  <prefix>_pareto_<class>.png         cost vs 1 - Fscore per class, frontier highlighted
+
+Example:
+  python bin/generate_pareto_frontier.py results/*/*/meta/*_meta_ana.tsv -o all_runs --classes all,SNPall,Indel50
+"""
+
+import argparse
+import os
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from daylily_giab import pareto
+from daylily_giab.figures import DEFAULT_SAVE, add_output_arguments, parse_list, save_figure, save_options_from_args
+
+
+def read_meta(paths):
+    """Concatenate meta_ana tables; single-run tables get run (and build) from their file name."""
+    frames = []
+    for path in paths:
+        df = pd.read_csv(path, sep="\t")
+        if "run" not in df.columns:
+            stem = os.path.basename(path).replace("_meta_ana.tsv", "")
+            build, _, run = stem.partition("_")
+            df.insert(0, "run", run or stem)
+            df.insert(0, "build", build if run else "")
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def plot_frontier(points, front, snp_class, out_png, save=DEFAULT_SAVE):
+    """
+    Cost vs. 1 - Fscore (both log scale, error axis inverted so better is
+    up): all points in grey, frontier points coloured by wall time, the
+    cost-Fscore front as a labelled step line.
+    """
+    fcol = pareto.fscore_classes(points)[snp_class]
+    valid = points[points[fcol] > 0]
+    sub = front[front["SNPClass"] == snp_class]
+    step = sub[sub["on_cost_front"]].sort_values("cost_per_task")
+    floor = 1e-6  # Fscore == 1 on a log error axis
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    ax.scatter(valid["cost_per_task"], (1 - valid[fcol]).clip(lower=floor), s=12, color="lightgrey",
+               label="all pipelines", zorder=1)
+    sc = ax.scatter(sub["cost_per_task"], (1 - sub["Fscore"]).clip(lower=floor), c=sub["wall_time"] / 3600,
+                    cmap="viridis", s=60, edgecolor="k", linewidth=0.5, label="Pareto frontier", zorder=3)
+    ax.step(step["cost_per_task"], (1 - step["Fscore"]).clip(lower=floor), where="post", color="k",
+            linewidth=1, zorder=2)
+    for i, row in enumerate(step.itertuples(index=False)):
+        ax.annotate(f"{row.aligner}-{row.var_caller} ({row.run}, {row.Sample})",
+                    (row.cost_per_task, max(1 - row.Fscore, floor)),
+                    textcoords="offset points", xytext=(6, 10 if i % 2 else -14), fontsize=8)
+    fig.colorbar(sc, ax=ax, label="Summed task wall time (h)")
+    ax.set_xscale("log")
+    ax.set_yscale("log")
+    ax.invert_yaxis()
+    ax.set_xlabel("Cost per sample ($, log scale)", fontsize=12)
+    ax.set_ylabel(f"1 - Fscore ({snp_class}, log scale)", fontsize=12)
+    ax.set_title(f"Cost vs. accuracy frontier: {snp_class}, {len(valid)} points, {len(sub)} on the frontier",
+                 fontsize=14)
+    ax.legend(loc="lower right")
+    fig.tight_layout()
+    return save_figure(fig, out_png, save)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pareto frontier of cost, wall time and Fscore.")
+    parser.add_argument("meta_files", nargs="+", help="meta_ana.tsv files (all runs are pooled)")
+    parser.add_argument("--classes", type=parse_list, default=None,
+                        help="Fscore classes, e.g. all,SNPall,Indel50 (default: every Fscore column)")
+    parser.add_argument("--caller-only", action="store_true",
+                        help="Do not add the aligner's alNsort/mrkdup/QC cost and time to each pipeline")
+    parser.add_argument("-o", "--output-prefix", default="pareto", help="Prefix of the outputs")
+    parser.add_argument("--no-plots", action="store_true", help="Only write the frontier table")
+    add_output_arguments(parser)
+    args = parser.parse_args()
+
+    points = pareto.pipeline_points(read_meta(args.meta_files), include_alignment=not args.caller_only)
+    classes = args.classes or list(pareto.fscore_classes(points))
+    unknown = set(classes) - set(pareto.fscore_classes(points))
+    if unknown:
+        raise SystemExit(f"Unknown Fscore class(es): {', '.join(sorted(unknown))}")
+
+    front = pareto.frontier(points, classes)
+    out_tsv = f"{args.output_prefix}_pareto_frontier.tsv"
+    front.to_csv(out_tsv, sep="\t", index=False)
+    print(f"Saved: {out_tsv} ({len(points)} pipeline points)")
+
+    if not args.no_plots:
+        save = save_options_from_args(args)
+        for snp_class in classes:
+            print(f"Saved: {plot_frontier(points, front, snp_class, f'{args.output_prefix}_pareto_{snp_class}.png', save)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,285 +1,524 @@
+import os
 import sys
+import numpy as np
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 import argparse
 
-def plot_sensitivity_vs_precision(input_file, genome_build, annotation, output_prefix):
-    # 1) Read the input TSV file
-    df = pd.read_csv(input_file, sep="\t")
+from daylily_giab import figures, significance, tracing
+from daylily_giab.concordance import class_table
+from daylily_giab.loaders import load_concordance, prepare_concordance
+from daylily_giab.figures import (DEFAULT_SAVE, add_output_arguments, output_path, parse_list, save_figure,
+                                  save_options_from_args)
+from daylily_giab.rebuild import BuildManifest, add_rebuild_arguments, code_digest, fingerprint
+
+# Marker set for pipelines (enough for up to 18 pipelines)
+MARKERS = ["o", "s", "D", "^", "v", "<", ">", "p", "H", "*", "X", "|", "_",
+           "1", "2", "3", "4", "8"]  # 18 markers
+
+# 6 boxplot metrics: (column, label)
+METRICS = [
+    ("Fscore",            "F-score"),
+    ("Sensitivity-Recall","Recall"),
+    ("Specificity",       "Specificity"),
+    ("FDR",               "FDR"),
+    ("PPV",               "PPV"),
+    ("Precision",         "Precision")
+]
+
+# Figure families this script can emit (select with --artifacts)
+ARTIFACTS = ("scatter", "zoom", "boxplots")
+
+# Columns each figure family reads from a SNPClass slice (see class_outputs)
+SCATTER_COLUMNS = ["Sample", "Pipeline", "Sensitivity-Recall", "Precision"]
+BOXPLOT_COLUMNS = ["Sample", "Pipeline"] + [col for col, _ in METRICS]
+
+
+def build_styles(df):
+    """
+    Pipeline -> marker and Sample -> color maps, built from the full table so
+    every SNPClass figure uses the same legend.
+    """
+    import seaborn as sns
 
-    # 2) Filter out rows containing '_gt50' in SNPClass (optional)
-    df = df[~df['SNPClass'].str.contains('_gt50', na=False)]
-
-    # 3) Create a pipeline identifier (Aligner-Caller)
-    df['Pipeline'] = df['Aligner'] + "-" + df['SNVCaller']
-
-    # 4) Define marker set for pipelines (enough for up to 18 pipelines)
     unique_pipelines = sorted(df["Pipeline"].unique())
-    markers = ["o", "s", "D", "^", "v", "<", ">", "p", "H", "*", "X", "|", "_",
-               "1", "2", "3", "4", "8"]  # 18 markers
-    if len(unique_pipelines) > len(markers):
+    if len(unique_pipelines) > len(MARKERS):
         raise ValueError(
-            f"More unique pipelines ({len(unique_pipelines)}) than markers ({len(markers)}). "
+            f"More unique pipelines ({len(unique_pipelines)}) than markers ({len(MARKERS)}). "
             "Please expand the 'markers' list."
         )
-    marker_map = {pipeline: markers[i] for i, pipeline in enumerate(unique_pipelines)}
+    marker_map = {pipeline: MARKERS[i] for i, pipeline in enumerate(unique_pipelines)}
 
-    # 5) Define color palette for Samples
+    # Color palette for Samples
     samples = sorted(df["Sample"].unique())
     palette = sns.color_palette("husl", len(samples))
     sample_color_map = {sample: palette[i] for i, sample in enumerate(samples)}
 
-    # Helper to add the "top pipeline" text box on the right
-    def add_top_pipelines_text(ax, df_sub):
-        """
-        Find the pipeline with the highest Recall and highest Precision
-        in df_sub, then display them + numeric values in a text box
-        on the right side of ax.
-        """
-        if df_sub.empty:
-            return
-
-        # Highest recall
-        max_rec_idx = df_sub["Sensitivity-Recall"].idxmax()
-        max_rec_pipeline = df_sub.loc[max_rec_idx, "Pipeline"]
-        max_rec_value = df_sub.loc[max_rec_idx, "Sensitivity-Recall"]
-
-        # Highest precision
-        max_prec_idx = df_sub["Precision"].idxmax()
-        max_prec_pipeline = df_sub.loc[max_prec_idx, "Pipeline"]
-        max_prec_value = df_sub.loc[max_prec_idx, "Precision"]
-
-        txt = (
-            f"Highest Recall:\n"
-            f"{max_rec_pipeline} ({max_rec_value:.4f})\n\n"
-            f"Highest Precision:\n"
-            f"{max_prec_pipeline} ({max_prec_value:.4f})"
+    return {
+        "pipelines": unique_pipelines,
+        "marker_map": marker_map,
+        "samples": samples,
+        "sample_color_map": sample_color_map,
+    }
+
+
+# Helper to add the "top pipeline" text box on the right
+def add_top_pipelines_text(ax, df_sub, stats=None, snp_class=None):
+    """
+    Find the pipeline with the highest Recall and highest Precision
+    in df_sub, then display them + numeric values in a text box
+    on the right side of ax.  With stats (see compute_stats) the pooled
+    estimates and CIs are shown instead, with the pipelines whose difference
+    from the best is not significant.
+    """
+    if df_sub.empty:
+        return
+    if stats is not None:
+        txt = "\n\n".join(best_text(stats, snp_class, metric, label)
+                           for metric, label in [("Sensitivity-Recall", "Recall"), ("Precision", "Precision")])
+        ax.text(1.02, 0.96, txt, transform=ax.transAxes, va='top', ha='left', clip_on=False, fontsize=8,
+                bbox=dict(facecolor='white', alpha=0.3, edgecolor='none'))
+        return
+
+    # Highest recall
+    max_rec_idx = df_sub["Sensitivity-Recall"].idxmax()
+    max_rec_pipeline = df_sub.loc[max_rec_idx, "Pipeline"]
+    max_rec_value = df_sub.loc[max_rec_idx, "Sensitivity-Recall"]
+
+    # Highest precision
+    max_prec_idx = df_sub["Precision"].idxmax()
+    max_prec_pipeline = df_sub.loc[max_prec_idx, "Pipeline"]
+    max_prec_value = df_sub.loc[max_prec_idx, "Precision"]
+
+    txt = (
+        f"Highest Recall:\n"
+        f"{max_rec_pipeline} ({max_rec_value:.4f})\n\n"
+        f"Highest Precision:\n"
+        f"{max_prec_pipeline} ({max_prec_value:.4f})"
+    )
+
+    ax.text(
+        1.02, 0.96,
+        txt,
+        transform=ax.transAxes,
+        va='top',
+        ha='left',
+        clip_on=False,
+        bbox=dict(facecolor='white', alpha=0.3, edgecolor='none')
+    )
+
+
+def best_text(stats, snp_class, metric, label):
+    """'Highest <label>:\n<pipeline> (estimate, CI)\nties: ...' from the pooled statistics."""
+    ci, alpha = stats["ci"], stats["alpha"]
+    best, q_values = significance.versus_best(ci, stats["pairs"], snp_class, metric, alpha)
+    if best is None:
+        return f"Highest {label}: n/a"
+    row = ci[(ci["SNPClass"] == snp_class) & (ci["metric"] == metric) & (ci["Pipeline"] == best)].iloc[0]
+    ties = sorted(p for p, q in q_values.items() if not q < alpha)
+    lines = [f"Highest {label}:", f"{best} ({row['estimate']:.4f}, "
+             f"{stats['confidence']:.0%} CI {row['ci_low']:.4f}-{row['ci_high']:.4f})"]
+    if ties:
+        lines.append(f"not significantly different (q >= {alpha:g}):")
+        lines.extend(f"  {p}" for p in ties)
+    else:
+        lines.append(f"all others differ (q < {alpha:g})")
+    return "\n".join(lines)
+
+
+def draw_intervals(ax, ci_class, styles):
+    """Pooled Recall / Precision of each pipeline with its bootstrap CI as error bars."""
+    wide = ci_class.pivot(index="Pipeline", columns="metric", values=["estimate", "ci_low", "ci_high"])
+    for pipeline in wide.index:
+        x, y = wide.loc[pipeline, ("estimate", "Sensitivity-Recall")], wide.loc[pipeline, ("estimate", "Precision")]
+        xerr = [[x - wide.loc[pipeline, ("ci_low", "Sensitivity-Recall")]],
+                [wide.loc[pipeline, ("ci_high", "Sensitivity-Recall")] - x]]
+        yerr = [[y - wide.loc[pipeline, ("ci_low", "Precision")]], [wide.loc[pipeline, ("ci_high", "Precision")] - y]]
+        ax.errorbar(x, y, xerr=xerr, yerr=yerr, fmt=styles["marker_map"].get(pipeline, "o"), color="k",
+                    markerfacecolor="none", markersize=9, elinewidth=0.8, capsize=2, zorder=3)
+
+
+def draw_points(ax, df_sub, styles):
+    """
+    Scatter Recall vs. Precision as one PathCollection per pipeline marker,
+    with the per-point sample colors passed as an array.
+    """
+    sample_codes = pd.Categorical(df_sub["Sample"], categories=styles["samples"]).codes
+    rgb = np.asarray([styles["sample_color_map"][sample] for sample in styles["samples"]])
+    x = df_sub["Sensitivity-Recall"].to_numpy()
+    y = df_sub["Precision"].to_numpy()
+    for pipeline, idx in df_sub.groupby("Pipeline", sort=True).indices.items():
+        ax.scatter(
+            x[idx],
+            y[idx],
+            c=rgb[sample_codes[idx]],
+            marker=styles["marker_map"][pipeline],
+            edgecolors="k",
+            alpha=0.75,
+            s=30  # ~40% smaller than s=50
         )
 
-        ax.text(
-            1.02, 0.96,
-            txt,
-            transform=ax.transAxes,
-            va='top', 
-            ha='left',
-            clip_on=False,
-            bbox=dict(facecolor='white', alpha=0.3, edgecolor='none')
+
+def create_scatter(ax, df_sub, styles, genome_build, annotation, snp_class, title_suffix=""):
+    """
+    Draw scatter points for df_sub on ax, with legends, etc.
+    Return ax so we can add text or further customization.
+    """
+    import matplotlib.pyplot as plt
+
+    marker_map = styles["marker_map"]
+    sample_color_map = styles["sample_color_map"]
+
+    draw_points(ax, df_sub, styles)
+
+    # Legends: Pipelines (markers)
+    handles_markers = [
+        plt.Line2D(
+            [0], [0],
+            marker=marker_map[pipeline],
+            color='w',
+            markerfacecolor='gray',
+            markeredgecolor='k',
+            markersize=8,
+            label=pipeline
         )
+        for pipeline in styles["pipelines"]
+    ]
+    legend_pipelines = ax.legend(
+        handles=handles_markers,
+        title="Pipeline (Aligner-VarCaller)",
+        loc="lower left",
+        fontsize=9,
+        frameon=True
+    )
+    ax.add_artist(legend_pipelines)
+
+    # Legends: Samples (colors)
+    handles_samples = [
+        plt.Line2D(
+            [0], [0],
+            marker='o',
+            color='w',
+            markerfacecolor=sample_color_map[sample],
+            markeredgecolor='k',
+            markersize=8,
+            label=sample
+        )
+        for sample in styles["samples"]
+    ]
+    legend_samples = ax.legend(
+        handles=handles_samples,
+        title="Sample",
+        loc="upper left",
+        fontsize=9,
+        frameon=True
+    )
+    ax.add_artist(legend_samples)
+
+    # Labels & Title
+    ax.set_xlabel("Sensitivity (Recall)", fontsize=14)
+    ax.set_ylabel("Precision", fontsize=14)
+    set_scatter_title(ax, genome_build, annotation, snp_class, title_suffix)
+
+    return ax
+
+
+def set_scatter_title(ax, genome_build, annotation, snp_class, title_suffix=""):
+    ax.set_title(
+        f"Sensitivity (Recall) vs. Precision\n"
+        f"{genome_build}, {annotation} — SNPClass: {snp_class}\n{title_suffix}",
+        fontsize=16
+    )
+
 
-    # 6) Loop over each unique SNPClass -> produce TWO scatter plots:
-    #    (A) Full range
-    #    (B) Zoomed in to top recall & top precision points.
-    for snp_class in df["SNPClass"].unique():
-        df_sub = df[df["SNPClass"] == snp_class].copy()
-
-        # --------------------------
-        # HELPER: Plot function
-        # --------------------------
-        def create_scatter(ax, title_suffix=""):
-            """
-            Draw scatter points for df_sub on ax, with legends, etc.
-            Return ax so we can add text or further customization.
-            """
-            # Scatter each point
-            for _, row in df_sub.iterrows():
-                ax.scatter(
-                    row["Sensitivity-Recall"],
-                    row["Precision"],
-                    color=sample_color_map[row["Sample"]],
-                    marker=marker_map[row["Pipeline"]],
-                    edgecolors="k",
-                    alpha=0.75,
-                    s=30  # ~40% smaller than s=50
-                )
-
-            # Legends: Pipelines (markers)
-            handles_markers = [
-                plt.Line2D(
-                    [0], [0],
-                    marker=marker_map[pipeline],
-                    color='w',
-                    markerfacecolor='gray',
-                    markeredgecolor='k',
-                    markersize=8,
-                    label=pipeline
-                )
-                for pipeline in unique_pipelines
-            ]
-            legend_pipelines = ax.legend(
-                handles=handles_markers,
-                title="Pipeline (Aligner-VarCaller)",
-                loc="lower left",
-                fontsize=9,
-                frameon=True
-            )
-            ax.add_artist(legend_pipelines)
-
-            # Legends: Samples (colors)
-            handles_samples = [
-                plt.Line2D(
-                    [0], [0],
-                    marker='o',
-                    color='w',
-                    markerfacecolor=sample_color_map[sample],
-                    markeredgecolor='k',
-                    markersize=8,
-                    label=sample
-                )
-                for sample in samples
-            ]
-            legend_samples = ax.legend(
-                handles=handles_samples,
-                title="Sample",
-                loc="upper left",
-                fontsize=9,
-                frameon=True
-            )
-            ax.add_artist(legend_samples)
-
-            # Labels & Title
-            ax.set_xlabel("Sensitivity (Recall)", fontsize=14)
-            ax.set_ylabel("Precision", fontsize=14)
-            ax.set_title(
-                f"Sensitivity (Recall) vs. Precision\n"
-                f"{genome_build}, {annotation} — SNPClass: {snp_class}\n{title_suffix}",
-                fontsize=16
-            )
-
-            return ax
-
-        # ----------------------------
-        # (A) Full-range scatter plot
-        # ----------------------------
-        figA, axA = plt.subplots(figsize=(10, 7))
-        plt.subplots_adjust(right=0.8)
-
-        create_scatter(axA, title_suffix="(Full Range)")
-        # Add top pipelines text box
-        add_top_pipelines_text(axA, df_sub)
-
-        out_file_full = f"{output_prefix}_{snp_class}.png"
-        plt.tight_layout()
-        plt.savefig(out_file_full, dpi=300, bbox_inches='tight')
+def zoom_limits(df_sub, margin=0.01):
+    """
+    Bounding rectangle around the highest-recall and highest-precision points
+    (+ a small margin), or None if df_sub is empty.
+    """
+    if df_sub.empty:
+        return None
+    max_recall_index = df_sub["Sensitivity-Recall"].idxmax()
+    max_prec_index   = df_sub["Precision"].idxmax()
+
+    recall_x = df_sub.loc[max_recall_index, "Sensitivity-Recall"]
+    recall_y = df_sub.loc[max_recall_index, "Precision"]
+    prec_x   = df_sub.loc[max_prec_index,   "Sensitivity-Recall"]
+    prec_y   = df_sub.loc[max_prec_index,   "Precision"]
+
+    x_min = max(0.0, min(recall_x, prec_x) - margin)
+    x_max = min(1.0, max(recall_x, prec_x) + margin)
+    y_min = max(0.0, min(recall_y, prec_y) - margin)
+    y_max = min(1.0, max(recall_y, prec_y) + margin)
+    return (x_min, x_max), (y_min, y_max)
+
+
+def plot_scatter_class(df, snp_class, genome_build, annotation, output_prefix, styles=None,
+                       save=DEFAULT_SAVE, artifacts=("scatter", "zoom"), stats=None):
+    """
+    Produce up to TWO scatter plots for one SNPClass:
+    (A) Full range ("scatter")
+    (B) Zoomed in to top recall & top precision points ("zoom").
+    The zoom re-uses the full figure's artists: only the limits and title change.
+    With stats, each pipeline's pooled point and bootstrap CI are drawn too.
+    """
+    import matplotlib.pyplot as plt
+
+    if styles is None:
+        styles = build_styles(df)
+    df_sub = df[df["SNPClass"] == snp_class]
+
+    # ----------------------------
+    # (A) Full-range scatter plot
+    # ----------------------------
+    fig, ax = plt.subplots(figsize=(10, 7))
+    plt.subplots_adjust(right=0.8)
+
+    create_scatter(ax, df_sub, styles, genome_build, annotation, snp_class, title_suffix="(Full Range)")
+    if stats is not None:
+        draw_intervals(ax, class_stats(stats, snp_class)["ci"], styles)
+    # Add top pipelines text box
+    add_top_pipelines_text(ax, df_sub, stats, snp_class)
+
+    if "scatter" in artifacts:
+        fig.tight_layout()
+        out_file_full = save_figure(fig, f"{output_prefix}_{snp_class}.png", save,
+                                    close=False, bbox_inches='tight')
         print(f"Saved: {out_file_full}")
-        plt.show()
-
-        # ----------------------------------------
-        # (B) Zoomed-in scatter: top recall & prec
-        # ----------------------------------------
-        # Identify highest recall & highest precision in df_sub
-        max_recall_index = df_sub["Sensitivity-Recall"].idxmax() if not df_sub.empty else None
-        max_prec_index   = df_sub["Precision"].idxmax() if not df_sub.empty else None
-
-        if max_recall_index is not None and max_prec_index is not None:
-            recall_x = df_sub.loc[max_recall_index, "Sensitivity-Recall"]
-            recall_y = df_sub.loc[max_recall_index, "Precision"]
-            prec_x   = df_sub.loc[max_prec_index,   "Sensitivity-Recall"]
-            prec_y   = df_sub.loc[max_prec_index,   "Precision"]
-
-            # Determine bounding rectangle for these 2 points + a small margin
-            margin = 0.01
-            x_min = max(0.0, min(recall_x, prec_x) - margin)
-            x_max = min(1.0, max(recall_x, prec_x) + margin)
-            y_min = max(0.0, min(recall_y, prec_y) - margin)
-            y_max = min(1.0, max(recall_y, prec_y) + margin)
-
-            figB, axB = plt.subplots(figsize=(10, 7))
-            plt.subplots_adjust(right=0.8)
-
-            create_scatter(axB, title_suffix="(Zoomed to top Recall & Precision)")
-            axB.set_xlim(x_min, x_max)
-            axB.set_ylim(y_min, y_max)
-            # Add top pipelines text box
-            add_top_pipelines_text(axB, df_sub)
-
-            out_file_zoom = f"{output_prefix}_{snp_class}_zoom.png"
-            plt.tight_layout()
-            plt.savefig(out_file_zoom, dpi=300, bbox_inches='tight')
-            print(f"Saved: {out_file_zoom}")
-            plt.show()
-
-    # -------------------------------------------------------------------------
-    # Create one boxplot figure *per* SNPClass for 6 metrics:
-    # (Fscore, Sensitivity-Recall, Specificity, FDR, PPV, Precision)
-    # -------------------------------------------------------------------------
-    metrics = [
-        ("Fscore",            "F-score"),
-        ("Sensitivity-Recall","Recall"),
-        ("Specificity",       "Specificity"),
-        ("FDR",               "FDR"),
-        ("PPV",               "PPV"),
-        ("Precision",         "Precision")
-    ]
 
-    unique_classes = df["SNPClass"].unique()
-    for snp_class in unique_classes:
-        df_class = df[df["SNPClass"] == snp_class].copy()
-
-        # Create a figure with 6 subplots (2 rows x 3 cols).
-        fig, axes = plt.subplots(2, 3, figsize=(18, 10))
-        axes = axes.flatten()
-
-        for i, (col_name, label) in enumerate(metrics):
-            ax = axes[i]
-
-            # Boxplot
-            sns.boxplot(
-                x="Pipeline",
-                y=col_name,
-                data=df_class,
-                color="white",
-                ax=ax
-            )
-            # Jittered sample dots: solid, size=6
-            sns.stripplot(
-                x="Pipeline",
-                y=col_name,
-                data=df_class,
-                hue="Sample",
-                dodge=True,
-                jitter=True,
-                marker='o',
-                size=3,
-                alpha=1.0,
-                ax=ax
-            )
-
-            # Rotate labels so the label end is right above the tick
-            ax.set_xticklabels(ax.get_xticklabels(), rotation=45, ha='right')
-
-            # Try setting the y-axis min to Q1 of the "bwa2a-clair3" pipeline, if it exists
-            # 1) Filter data to that pipeline
-            df_bwa2a = df_class[df_class["Pipeline"] == "bwa2a-clair3"]
-            if not df_bwa2a.empty and col_name in df_bwa2a.columns:
-                # 2) Get the 25th percentile (Q1)
-                q1 = df_bwa2a[col_name].quantile(0.25)
-                # 3) Set as the lower y-limit, if q1 is finite
-                if pd.notnull(q1):
-                    # We'll keep the upper limit automatic
-                    ax.set_ylim(q1, None)
-
-            ax.set_title(f"{label}", fontsize=14)
-            ax.set_xlabel("Pipeline", fontsize=12)
-            ax.set_ylabel(label, fontsize=12)
-
-            # Legend only on the last subplot
-            if i == len(metrics) - 1:
-                ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left', title="Sample")
-            else:
-                ax.legend([], [], frameon=False)
-
-        # Overall figure title
-        plt.suptitle(
-            f"Boxplots for SNPClass: {snp_class}\n{genome_build}, {annotation}",
-            fontsize=16
+    # ----------------------------------------
+    # (B) Zoomed-in scatter: top recall & prec
+    # ----------------------------------------
+    limits = zoom_limits(df_sub) if "zoom" in artifacts else None
+    if limits is not None:
+        ax.set_xlim(*limits[0])
+        ax.set_ylim(*limits[1])
+        set_scatter_title(ax, genome_build, annotation, snp_class,
+                          title_suffix="(Zoomed to top Recall & Precision)")
+
+        fig.tight_layout()
+        out_file_zoom = save_figure(fig, f"{output_prefix}_{snp_class}_zoom.png", save,
+                                    close=False, bbox_inches='tight')
+        print(f"Saved: {out_file_zoom}")
+    plt.close(fig)
+
+
+def plot_boxplots_class(df, snp_class, genome_build, annotation, output_prefix, save=DEFAULT_SAVE, stats=None):
+    """
+    Create one boxplot figure for a SNPClass with 6 metrics:
+    (Fscore, Sensitivity-Recall, Specificity, FDR, PPV, Precision)
+    With stats, every pipeline also gets its pooled estimate and bootstrap CI
+    and a marker against the best pipeline (see mark_significance).
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    df_class = df[df["SNPClass"] == snp_class].copy()
+
+    # Create a figure with 6 subplots (2 rows x 3 cols).
+    fig, axes = plt.subplots(2, 3, figsize=(18, 10))
+    axes = axes.flatten()
+
+    for i, (col_name, label) in enumerate(METRICS):
+        ax = axes[i]
+
+        # Boxplot
+        sns.boxplot(
+            x="Pipeline",
+            y=col_name,
+            data=df_class,
+            color="white",
+            ax=ax
+        )
+        # Jittered sample dots: solid, size=6
+        sns.stripplot(
+            x="Pipeline",
+            y=col_name,
+            data=df_class,
+            hue="Sample",
+            dodge=True,
+            jitter=True,
+            marker='o',
+            size=3,
+            alpha=1.0,
+            ax=ax
         )
 
-        plt.tight_layout(rect=[0, 0, 1, 0.95])  # leave room for suptitle
-        out_file_box = f"{output_prefix}_{snp_class}_boxplots.png"
-        plt.savefig(out_file_box, dpi=300, bbox_inches="tight")
-        print(f"Saved: {out_file_box}")
-        plt.show()
+        # Rotate labels so the label end is right above the tick
+        ax.set_xticklabels(ax.get_xticklabels(), rotation=45, ha='right')
+
+        # Try setting the y-axis min to Q1 of the "bwa2a-clair3" pipeline, if it exists
+        # 1) Filter data to that pipeline
+        df_bwa2a = df_class[df_class["Pipeline"] == "bwa2a-clair3"]
+        if not df_bwa2a.empty and col_name in df_bwa2a.columns:
+            # 2) Get the 25th percentile (Q1)
+            q1 = df_bwa2a[col_name].quantile(0.25)
+            # 3) Set as the lower y-limit, if q1 is finite
+            if pd.notnull(q1):
+                # We'll keep the upper limit automatic
+                ax.set_ylim(q1, None)
+
+        if stats is not None:
+            mark_significance(ax, stats, snp_class, col_name)
+
+        ax.set_title(f"{label}", fontsize=14)
+        ax.set_xlabel("Pipeline", fontsize=12)
+        ax.set_ylabel(label, fontsize=12)
+
+        # Legend only on the last subplot
+        if i == len(METRICS) - 1:
+            ax.legend(bbox_to_anchor=(1.05, 1), loc='upper left', title="Sample")
+        else:
+            ax.legend([], [], frameon=False)
+
+    # Overall figure title
+    fig.suptitle(
+        f"Boxplots for SNPClass: {snp_class}\n{genome_build}, {annotation}",
+        fontsize=16
+    )
+
+    fig.tight_layout(rect=[0, 0, 1, 0.95])  # leave room for suptitle
+    out_file_box = save_figure(fig, f"{output_prefix}_{snp_class}_boxplots.png", save, bbox_inches="tight")
+    print(f"Saved: {out_file_box}")
+
+
+def mark_significance(ax, stats, snp_class, metric):
+    """
+    Pooled estimate and bootstrap CI per pipeline (black error bars) on a
+    boxplot axis, and above each pipeline 'best', '*' (differs from the best,
+    q < alpha) or 'ns'.  FDR is best when lowest.
+    """
+    import matplotlib.transforms as mtransforms
+
+    ci = class_stats(stats, snp_class)["ci"]
+    ci = ci[ci["metric"] == metric].set_index("Pipeline")
+    best, q_values = significance.versus_best(stats["ci"], stats["pairs"], snp_class, metric, stats["alpha"],
+                                              higher_is_better=metric != "FDR")
+    top = mtransforms.blended_transform_factory(ax.transData, ax.transAxes)
+    for x, tick in enumerate(ax.get_xticklabels()):
+        pipeline = tick.get_text()
+        if pipeline not in ci.index:
+            continue
+        row = ci.loc[pipeline]
+        ax.errorbar(x, row["estimate"], yerr=[[row["estimate"] - row["ci_low"]], [row["ci_high"] - row["estimate"]]],
+                    fmt="D", color="k", markersize=4, elinewidth=1.0, capsize=3, zorder=4)
+        mark = "best" if pipeline == best else ("*" if q_values.get(pipeline, 1.0) < stats["alpha"] else "ns")
+        ax.text(x, 0.99, mark, transform=top, ha="center", va="top", fontsize=7)
+
+
+def compute_stats(df, n_resamples=10_000, alpha=0.05, confidence=0.95, seed=0):
+    """Bootstrap CIs and paired permutation tests of every pipeline and SNPClass (see daylily_giab.significance)."""
+    return {
+        "ci": significance.bootstrap_ci(df, n_resamples, confidence=confidence, seed=seed),
+        "pairs": significance.paired_tests(df, n_resamples, seed=seed),
+        "alpha": alpha,
+        "confidence": confidence,
+    }
+
+
+def class_stats(stats, snp_class):
+    """The CI and pairwise rows of one SNPClass."""
+    return {key: stats[key][stats[key]["SNPClass"] == snp_class] for key in ("ci", "pairs")}
+
+
+def write_stats(stats, output_prefix):
+    """<prefix>_ci.tsv and <prefix>_pairwise.tsv; returns the paths."""
+    paths = []
+    for key, name in [("ci", "ci"), ("pairs", "pairwise")]:
+        path = f"{output_prefix}_{name}.tsv"
+        stats[key].to_csv(path, sep="\t", index=False)
+        paths.append(path)
+    return paths
+
+
+def class_outputs(df, snp_class, genome_build, annotation, output_prefix, styles, save=DEFAULT_SAVE,
+                  artifacts=ARTIFACTS, stats=None):
+    """
+    {artifact: (output file, fingerprint)} for one SNPClass.  The fingerprint
+    covers the slice columns the figure draws, the shared legend (pipelines,
+    samples), the parameters, the class's statistics if any, and this
+    module's code (see daylily_giab.rebuild).
+    """
+    df_sub = df[df["SNPClass"] == snp_class]
+    params = {"genome_build": genome_build, "annotation": annotation, "snp_class": snp_class, "save": save}
+    if stats is not None:
+        params["stats"] = dict(class_stats(stats, snp_class), alpha=stats["alpha"])
+    code = code_digest(__file__, figures.__file__, significance.__file__)
+
+    outputs = {}
+    legend = {"pipelines": styles["pipelines"], "samples": styles["samples"]}
+    scatter_fp = fingerprint("scatter", df_sub[SCATTER_COLUMNS], legend, params, code)
+    if "scatter" in artifacts:
+        outputs["scatter"] = (output_path(f"{output_prefix}_{snp_class}.png", save), scatter_fp)
+    if "zoom" in artifacts:
+        outputs["zoom"] = (output_path(f"{output_prefix}_{snp_class}_zoom.png", save), scatter_fp)
+    if "boxplots" in artifacts:
+        outputs["boxplots"] = (output_path(f"{output_prefix}_{snp_class}_boxplots.png", save),
+                               fingerprint("boxplots", df_sub[BOXPLOT_COLUMNS], params, code))
+    return outputs
+
+
+def write_class_points(df, snp_class, output_prefix):
+    """The per-sample points of one SNPClass (BOXPLOT_COLUMNS) as <prefix>_<SNPClass>_points.tsv."""
+    out_file = f"{output_prefix}_{snp_class}_points.tsv"
+    class_table(df, snp_class, BOXPLOT_COLUMNS).to_csv(out_file, sep="\t", index=False)
+    return out_file
+
+
+def plot_sensitivity_vs_precision(input_file, genome_build, annotation, output_prefix,
+                                  save=DEFAULT_SAVE, artifacts=ARTIFACTS, classes=None, force=False,
+                                  tables_only=False, resamples=0, alpha=0.05, seed=0):
+    # 1) Read the input TSV file (typed + cached)
+    # 2) Filter out rows containing '_gt50' in SNPClass (optional)
+    # 3) Create a pipeline identifier (Aligner-Caller)
+    with tracing.stage("load"):
+        df = load_concordance(input_file)
+    with tracing.stage("aggregate"):
+        df = prepare_concordance(df)
+
+    snp_classes = [c for c in df["SNPClass"].unique() if classes is None or c in classes]
+
+    # Bootstrap CIs and pairwise tests, on every class so the q-values do not depend on --classes
+    stats = None
+    if resamples:
+        with tracing.stage("stats"):
+            stats = compute_stats(df, resamples, alpha=alpha, seed=seed)
+            for path in write_stats(stats, output_prefix):
+                print(f"Saved: {path}")
+
+    if tables_only:
+        with tracing.stage("write"):
+            for snp_class in snp_classes:
+                print(f"Saved: {write_class_points(df, snp_class, output_prefix)}")
+        return
+
+    # 4-5) Marker / color maps shared by every SNPClass
+    with tracing.stage("styles"):
+        styles = build_styles(df)
+
+    # Figures whose data slice, parameters and code are unchanged since the last run are skipped
+    manifest = BuildManifest.for_outputs(os.path.dirname(output_prefix), force=force)
+
+    # 6) Per SNPClass: the scatter plots (full + zoom) and one 6-metric boxplot figure
+    try:
+        for snp_class in snp_classes:
+            outputs = class_outputs(df, snp_class, genome_build, annotation, output_prefix, styles,
+                                    save=save, artifacts=artifacts, stats=stats)
+            todo = manifest.stale(outputs)
+            if len(todo) < len(outputs):
+                print(f"Up to date: {snp_class} {', '.join(a for a in outputs if a not in todo)}")
+
+            scatter_artifacts = tuple(a for a in ("scatter", "zoom") if a in todo)
+            if scatter_artifacts:
+                with tracing.stage(f"render {snp_class} scatter"):
+                    plot_scatter_class(df, snp_class, genome_build, annotation, output_prefix,
+                                       styles=styles, save=save, artifacts=scatter_artifacts, stats=stats)
+            if "boxplots" in todo:
+                with tracing.stage(f"render {snp_class} boxplots"):
+                    plot_boxplots_class(df, snp_class, genome_build, annotation, output_prefix, save=save,
+                                        stats=stats)
+            manifest.record_all(outputs, todo)
+    finally:
+        manifest.save()
 
 
 if __name__ == "__main__":
@@ -291,6 +530,30 @@ if __name__ == "__main__":
     parser.add_argument("-a", "--annotation", required=True, help="Annotation")
     parser.add_argument("-o", "--output", required=True,
                         help="Output file prefix. Scatter plots: prefix_SNPClass.png & prefix_SNPClass_zoom.png. Boxplots: prefix_SNPClass_boxplots.png")
+    parser.add_argument("--artifacts", type=parse_list, default=list(ARTIFACTS),
+                        help=f"Comma-separated subset of {','.join(ARTIFACTS)} (default: all)")
+    parser.add_argument("--classes", type=parse_list, default=None,
+                        help="Comma-separated SNPClasses to render (default: all)")
+    parser.add_argument("--tables-only", action="store_true",
+                        help="Write each SNPClass's points as prefix_SNPClass_points.tsv instead of the "
+                             "figures (matplotlib and seaborn are never imported)")
+    parser.add_argument("--resamples", type=int, default=0,
+                        help="Bootstrap / permutation resamples for pipeline CIs and pairwise tests, written to "
+                             "prefix_ci.tsv and prefix_pairwise.tsv and drawn on the figures (default: 0, off)")
+    parser.add_argument("--alpha", type=float, default=0.05,
+                        help="Benjamini-Hochberg q-value below which a pipeline difference is significant")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the resampling (default: 0)")
+    add_output_arguments(parser)
+    add_rebuild_arguments(parser)
+    tracing.add_trace_arguments(parser)
 
     args = parser.parse_args()
-    plot_sensitivity_vs_precision(args.input, args.genomebuild, args.annotation, args.output)
+    unknown = set(args.artifacts) - set(ARTIFACTS)
+    if unknown:
+        parser.error(f"unknown --artifacts: {', '.join(sorted(unknown))}")
+    tracing.start_from_args(args, "generate_recall_v_precision")
+    plot_sensitivity_vs_precision(args.input, args.genomebuild, args.annotation, args.output,
+                                  save=save_options_from_args(args), artifacts=args.artifacts,
+                                  classes=args.classes, force=args.force, tables_only=args.tables_only,
+                                  resamples=args.resamples, alpha=args.alpha, seed=args.seed)
+    tracing.finish()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Right-size threads and memory per rule family from one or more
+benchmarks_summary.tsv files (see bin/daylily_giab/rightsizing.py).
+
+Writes:
+  <prefix>_rightsizing.tsv   fit, recommendation and projected cost / core-hour /
+                             wall-time change per rule family
+  <resources>                {rule family: {threads, mem_mb}}; .json, or .yaml/.yml
+                             (needs PyYAML) for the workflow config
+
+Example:
+  python bin/generate_thread_recommendations.py data/*/*_benchmarks_summary.tsv \\
+      -o all_runs --resources all_runs_resources.yaml
+"""
+
+import argparse
+import json
+import os
+
+import pandas as pd
+
+import generate_benchmark_plots as bench
+from daylily_giab import rightsizing
+from daylily_giab.loaders import load_benchmarks
+
+
+def write_resources(recommendations, path, meta):
+    """Write the {family: {threads, mem_mb}} file; the format follows the extension."""
+    payload = {"rightsizing": meta, "resources": rightsizing.resources(recommendations)}
+    if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise SystemExit("Writing YAML needs PyYAML (pip install pyyaml); use a .json file instead")
+        with open(path, "w") as f:
+            yaml.safe_dump(payload, f, sort_keys=False)
+    else:
+        with open(path, "w") as f:
+            json.dump(payload, f, indent=1)
+            f.write("\n")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommend threads and mem_mb per rule family.")
+    parser.add_argument("data_files", nargs="+", help="benchmarks_summary.tsv files (all runs are pooled)")
+    parser.add_argument("-o", "--output-prefix", default="rightsizing", help="Prefix of the TSV output")
+    parser.add_argument("--resources", default=None,
+                        help="Resources file to write (default: <prefix>_resources.json)")
+    parser.add_argument("--max-slowdown", type=float, default=1.25,
+                        help="Largest predicted task runtime increase accepted for fewer threads (default: 1.25)")
+    parser.add_argument("--mem-headroom", type=float, default=0.2,
+                        help="Fraction added to the peak memory (default: 0.2)")
+    parser.add_argument("--mem-round-mb", type=int, default=256, help="Round mem_mb up to a multiple (default: 256)")
+    args = parser.parse_args()
+
+    df = pd.concat([bench.prepare_benchmarks(load_benchmarks(f)) for f in args.data_files], ignore_index=True)
+    rec = rightsizing.recommend(df, max_slowdown=args.max_slowdown,
+                                mem_headroom=args.mem_headroom, mem_round_mb=args.mem_round_mb)
+
+    out_tsv = f"{args.output_prefix}_rightsizing.tsv"
+    rec.to_csv(out_tsv, sep="\t", index=False)
+    meta = {
+        "inputs": [os.path.basename(f) for f in args.data_files],
+        "max_slowdown": args.max_slowdown,
+        "mem_headroom": args.mem_headroom,
+    }
+    out_res = write_resources(rec, args.resources or f"{args.output_prefix}_resources.json", meta)
+
+    cost, saved = rec["cost"].sum(), rec["cost_saved"].sum()
+    print(f"Saved: {out_tsv}")
+    print(f"Saved: {out_res}")
+    print(f"Projected cost ${cost - saved:,.2f} vs ${cost:,.2f} observed ({saved / cost:.1%} saved); "
+          f"reserved core-hours {rec['rec_core_h'].sum():,.0f} vs {rec['core_h'].sum():,.0f}")
+    capped = rec[rec["mem_capped"]]
+    if len(capped):
+        print("mem_mb capped at the RAM of the peak task's instance (less headroom than --mem-headroom): "
+              + ", ".join(f"{row.family} ({row.rec_mem_mb:,} MB)" for row in capped.itertuples(index=False)))
+
+
+if __name__ == "__main__":
+    main()
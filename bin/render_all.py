@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Render a full results/<region>/<run>/ tree in one pass.
+
+Loads the concordance, benchmark and alignstats tables once, then fans every
+figure family out to a process pool (matplotlib Agg backend):
+
+  benchmarks/                 <anno>_<build>_{raw_task_cost,aggregated_task_cost,aggregated_runtime_cpu,shard_distribution}.png
+                              <anno>_<build>_{aggregated_task_metrics,task_costs,parsed_rules,shard_metrics,shard_chrom_summary}.csv
+  concordance/pvr/            <build>_<anno>__<SNPClass>.png, <build>_<anno>__<SNPClass>_zoom.png
+  concordance/boxplots/       <build>_<anno>__<SNPClass>_boxplots.png
+  concordance/heatmaps/       heatmap_<SNPClass>_<build>_<anno>.png
+  concordance/raw_metrics/    plot_<build>_<anno>_<SNPClass>_<metric>.pdf  (Rscript, if installed)
+  meta/                       <build>_<anno>_meta_ana.tsv + _boxplot_<metric>.png
+
+File names match what the individual bin/ scripts produce (see docs/data/overview.md).
+Figures whose data slice, parameters and code are unchanged since the last
+run (<outdir>/.build_manifest.json) are skipped; --force re-renders all.
+
+Example:
+  python bin/render_all.py -b hg38 -a usw2d-all \\
+      -c data/us_west_2d/hg38_7giab_us-west-2d_giab_concordance_mqc.tsv \\
+      -m data/us_west_2d/hg38_7giab_us-west-2d_benchmarks_summary.tsv \\
+      -s data/us_west_2d/hg38_7giab_us-west-2d_alignstats.tsv \\
+      -o results/us_west_2d/all
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from daylily_giab import loaders
+from daylily_giab.figures import add_output_arguments, parse_list, save_options_from_args
+from daylily_giab.rebuild import BuildManifest, add_rebuild_arguments, code_digest, fingerprint
+import generate_benchmark_plots as bench
+import generate_concordance_heatmap as heatmap
+import generate_meta_analysis as meta
+import generate_recall_v_precision as pvr
+
+# Figure families (select with --artifacts)
+ARTIFACTS = ("benchmarks", "raw_metrics", "scatter", "zoom", "boxplots", "heatmaps", "meta")
+
+# Tables shared with worker processes (set once per worker by _init_worker).
+_TABLES = {}
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Load benchmark/concordance/alignstats once and render every figure family in parallel."
+    )
+    parser.add_argument("-b", "--genomebuild", required=True, help="Genome build, e.g. hg38")
+    parser.add_argument("-a", "--annotation", required=True, help="Run annotation, e.g. usw2d-all")
+    parser.add_argument("-c", "--concordance", required=True, help="giab_concordance_mqc.tsv")
+    parser.add_argument("-m", "--benchmarks", required=True, help="benchmarks_summary.tsv")
+    parser.add_argument("-s", "--alignstats", required=True, help="alignstats.tsv")
+    parser.add_argument("-o", "--outdir", required=True, help="Run directory, e.g. results/us_west_2d/all")
+    parser.add_argument("--metric", default="Fscore", help="Heatmap metric column (default: Fscore)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="Worker processes (default: all cores; 1 renders in-process)")
+    parser.add_argument("--skip-r", action="store_true",
+                        help="Do not run bin/generate_concordance_plots.R for raw_metrics/")
+    parser.add_argument("--artifacts", type=parse_list, default=list(ARTIFACTS),
+                        help=f"Comma-separated subset of {','.join(ARTIFACTS)} (default: all)")
+    add_output_arguments(parser)
+    add_rebuild_arguments(parser)
+    args = parser.parse_args()
+    unknown = set(args.artifacts) - set(ARTIFACTS)
+    if unknown:
+        parser.error(f"unknown --artifacts: {', '.join(sorted(unknown))}")
+    return args
+
+
+def _init_worker(tables):
+    matplotlib.use("Agg")
+    _TABLES.update(tables)
+
+
+def _run_job(job):
+    """Run one (name, func, kwargs, outputs) job against the shared tables; kwargs naming a table get the table."""
+    name, func, kwargs, _ = job
+    start = time.perf_counter()
+    kwargs = {k: _TABLES[v[1:]] if isinstance(v, str) and v.startswith("@") else v
+              for k, v in kwargs.items()}
+    try:
+        func(**kwargs)
+    finally:
+        plt.close("all")
+    return name, time.perf_counter() - start
+
+
+def _raw_metrics_r(concordance, genome_build, annotation, outdir):
+    """bin/generate_concordance_plots.R writes into its cwd, so run it from raw_metrics/."""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "generate_concordance_plots.R")
+    subprocess.run(
+        ["Rscript", script, genome_build, os.path.abspath(concordance), annotation],
+        cwd=outdir, check=True, stdout=subprocess.DEVNULL
+    )
+
+
+def build_jobs(args, tables, dirs, manifest):
+    """
+    Enumerate every figure to render. Slowest families (benchmark stripplots) first.
+    Each job lists its {name: (output file, fingerprint)}; jobs whose outputs
+    are all current in the manifest are dropped, and scatter jobs only render
+    their stale artifacts.
+    """
+    build, anno = args.genomebuild, args.annotation
+    bench_prefix = os.path.join(dirs["benchmarks"], f"{anno}_{build}")
+    meta_tsv = os.path.join(dirs["meta"], f"{build}_{anno}_meta_ana.tsv")
+    pvr_prefix = os.path.join(dirs["pvr"], f"{build}_{anno}_")
+    box_prefix = os.path.join(dirs["boxplots"], f"{build}_{anno}_")
+
+    save = save_options_from_args(args)
+    wanted = set(args.artifacts)
+
+    jobs = []
+
+    def add(name, func, kwargs, outputs):
+        todo = manifest.stale(outputs)
+        if outputs and not todo:
+            return
+        if "artifacts" in kwargs:
+            kwargs["artifacts"] = tuple(a for a in kwargs["artifacts"] if a in todo)
+        jobs.append((name, func, kwargs, {k: outputs[k] for k in todo}))
+
+    if "benchmarks" in wanted:
+        code = code_digest(bench.__file__)
+        benchmarks, aggregated = tables["benchmarks"], tables["aggregated"]
+        out_png = f"{bench_prefix}_raw_task_cost.png"
+        add("benchmarks/raw_task_cost", bench.plot_raw_task_cost,
+            {"df": "@benchmarks", "out_png": out_png},
+            {"raw_task_cost": (out_png, fingerprint(benchmarks[["task_cost", "rule", "HG_sample"]], code))})
+        for metric, xlabel, title, suffix in bench.AGGREGATED_PLOTS:
+            out_png = f"{bench_prefix}_{suffix}.png"
+            add(f"benchmarks/{suffix}", bench.plot_aggregated_boxplot,
+                {"aggregated_df": "@aggregated", "metric": metric, "xlabel": xlabel,
+                 "title": title, "out_png": out_png},
+                {suffix: (out_png, fingerprint(aggregated[[metric, "normalized_rule", "sample"]],
+                                               xlabel, title, code))})
+        if benchmarks["shard"].notna().any():
+            out_png = f"{bench_prefix}_shard_distribution.png"
+            add("benchmarks/shard_distribution", bench.plot_shard_distribution,
+                {"shards": "@shards", "out_png": out_png},
+                {"shard_distribution": (out_png, fingerprint(
+                    tables["shards"][["shard_chrom", "caller", "s", "task_cost"]], code))})
+
+    if "raw_metrics" in wanted and not args.skip_r:
+        # The R script's outputs are not enumerated here, so it always runs.
+        if shutil.which("Rscript"):
+            add("concordance/raw_metrics", _raw_metrics_r,
+                {"concordance": args.concordance, "genome_build": build,
+                 "annotation": anno, "outdir": dirs["raw_metrics"]}, {})
+        else:
+            print("Rscript not found; skipping concordance/raw_metrics", file=sys.stderr)
+
+    concordance, styles = tables["concordance"], tables["styles"]
+    for snp_class in concordance["SNPClass"].unique():
+        if "boxplots" in wanted:
+            add(f"boxplots/{snp_class}", pvr.plot_boxplots_class,
+                {"df": "@concordance", "snp_class": snp_class, "genome_build": build,
+                 "annotation": anno, "output_prefix": box_prefix, "save": save},
+                pvr.class_outputs(concordance, snp_class, build, anno, box_prefix, styles,
+                                  save=save, artifacts=("boxplots",)))
+        scatter_artifacts = tuple(a for a in ("scatter", "zoom") if a in wanted)
+        if scatter_artifacts:
+            add(f"pvr/{snp_class}", pvr.plot_scatter_class,
+                {"df": "@concordance", "snp_class": snp_class, "genome_build": build,
+                 "annotation": anno, "output_prefix": pvr_prefix, "styles": "@styles",
+                 "save": save, "artifacts": scatter_artifacts},
+                pvr.class_outputs(concordance, snp_class, build, anno, pvr_prefix, styles,
+                                  save=save, artifacts=scatter_artifacts))
+        if "heatmaps" in wanted:
+            add(f"heatmaps/{snp_class}", heatmap.plot_class_heatmap,
+                {"df": "@concordance", "snp_class": snp_class, "metric_col": args.metric,
+                 "genome_build": build, "ana_anno": anno, "output_dir": dirs["heatmaps"],
+                 "save": save},
+                {"heatmap": heatmap.heatmap_output(concordance, snp_class, args.metric, build, anno,
+                                                   output_dir=dirs["heatmaps"], save=save)})
+
+    if "meta" in wanted:
+        code = code_digest(meta.__file__)
+        for metric in ("cost_per_vcpu_sec", "cost_per_vcpu_sec_gb"):
+            out_png = meta_tsv.replace(".tsv", f"_boxplot_{metric}.png")
+            add(f"meta/{metric}", meta.plot_boxplot_by_pipeline,
+                {"df": "@meta", "metric": metric, "output_tsv": meta_tsv},
+                {metric: (out_png, fingerprint(tables["meta"][["Sample", "aligner", "var_caller", metric]], code))})
+    return jobs
+
+
+def main():
+    args = parse_arguments()
+    start = time.perf_counter()
+
+    dirs = {
+        "benchmarks": os.path.join(args.outdir, "benchmarks"),
+        "meta": os.path.join(args.outdir, "meta"),
+        "boxplots": os.path.join(args.outdir, "concordance", "boxplots"),
+        "heatmaps": os.path.join(args.outdir, "concordance", "heatmaps"),
+        "pvr": os.path.join(args.outdir, "concordance", "pvr"),
+        "raw_metrics": os.path.join(args.outdir, "concordance", "raw_metrics"),
+    }
+    for d in dirs.values():
+        os.makedirs(d, exist_ok=True)
+
+    # 1) Load + derive every table exactly once
+    benchmarks = bench.prepare_benchmarks(loaders.load_benchmarks(args.benchmarks))
+    aggregated = bench.aggregate_benchmarks(benchmarks)
+    concordance_raw = loaders.load_concordance(args.concordance)
+    concordance = loaders.prepare_concordance(concordance_raw)
+    alignstats = loaders.load_alignstats(args.alignstats)
+
+    # 2) Tables are cheap: write them here, in the parent
+    bench.write_tables(benchmarks, aggregated, os.path.join(dirs["benchmarks"], f"{args.annotation}_{args.genomebuild}"))
+    meta_rows = meta.build_rows(aggregated, concordance_raw, alignstats)
+    meta_tsv = os.path.join(dirs["meta"], f"{args.genomebuild}_{args.annotation}_meta_ana.tsv")
+    meta.write_tsv(meta_rows, meta_tsv)
+
+    tables = {
+        "benchmarks": benchmarks,
+        "aggregated": aggregated,
+        "shards": bench.shard_metrics(benchmarks),
+        "concordance": concordance,
+        "styles": pvr.build_styles(concordance),
+        "meta": pd.DataFrame(meta_rows),
+    }
+    print(f"Loaded tables in {time.perf_counter() - start:.1f}s")
+
+    # 3) Fan out the figures whose inputs changed since the last run
+    manifest = BuildManifest.for_outputs(args.outdir, force=args.force)
+    jobs = build_jobs(args, tables, dirs, manifest)
+    outputs = {name: job_outputs for name, _, _, job_outputs in jobs}
+    results = []
+    try:
+        if args.jobs <= 1:
+            _init_worker(tables)
+            for job in jobs:
+                results.append(_run_job(job))
+                manifest.record_all(outputs[job[0]])
+        else:
+            with ProcessPoolExecutor(max_workers=args.jobs, initializer=_init_worker,
+                                     initargs=(tables,)) as pool:
+                futures = [pool.submit(_run_job, job) for job in jobs]
+                for future in as_completed(futures):
+                    results.append(future.result())
+                    manifest.record_all(outputs[results[-1][0]])
+    finally:
+        manifest.save()
+
+    for name, elapsed in sorted(results, key=lambda r: -r[1]):
+        print(f"  {elapsed:7.1f}s  {name}")
+    print(f"Rendered {len(jobs)} jobs with {max(1, args.jobs)} worker(s) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Reprice a benchmark table under other regions / spot prices
+(see bin/daylily_giab/repricing.py).
+
+Writes, for --output-prefix <prefix>:
+  <prefix>_cost_matrix.tsv       scenario x pipeline cost, summed over samples
+  <prefix>_pipeline_costs.tsv    cost_per_task, cost_per_vcpu_sec(_gb) per scenario,
+                                 sample and pipeline
+  <prefix>_rule_costs.tsv        Total_cost per scenario, sample and rule (--rules)
+
+Examples:
+  # what would the us-west-2d hg38 campaign cost in eu-central-1c at max spot?
+  python bin/reprice.py -m data/us_west_2d/hg38_7giab_us-west-2d_benchmarks_summary.tsv \\
+      -a data/us_west_2d/hg38_7giab_us-west-2d_alignstats.tsv -o usw2d_hg38 --scenario eu-central-1c:max
+
+  # every AZ at its median and harmonic-mean spot price
+  python bin/reprice.py -m <benchmarks.tsv> --stats median,harmonic -o usw2d_hg38
+
+  # a spot price history (AvailabilityZone, InstanceType, SpotPrice, Timestamp)
+  python bin/reprice.py -m <benchmarks.tsv> --series spot_history.tsv --azs us-west-2d,eu-central-1c
+"""
+
+import argparse
+import os
+
+import pandas as pd
+
+import generate_benchmark_plots as bench
+from daylily_giab import repricing
+from daylily_giab.figures import parse_list
+from daylily_giab.loaders import load_alignstats, load_benchmarks, load_spot_prices
+from daylily_giab.simulate import PRICE_STATS
+from generate_meta_analysis import alignstats_lookup
+
+DEFAULT_PRICES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "sentieon_case_study.tsv")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Scenario x pipeline costs of a benchmark table.")
+    parser.add_argument("-m", "--benchmarks", required=True, help="benchmarks_summary.tsv")
+    parser.add_argument("-a", "--alignstats", default=None, help="alignstats.tsv (for cost_per_vcpu_sec_gb)")
+    parser.add_argument("--prices", default=DEFAULT_PRICES, help="Spot price report (default: data/sentieon_case_study.tsv)")
+    parser.add_argument("--stats", type=parse_list, default=list(PRICE_STATS),
+                        help=f"Price statistics of the report to use (default: {','.join(PRICE_STATS)})")
+    parser.add_argument("--series", default=None,
+                        help="Spot price history to use instead of the report, one scenario per AZ and time point")
+    parser.add_argument("--azs", type=parse_list, default=None, help="Only these region-AZs (default: all)")
+    parser.add_argument("--scenario", default=None, help="Print the pipeline costs of this scenario")
+    parser.add_argument("--rules", action="store_true", help="Also write per-rule Total_cost")
+    parser.add_argument("-o", "--output-prefix", default="reprice", help="Prefix of the TSV outputs")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    df = bench.prepare_benchmarks(load_benchmarks(args.benchmarks))
+
+    if args.series:
+        scenarios = repricing.series_scenarios(repricing.read_price_series(args.series), azs=args.azs)
+    else:
+        unknown = set(args.stats) - set(PRICE_STATS)
+        if unknown:
+            raise SystemExit(f"Unknown price statistic(s): {', '.join(sorted(unknown))}")
+        scenarios = repricing.case_study_scenarios(load_spot_prices(args.prices), repricing.instance_vcpus(df),
+                                                   stats=args.stats, azs=args.azs)
+
+    yield_bases = None
+    if args.alignstats:
+        lookup = alignstats_lookup(load_alignstats(args.alignstats))
+        yield_bases = {k: v["YieldBases"] for k, v in lookup.items()}
+
+    pipelines = repricing.pipeline_costs(df, scenarios, yield_bases=yield_bases)
+    matrix = repricing.cost_matrix(pipelines)
+
+    pipelines.to_csv(f"{args.output_prefix}_pipeline_costs.tsv", sep="\t", index=False)
+    matrix.to_csv(f"{args.output_prefix}_cost_matrix.tsv", sep="\t")
+    print(f"Saved: {args.output_prefix}_pipeline_costs.tsv")
+    print(f"Saved: {args.output_prefix}_cost_matrix.tsv")
+    if args.rules:
+        repricing.rule_costs(df, scenarios).to_csv(f"{args.output_prefix}_rule_costs.tsv", sep="\t", index=False)
+        print(f"Saved: {args.output_prefix}_rule_costs.tsv")
+
+    print(f"{len(scenarios)} scenarios; campaign total {repricing.OBSERVED}: ${matrix.loc[repricing.OBSERVED, 'total']:,.2f}, "
+          f"range ${matrix['total'].min():,.2f} - ${matrix['total'].max():,.2f}")
+    if args.scenario:
+        if args.scenario not in matrix.index:
+            raise SystemExit(f"Unknown scenario '{args.scenario}'")
+        row = matrix.loc[[repricing.OBSERVED, args.scenario]].T
+        with pd.option_context("display.float_format", "{:,.2f}".format):
+            print(row.to_string())
+
+
+if __name__ == "__main__":
+    main()
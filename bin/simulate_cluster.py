@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Predict makespan, core utilization and spot cost of a batch of N samples x
+pipelines on a chosen fleet, before running it (see
+bin/daylily_giab/simulate.py).
+
+Writes, for --output-prefix <prefix>:
+  <prefix>_cost_by_az.tsv   makespan, utilization and cost in every AZ of the
+                            spot price report, cheapest first
+  <prefix>_hosts.tsv        tasks, reserved core-hours and busy span per instance
+
+Example:
+  python bin/simulate_cluster.py data/us_west_2d/hg38_7giab_us-west-2d_benchmarks_summary.tsv \\
+      -p bwa2a-deep,sent-sentd -n 1000 --fleet m7i.48xlarge:8,r7i.48xlarge:2 -o batch1000
+"""
+
+import argparse
+import os
+import time
+
+import pandas as pd
+
+import generate_benchmark_plots as bench
+from daylily_giab import simulate
+from daylily_giab.figures import parse_list
+from daylily_giab.loaders import load_benchmarks, load_spot_prices
+
+DEFAULT_PRICES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "sentieon_case_study.tsv")
+
+
+def load_runs(paths):
+    """Benchmarks of every run, with sample names made unique per file."""
+    frames = []
+    for i, path in enumerate(paths):
+        df = bench.prepare_benchmarks(load_benchmarks(path))
+        df["sample"] = f"{i}:" + df["sample"].astype(str)
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate a batch of samples on a fleet of spot instances.")
+    parser.add_argument("data_files", nargs="+", help="benchmarks_summary.tsv files to draw samples from")
+    parser.add_argument("-p", "--pipelines", type=parse_list, required=True,
+                        help="Comma-separated <aligner>-<caller> pipelines, e.g. bwa2a-deep,sent-sentd")
+    parser.add_argument("-n", "--samples", type=int, default=7, help="Samples in the batch (default: 7)")
+    parser.add_argument("--fleet", default="m7i.48xlarge:4",
+                        help="Comma-separated <instance type>[:count] (default: m7i.48xlarge:4); "
+                             f"known types: {', '.join(simulate.INSTANCE_TYPES)}")
+    parser.add_argument("--prices", default=DEFAULT_PRICES, help="Spot price report (default: data/sentieon_case_study.tsv)")
+    parser.add_argument("--price-stat", choices=list(simulate.PRICE_STATS), default="harmonic",
+                        help="Spot price statistic to bill with (default: harmonic)")
+    parser.add_argument("--rightsizing", default=None,
+                        help="<prefix>_rightsizing.tsv from generate_thread_recommendations.py to apply")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for drawing historical samples (default: 0)")
+    parser.add_argument("-o", "--output-prefix", default="simulation", help="Prefix of the TSV outputs")
+    args = parser.parse_args()
+
+    fleet = simulate.parse_fleet(args.fleet)
+    pipelines = simulate.parse_pipelines(args.pipelines)
+    sizing = pd.read_csv(args.rightsizing, sep="\t") if args.rightsizing else None
+    tasks = simulate.task_table(load_runs(args.data_files), pipelines, sizing=sizing)
+
+    t0 = time.perf_counter()
+    workload = simulate.Workload(tasks, pipelines, args.samples, seed=args.seed, fleet=fleet)
+    hosts, _ = simulate.simulate(workload, fleet)
+    elapsed = time.perf_counter() - t0
+
+    costs = simulate.price_schedule(hosts, load_spot_prices(args.prices), args.price_stat, args.samples)
+    costs.to_csv(f"{args.output_prefix}_cost_by_az.tsv", sep="\t", index=False)
+    hosts.to_csv(f"{args.output_prefix}_hosts.tsv", sep="\t", index=False)
+
+    best = costs.iloc[0]
+    print(f"Simulated {len(workload.dur):,} tasks of {args.samples} samples on {len(fleet)} instances "
+          f"in {elapsed:.2f}s")
+    print(f"Makespan {best['makespan_h']:.2f} h, core utilization {best['core_utilization']:.1%}; "
+          f"cheapest AZ {best['region_az']}: ${best['cost_fixed']:,.2f} fixed / ${best['cost_span']:,.2f} span "
+          f"(${best['cost_span_per_sample']:,.2f} per sample)")
+    print(f"Saved: {args.output_prefix}_cost_by_az.tsv")
+    print(f"Saved: {args.output_prefix}_hosts.tsv")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Stratum drilldown of stratified concordance tables: per pipeline, SNPClass
+and stratum (GIAB stratification region, coverage bin, comparison
+footprint), the metric pooled over samples, its change against the same
+pipeline over the whole genome and the stratum's share of the whole-genome
+errors (see bin/daylily_giab/strata.py).
+
+Only the columns the report needs are read from the Parquet cache, and all
+grouping runs on the categorical codes, so tables of tens of millions of
+rows answer in seconds once cached.
+
+Writes, for --output-prefix <prefix>:
+  <prefix>_strata.tsv      every pipeline, SNPClass and stratum (after --where)
+  <prefix>_worst.tsv       the --top strata with the largest drop per pipeline and SNPClass
+  <prefix>_strata.png      pipelines x strata of --plot-strata, coloured by the change in
+                           --metric for --plot-class
+
+Examples:
+  python bin/stratum_drilldown.py -i <stratified_concordance.tsv> -o usw2d --classes SNPts,SNPtv,Indel_50
+  python bin/stratum_drilldown.py -i <stratified_concordance.tsv> -o usw2d_lowcov --strata CovBin \\
+      --where Aligner=sent --metric Sensitivity-Recall --no-plots
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from daylily_giab import loaders, metrics, strata, tracing
+from daylily_giab.figures import DEFAULT_SAVE, add_output_arguments, parse_list, save_figure, save_options_from_args
+
+
+def parse_where(items):
+    """['Aligner=sent', 'Stratum=segdups'] -> {'Aligner': 'sent', 'Stratum': 'segdups'}."""
+    filters = {}
+    for item in items or []:
+        column, sep, value = item.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"--where expects column=value, got {item!r}")
+        filters[column.strip()] = value.strip()
+    return filters
+
+
+def load_inputs(paths, columns):
+    """The projected concordance tables, concatenated with their categoricals kept."""
+    frames = [loaders.load_concordance(path, columns=columns) for path in paths]
+    if len(frames) == 1:
+        return frames[0]
+    categorical = [c for c in frames[0].columns if isinstance(frames[0][c].dtype, pd.CategoricalDtype)]
+    df = pd.concat(frames, ignore_index=True)
+    for column in categorical:
+        df[column] = df[column].astype("category")
+    return df
+
+
+def plot_strata(table, by, dimension, snp_class, metric, out_png, save=DEFAULT_SAVE):
+    """Pipelines (rows) x levels of one stratum dimension, coloured by delta of metric against the whole genome."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    others = [c for c in strata.strata_columns(table) if c != dimension]
+    sub = strata.select_strata(table, keep=[dimension])
+    sub = sub[(sub["SNPClass"].astype(str) == snp_class) & ~sub["whole_genome"]]
+    if sub.empty:
+        print(f"No {dimension} strata for {snp_class}{' at whole-genome ' + ', '.join(others) if others else ''}")
+        return None
+    pipeline = sub[list(by)].astype(str).agg("-".join, axis=1)
+    matrix = sub.assign(Pipeline=pipeline.to_numpy()).pivot_table(
+        index="Pipeline", columns=dimension, values="delta", aggfunc="first", observed=True)
+    matrix = matrix.loc[:, matrix.mean().sort_values().index]
+    limit = float(np.nanmax(np.abs(matrix.to_numpy()))) or 1.0
+
+    fig, ax = plt.subplots(figsize=(min(40, max(8, 0.35 * matrix.shape[1] + 4)),
+                                    min(30, max(4, 0.35 * matrix.shape[0] + 2))))
+    sns.heatmap(matrix, cmap="RdBu", vmin=-limit, vmax=limit, center=0, linewidths=0.3, linecolor="white",
+                cbar_kws={"label": f"{metric} - whole-genome {metric}"}, ax=ax)
+    ax.set_facecolor("#eeeeee")
+    ax.set_xlabel(dimension, fontsize=11)
+    ax.set_ylabel("Pipeline", fontsize=11)
+    ax.set_title(f"{snp_class}: {metric} by {dimension} against the whole genome", fontsize=12)
+    plt.xticks(rotation=60, ha="right", fontsize=7)
+    fig.tight_layout()
+    return save_figure(fig, out_png, save)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stratum concordance against the whole genome.")
+    parser.add_argument("-i", "--input", nargs="+", required=True, help="Stratified giab_concordance_mqc.tsv(s)")
+    parser.add_argument("--by", type=parse_list, default=["Aligner", "SNVCaller"],
+                        help="Comma-separated pipeline columns (default: Aligner,SNVCaller)")
+    parser.add_argument("--strata", type=parse_list, default=None,
+                        help=f"Stratum dimensions to break down, of {','.join(strata.STRATA_COLUMNS)} "
+                             "(default: all present; the others stay at their whole-genome level)")
+    parser.add_argument("--classes", type=parse_list, default=None, help="Only these SNPClasses (default: all)")
+    parser.add_argument("--metric", default="Fscore", choices=[m for m in metrics.METRIC_COLUMNS if m != "FDR"],
+                        help="Metric the deltas and rankings use, higher is better (default: Fscore)")
+    parser.add_argument("--where", nargs="+", default=None, metavar="COLUMN=VALUE",
+                        help="Only report rows matching every filter, e.g. Aligner=sent Stratum=segdups")
+    parser.add_argument("--top", type=int, default=20, help="Worst strata per pipeline and SNPClass (default: 20)")
+    parser.add_argument("--min-truth", type=float, default=100,
+                        help="Leave strata with fewer truth variants (TP + FN) out of the ranking (default: 100)")
+    parser.add_argument("--plot-strata", default="Stratum", help="Dimension on the heatmap x axis (default: Stratum)")
+    parser.add_argument("--plot-class", default=None, help="SNPClass of the heatmap (default: the first reported)")
+    parser.add_argument("-o", "--output-prefix", default="strata", help="Prefix of the outputs")
+    parser.add_argument("--no-plots", "--tables-only", dest="no_plots", action="store_true",
+                        help="Write the TSVs only (matplotlib is never imported)")
+    add_output_arguments(parser)
+    tracing.add_trace_arguments(parser)
+    args = parser.parse_args()
+    try:
+        filters = parse_where(args.where)
+    except argparse.ArgumentTypeError as err:
+        parser.error(str(err))
+    tracing.start_from_args(args, "stratum_drilldown")
+
+    columns = set(args.by) | set(filters) | {"SNPClass", "Sample"} | set(strata.STRATA_COLUMNS) | \
+        set(metrics.COUNT_COLUMNS)
+    start = time.perf_counter()
+    with tracing.stage("load"):
+        df = load_inputs(args.input, columns)
+    missing = [c for c in args.by + (args.strata or []) if c not in df.columns]
+    if missing:
+        raise SystemExit(f"Unknown column(s): {', '.join(missing)}")
+    print(f"Loaded {len(df):,} rows ({df.memory_usage(deep=True).sum() / 2**20:.0f} MiB) "
+          f"in {time.perf_counter() - start:.1f}s")
+
+    with tracing.stage("drilldown"):
+        start = time.perf_counter()
+        table = strata.drilldown(df, args.by, args.strata, args.classes, args.metric)
+        try:
+            table = strata.where(table, filters)
+        except KeyError as err:
+            raise SystemExit(err.args[0])
+        worst = strata.worst_strata(table, args.top, args.by, args.min_truth)
+        print(f"{len(table):,} strata rows in {time.perf_counter() - start:.1f}s")
+
+    with tracing.stage("write"):
+        for name, out in [("strata", table), ("worst", worst)]:
+            out_tsv = f"{args.output_prefix}_{name}.tsv"
+            out.to_csv(out_tsv, sep="\t", index=False)
+            print(f"Saved: {out_tsv} ({len(out)} rows)")
+
+    strata_cols = strata.strata_columns(worst)
+    if len(worst):
+        print(worst.sort_values("delta").head(args.top)[
+            args.by + ["SNPClass"] + strata_cols + [args.metric, f"wg_{args.metric}", "delta", "error_share"]
+        ].to_string(index=False))
+
+    if not args.no_plots and args.plot_strata in table.columns and len(table):
+        with tracing.stage("render"):
+            snp_class = args.plot_class or str(table["SNPClass"].iloc[0])
+            out_png = plot_strata(table, args.by, args.plot_strata, snp_class, args.metric,
+                                  f"{args.output_prefix}_strata.png", save_options_from_args(args))
+            if out_png:
+                print(f"Saved: {out_png}")
+    tracing.finish()
+
+
+if __name__ == "__main__":
+    main()
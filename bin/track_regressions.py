@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Flag slow tasks and suspect hosts against robust per-rule baselines, and
+compare instance types (see bin/daylily_giab/regressions.py).
+
+History comes from the warehouse (--warehouse, every ingested run unless
+filtered) or from benchmark and alignstats TSVs, whose file names give the
+run (<build>_<run>_benchmarks[_summary].tsv pairs with
+<build>_<run>_alignstats.tsv) and build, for the per-Gbase throughput.
+
+Writes, for --output-prefix <prefix>:
+  <prefix>_flagged_tasks.tsv        tasks flagged slow / fast / low_eff (--all-tasks: every task)
+  <prefix>_hosts.tsv                per run and host, suspect hosts first
+  <prefix>_instance_throughput.tsv  per instance type
+  <prefix>_instance_family_throughput.tsv  per instance type and rule family
+
+Examples:
+  python bin/track_regressions.py --warehouse -o history
+  python bin/track_regressions.py data/us_west_2d/*_benchmarks_summary.tsv \\
+      -a data/us_west_2d/hg38_7giab_us-west-2d_alignstats.tsv data/us_west_2d/b37_7giab_us-west-2d_3x2_alignstats.tsv
+"""
+
+import argparse
+import os
+
+import pandas as pd
+
+import generate_benchmark_plots as bench
+from daylily_giab import regressions, warehouse
+from daylily_giab.figures import parse_list
+from daylily_giab.loaders import load_alignstats, load_benchmarks
+
+TASK_COLUMNS = ["build", "run", "region_az", "instance_type", "hostname", "sample", "rule", "family", "shard",
+                "snakemake_threads", "s", "thread_s", "baseline_thread_s", "rel_s", "z_s",
+                "eff_per_thread", "z_eff", "n_baseline", "flag"]
+
+
+RUN_SUFFIXES = ("_benchmarks_summary", "_benchmarks", "_alignstats")
+
+
+def run_name(path):
+    """File stem without its table suffix, shared by a run's benchmark and alignstats files."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for suffix in RUN_SUFFIXES:
+        if stem.endswith(suffix):
+            return stem[:-len(suffix)]
+    return stem
+
+
+def from_files(data_files, alignstats_files):
+    """Benchmarks of every file (run from the file name, build = its first '_' field) and their yields."""
+    frames = []
+    for path in data_files:
+        df = bench.prepare_benchmarks(load_benchmarks(path))
+        df["run"] = run_name(path)
+        df["build"] = df["run"].str.split("_").str[0]
+        frames.append(df)
+    yields = [regressions.yield_table(load_alignstats(p).assign(run=run_name(p))) for p in alignstats_files or []]
+    return pd.concat(frames, ignore_index=True), pd.concat(yields, ignore_index=True) if yields else None
+
+
+def from_warehouse(args):
+    """Benchmarks and yields of the selected warehouse partitions."""
+    filters = dict(build=args.genomebuild, region_az=args.region_az, run=args.run, root=args.root)
+    df = bench.prepare_benchmarks(warehouse.query("benchmarks", **filters))
+    try:
+        yields = regressions.yield_table(warehouse.query("alignstats", **filters))
+    except FileNotFoundError:
+        yields = None
+    return df, yields
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Robust-z regression tracking per task, host and instance type.")
+    parser.add_argument("data_files", nargs="*", help="benchmarks_summary.tsv files (unless --warehouse)")
+    parser.add_argument("-a", "--alignstats", nargs="+", default=None, help="alignstats.tsv files for YieldBases")
+    parser.add_argument("--warehouse", action="store_true", help="Read every ingested run from the warehouse")
+    parser.add_argument("--root", default=None, help=f"Warehouse directory (default: {warehouse.WAREHOUSE_DIR})")
+    parser.add_argument("-b", "--genomebuild", type=parse_list, default=None, help="Warehouse builds")
+    parser.add_argument("-z", "--region-az", type=parse_list, default=None, help="Warehouse region-AZs")
+    parser.add_argument("-r", "--run", type=parse_list, default=None, help="Warehouse runs")
+    parser.add_argument("--z", type=float, default=3.5, help="Robust z-score to flag a task (default: 3.5)")
+    parser.add_argument("--min-tasks", type=int, default=5,
+                        help="Smallest baseline group that gets z-scores (default: 5)")
+    parser.add_argument("--host-z", type=float, default=2.0,
+                        help="Median task z_s that marks a host suspect (default: 2.0)")
+    parser.add_argument("--all-tasks", action="store_true", help="Write every scored task, not only flagged ones")
+    parser.add_argument("-o", "--output-prefix", default="regressions", help="Prefix of the TSV outputs")
+    args = parser.parse_args()
+
+    if args.warehouse:
+        df, yields = from_warehouse(args)
+    elif args.data_files:
+        df, yields = from_files(args.data_files, args.alignstats)
+    else:
+        parser.error("give benchmark TSVs or --warehouse")
+
+    tasks = regressions.score_tasks(df, threshold=args.z, min_tasks=args.min_tasks)
+    if yields is not None:
+        tasks = regressions.attach_yield(tasks, yields)
+
+    flagged = tasks if args.all_tasks else tasks[tasks["flag"] != ""]
+    hosts = regressions.host_table(tasks, host_z=args.host_z)
+    outputs = {
+        "flagged_tasks": flagged[[c for c in TASK_COLUMNS if c in tasks.columns]].sort_values("z_s", ascending=False),
+        "hosts": hosts,
+        "instance_throughput": regressions.instance_throughput(tasks),
+        "instance_family_throughput": regressions.instance_throughput(tasks, by=["instance_type", "family"]),
+    }
+    for name, table in outputs.items():
+        table.to_csv(f"{args.output_prefix}_{name}.tsv", sep="\t", index=False)
+        print(f"Saved: {args.output_prefix}_{name}.tsv")
+
+    counts = tasks["flag"].value_counts()
+    print(f"{tasks['z_s'].notna().sum()} of {len(tasks)} tasks scored; "
+          + ", ".join(f"{counts.get(f, 0)} {f}" for f in ["slow", "fast", "low_eff"])
+          + f"; {int(hosts['suspect'].sum())} suspect hosts")
+
+
+if __name__ == "__main__":
+    main()
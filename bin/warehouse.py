@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Ingest runs into, and query, the partitioned warehouse (bin/daylily_giab/warehouse.py).
+
+Examples:
+  python bin/warehouse.py ingest -b hg38 -r usw2d-all \\
+      -m data/us_west_2d/hg38_7giab_us-west-2d_benchmarks_summary.tsv \\
+      -c data/us_west_2d/hg38_7giab_us-west-2d_giab_concordance_mqc.tsv \\
+      -s data/us_west_2d/hg38_7giab_us-west-2d_alignstats.tsv
+
+  python bin/warehouse.py list
+  python bin/warehouse.py query concordance -b hg38 --pipeline bwa2a-deep -w SNPClass=SNPts -o sub.tsv
+  python bin/warehouse.py query benchmarks -w rule=sent.alNsort --columns sample,run,s,task_cost
+"""
+
+import argparse
+import sys
+
+from daylily_giab import warehouse
+from daylily_giab.figures import parse_list
+
+
+def parse_where(value):
+    """'col=v1,v2' -> (col, [v1, v2]) for -w/--where."""
+    col, sep, values = value.partition("=")
+    if not sep or not col:
+        raise argparse.ArgumentTypeError(f"expected COLUMN=VALUE[,VALUE...], got '{value}'")
+    return col, parse_list(values)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Partitioned Parquet warehouse of benchmark/concordance/alignstats runs.")
+    parser.add_argument("--root", default=None,
+                        help=f"Warehouse directory (default: $DAYLILY_GIAB_WAREHOUSE or {warehouse.WAREHOUSE_DIR})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest = sub.add_parser("ingest", help="Append one run's TSVs")
+    ingest.add_argument("-b", "--genomebuild", required=True, help="Genome build, e.g. hg38")
+    ingest.add_argument("-r", "--run", required=True, help="Run name, e.g. usw2d-all")
+    ingest.add_argument("-z", "--region-az", default=None,
+                        help="Region/AZ for concordance/alignstats (default: from the benchmarks)")
+    ingest.add_argument("-m", "--benchmarks", help="benchmarks_summary.tsv")
+    ingest.add_argument("-c", "--concordance", help="giab_concordance_mqc.tsv")
+    ingest.add_argument("-s", "--alignstats", help="alignstats.tsv")
+
+    lst = sub.add_parser("list", help="Show partitions")
+    lst.add_argument("tables", nargs="*", default=list(warehouse.TABLES))
+
+    query = sub.add_parser("query", help="Select rows (TSV to --output or stdout)")
+    query.add_argument("table", choices=warehouse.TABLES)
+    query.add_argument("-b", "--genomebuild", type=parse_list, help="Build(s), comma-separated")
+    query.add_argument("-z", "--region-az", type=parse_list, help="Region/AZ(s), comma-separated")
+    query.add_argument("-r", "--run", type=parse_list, help="Run(s), comma-separated")
+    query.add_argument("-p", "--pipeline", type=parse_list,
+                       help="Concordance only: Aligner-SNVCaller pipeline(s), e.g. bwa2a-deep")
+    query.add_argument("-w", "--where", type=parse_where, action="append", default=[],
+                       help="COLUMN=VALUE[,VALUE...]; repeatable")
+    query.add_argument("--columns", type=parse_list, default=None, help="Columns to return")
+    query.add_argument("-o", "--output", default=None, help="Output TSV (default: stdout)")
+
+    args = parser.parse_args()
+    if args.command == "ingest" and not (args.benchmarks or args.concordance or args.alignstats):
+        parser.error("ingest needs at least one of -m/-c/-s")
+    if args.command == "query" and args.pipeline:
+        if args.table != "concordance":
+            parser.error("--pipeline applies to the concordance table")
+        if len(args.pipeline) > 1:
+            parser.error("--pipeline takes one pipeline; use -w Aligner=.. -w SNVCaller=.. for more")
+    return args
+
+
+def main():
+    args = parse_arguments()
+
+    if args.command == "ingest":
+        results = warehouse.ingest_run(args.genomebuild, args.run, benchmarks=args.benchmarks,
+                                       concordance=args.concordance, alignstats=args.alignstats,
+                                       region_az=args.region_az, root=args.root)
+        for table, files in results.items():
+            for path, written in files:
+                print(f"{table}: {'wrote' if written else 'already ingested'} {path}")
+
+    elif args.command == "list":
+        for table in args.tables:
+            try:
+                parts = warehouse.partitions(table, args.root)
+            except ValueError as e:
+                sys.exit(str(e))
+            print(f"== {table} ({len(parts)} partitions)")
+            if len(parts):
+                print(parts.to_string(index=False))
+
+    else:
+        where = dict(args.where)
+        if args.pipeline:
+            aligner, _, caller = args.pipeline[0].partition("-")
+            where.update({"Aligner": aligner, "SNVCaller": caller})
+        try:
+            df = warehouse.query(args.table, build=args.genomebuild, region_az=args.region_az, run=args.run,
+                                 where=where, columns=args.columns, root=args.root)
+        except (ValueError, FileNotFoundError) as e:
+            sys.exit(str(e))
+        df.to_csv(args.output or sys.stdout, sep="\t", index=False)
+        if args.output:
+            print(f"{len(df)} rows -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()